@@ -0,0 +1,117 @@
+# app/core/cache.py
+"""
+Cache mémoire versionné, borné en taille (LRU) et en durée (TTL).
+
+Chaque entrée dépend d'une ou plusieurs tables ; une écriture sur une table
+incrémente sa version, ce qui rend caduques toutes les entrées qui en dépendent.
+Le cache est propre à chaque worker : le TTL borne la fraîcheur des données
+modifiées par un autre processus.
+"""
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from app.core.config import settings
+
+_ABSENT = object()
+
+
+class VersionedCache:
+    def __init__(self, max_entrees, ttl):
+        self.max_entrees = max_entrees
+        self.ttl = ttl
+        self._entrees = OrderedDict()  # cle -> (expiration, versions, valeur)
+        self._versions = defaultdict(int)
+        self._verrou = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def versions(self, tables):
+        with self._verrou:
+            return tuple(self._versions[table] for table in tables)
+
+    def invalider(self, *tables):
+        """ Rend caduques toutes les entrées dépendant de ces tables. """
+        with self._verrou:
+            for table in tables:
+                self._versions[table] += 1
+                self.invalidations += 1
+
+    def get(self, cle, tables):
+        """ Valeur en cache, ou `_ABSENT` si absente, expirée ou d'une version dépassée. """
+        with self._verrou:
+            entree = self._entrees.get(cle, _ABSENT)
+            if entree is _ABSENT:
+                self.misses += 1
+                return _ABSENT
+            expiration, versions, valeur = entree
+            if expiration < time.monotonic():
+                del self._entrees[cle]
+                self.expirations += 1
+                self.misses += 1
+                return _ABSENT
+            if versions != tuple(self._versions[table] for table in tables):
+                del self._entrees[cle]
+                self.misses += 1
+                return _ABSENT
+            self._entrees.move_to_end(cle)
+            self.hits += 1
+            return valeur
+
+    def set(self, cle, tables, valeur, versions=None):
+        """
+        Enregistre une valeur. `versions` doit être relevé AVANT le chargement :
+        une invalidation survenue pendant le chargement rend l'entrée caduque.
+        """
+        with self._verrou:
+            if versions is None:
+                versions = tuple(self._versions[table] for table in tables)
+            self._entrees[cle] = (time.monotonic() + self.ttl, versions, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.max_entrees:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, cle, tables, chargeur):
+        valeur = self.get(cle, tables)
+        if valeur is _ABSENT:
+            versions = self.versions(tables)
+            valeur = chargeur()
+            self.set(cle, tables, valeur, versions)
+        return valeur
+
+    async def aget_or_load(self, cle, tables, chargeur):
+        """ Variante asynchrone : `chargeur` est une coroutine sans argument. """
+        valeur = self.get(cle, tables)
+        if valeur is _ABSENT:
+            versions = self.versions(tables)
+            valeur = await chargeur()
+            self.set(cle, tables, valeur, versions)
+        return valeur
+
+    def clear(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def stats(self):
+        with self._verrou:
+            return {
+                "entrees": len(self._entrees),
+                "max_entrees": self.max_entrees,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "versions": dict(self._versions),
+            }
+
+
+reference_cache = VersionedCache(
+    max_entrees=settings.REFERENCE_CACHE_MAX_ENTRIES,
+    ttl=settings.REFERENCE_CACHE_TTL,
+)
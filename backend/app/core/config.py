@@ -1,6 +1,6 @@
 # backend/app/core/config.py
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     DB_USER: str = "postgres"
@@ -8,11 +8,64 @@ class Settings(BaseSettings):
     DB_HOST: str = "localhost"
     DB_PORT: int = 5432
     DB_NAME: str = "db_sco"
+
+    # 🔹 Moteur SQLAlchemy : pool de connexions, timeouts, journalisation SQL
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30          # secondes d'attente max d'une connexion libre
+    DB_POOL_RECYCLE: int = 1800        # secondes avant recyclage d'une connexion
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # 0 = pas de limite
+
+    # 🔹 Réplique en lecture seule (optionnelle) : les GET y sont routés
+    DB_READ_HOST: Optional[str] = None
+    DB_READ_PORT: Optional[int] = None
     FRONTEND_URL: str = "http://localhost:5173"
 
     # 🔹 Liste des origines autorisées pour CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
+    # 🔹 Cache mémoire des tables de référence (par worker)
+    REFERENCE_CACHE_TTL: int = 300          # secondes
+    REFERENCE_CACHE_MAX_ENTRIES: int = 512
+
+    # 🔹 Compression des réponses (octets minimum avant gzip / brotli)
+    COMPRESSION_MIN_SIZE: int = 1024
+
+    # 🔹 Pool de processus pour les traitements lourds (0 = nombre de cœurs)
+    PROCESS_POOL_WORKERS: int = 0
+
+    # 🔹 Démarrage des workers
+    # verifier : compare la révision Alembic de la base à celle des migrations (avertit si elle diffère)
+    # exiger   : refuse de démarrer si la base n'est pas à la dernière révision
+    # creer    : create_all + marquage à la dernière révision (développement)
+    # ignorer  : aucune vérification
+    SCHEMA_AU_DEMARRAGE: str = "verifier"
+    SCHEMA_VERIFICATION_TIMEOUT: float = 2.0  # secondes ; base injoignable => on démarre quand même
+    PRECHAUFFAGE: bool = True                 # pool et cache de référence remplis en tâche de fond
+    PRECHAUFFAGE_CONNEXIONS: int = 2
+
+    # 🔹 Instrumentation SQL par requête (développement) : en-tête Server-Timing, alerte N+1
+    SQL_INSTRUMENTATION: bool = False
+    SQL_REPETITION_SEUIL: int = 5      # même instruction exécutée N fois dans une requête => N+1 probable
+
+    # 🔹 Métriques Prometheus (/metrics) et profileur par échantillonnage des requêtes lentes
+    METRIQUES: bool = True
+    PROFILAGE_SEUIL_MS: int = 0        # 0 = profileur désactivé
+    PROFILAGE_INTERVALLE_MS: int = 10
+    PROFILAGE_MAX_RAPPORTS: int = 50
+
+    # 🔹 Médias (logos, photos, scans) : stockage par empreinte du contenu et miniatures
+    MEDIA_DIR: str = "media"
+    MEDIA_TAILLE_MAX: int = 10 * 1024 * 1024   # octets par fichier envoyé
+    MEDIA_MINIATURES: List[int] = [64, 160, 480]  # côté maximal en pixels
+
+    # 🔹 Archivage des années closes (notes et résultats en Parquet, pyarrow requis)
+    ARCHIVE_DIR: str = "archives"
+    ARCHIVE_COMPRESSION: str = "zstd"
+    ARCHIVE_ANNEES_OUVERTES: int = 2   # années les plus récentes (ordre_annee) jamais archivées
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,23 @@
+# app/core/demarrage.py
+"""
+Chronométrage du démarrage d'un worker.
+
+Importé en premier par `app.main` : les étapes sont mesurées en millisecondes
+depuis le début des imports de l'application et exposées par `/api/demarrage`.
+"""
+import time
+
+DEBUT = time.perf_counter()
+
+_etapes = {}
+etat = {"schema": "non vérifié", "prechauffage": "en attente"}
+
+
+def marquer(etape):
+    """ Enregistre le temps écoulé (ms) depuis le début des imports. """
+    _etapes[etape] = round((time.perf_counter() - DEBUT) * 1000, 1)
+    return _etapes[etape]
+
+
+def etapes():
+    return {"etapes_ms": dict(_etapes), **etat}
@@ -0,0 +1,168 @@
+# app/core/http_cache.py
+"""
+Validation conditionnelle des réponses GET (ETag / If-None-Match -> 304).
+
+- Les routes adossées au cache de référence calculent leur ETag à partir de
+  l'empreinte des tables, et répondent 304 sans sérialiser la réponse
+  (`reponse_non_modifiee`).
+- Pour toutes les autres réponses JSON de GET, `ETagMiddleware` calcule un ETag
+  faible à partir du contenu et remplace la réponse par un 304 si le client
+  a déjà cette version.
+
+Compression (`middleware_compression`) : brotli ou gzip, sauf pour les types
+de contenu déjà compressés (archives zip, xlsx, images, pdf).
+"""
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+CACHE_CONTROL = "no-cache"  # le navigateur garde la réponse mais revalide à chaque navigation
+CACHE_CONTROL_IMMUABLE = "public, max-age=31536000, immutable"  # URL qui change avec le contenu
+
+# Types de contenu déjà compressés : gzip / brotli n'y gagnerait rien
+TYPES_DEJA_COMPRESSES = (
+    "application/zip", "application/gzip", "application/pdf",
+    "application/vnd.openxmlformats-officedocument.",  # xlsx, docx : archives zip
+    "image/jpeg", "image/png", "image/gif", "image/webp", "image/avif",
+    "audio/", "video/", "font/woff",
+)
+# Content-Encoding provisoire qui fait passer une réponse sans compression ;
+# retiré avant l'envoi au client
+ENCODAGE_PROVISOIRE = "x-deja-compresse"
+
+
+def etag(*parties):
+    """ ETag faible construit à partir d'empreintes de tables et de paramètres. """
+    empreinte = hashlib.sha1("|".join(str(p) for p in parties).encode("utf-8")).hexdigest()
+    return f'W/"{empreinte}"'
+
+
+def _correspond(if_none_match, valeur):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidats = {c.strip().removeprefix("W/") for c in if_none_match.split(",")}
+    return valeur.removeprefix("W/") in candidats
+
+
+def reponse_non_modifiee(request, response, valeur_etag, cache_control=CACHE_CONTROL):
+    """
+    Pose l'ETag sur la réponse ; retourne une réponse 304 si le client l'a déjà
+    (à renvoyer directement par la route), sinon None.
+    """
+    response.headers["ETag"] = valeur_etag
+    response.headers["Cache-Control"] = cache_control
+    if _correspond(request.headers.get("if-none-match"), valeur_etag):
+        return Response(status_code=304, headers={"ETag": valeur_etag, "Cache-Control": cache_control})
+    return None
+
+
+class ETagMiddleware:
+    """
+    Middleware ASGI : ETag de contenu pour les réponses JSON 200 des GET/HEAD.
+    Les réponses en flux (sans Content-Length) ou portant déjà un ETag passent telles quelles.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        debut = None
+        corps = []
+
+        async def envoyer(message):
+            nonlocal debut
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] != 200
+                    or "etag" in headers
+                    or "content-length" not in headers
+                    or not headers.get("content-type", "").startswith("application/json")
+                ):
+                    await send(message)
+                    return
+                debut = message
+                return
+            if debut is None:
+                await send(message)
+                return
+
+            corps.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            contenu = b"".join(corps)
+            valeur = f'W/"{hashlib.sha1(contenu).hexdigest()}"'
+            if _correspond(if_none_match, valeur):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", valeur.encode()), (b"cache-control", CACHE_CONTROL.encode())],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+            headers = MutableHeaders(raw=debut["headers"])
+            headers["ETag"] = valeur
+            headers.setdefault("Cache-Control", CACHE_CONTROL)
+            await send(debut)
+            await send({"type": "http.response.body", "body": contenu})
+
+        await self.app(scope, receive, envoyer)
+
+
+def deja_compresse(content_type):
+    return content_type.split(";")[0].strip().lower().startswith(TYPES_DEJA_COMPRESSES)
+
+
+def _reecrire_entetes(message, modifier):
+    if message["type"] == "http.response.start":
+        headers = MutableHeaders(raw=list(message["headers"]))
+        modifier(headers)
+        message["headers"] = headers.raw
+    return message
+
+
+def _marquer(headers):
+    if "content-encoding" not in headers and deja_compresse(headers.get("content-type", "")):
+        headers["Content-Encoding"] = ENCODAGE_PROVISOIRE
+
+
+def _demarquer(headers):
+    if headers.get("content-encoding") == ENCODAGE_PROVISOIRE:
+        del headers["content-encoding"]
+
+
+def middleware_compression():
+    """
+    Brotli si `brotli-asgi` est installé (avec repli gzip), sinon gzip seul.
+    Les compresseurs laissent passer toute réponse qui a déjà un Content-Encoding :
+    les types déjà compressés en reçoivent un provisoire, retiré à la sortie.
+    """
+    try:
+        from brotli_asgi import BrotliMiddleware as Compresseur
+    except ImportError:
+        from starlette.middleware.gzip import GZipMiddleware as Compresseur
+
+    class CompressionSelective:
+        def __init__(self, app, **options):
+            async def application(scope, receive, send):
+                await app(scope, receive, lambda message: send(_reecrire_entetes(message, _marquer)))
+
+            self.compresseur = Compresseur(application, **options)
+
+        async def __call__(self, scope, receive, send):
+            if scope["type"] != "http":
+                await self.compresseur(scope, receive, send)
+                return
+            await self.compresseur(
+                scope, receive, lambda message: send(_reecrire_entetes(message, _demarquer))
+            )
+
+    return CompressionSelective
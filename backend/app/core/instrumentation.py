@@ -0,0 +1,156 @@
+# app/core/instrumentation.py
+"""
+Instrumentation SQL par requête HTTP (événements du moteur SQLAlchemy).
+
+Pour chaque requête : nombre d'instructions, temps passé en base, et
+instructions identiques répétées (signature d'un N+1 : un chargement paresseux
+de `relationship()` exécuté dans une boucle). En développement
+(SQL_INSTRUMENTATION), le résultat est renvoyé dans l'en-tête `Server-Timing`
+(visible dans l'onglet Réseau du navigateur) et les répétitions sont journalisées.
+
+`max_requetes` borne le nombre d'instructions exécutées dans un bloc de test.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_mesures_courantes = ContextVar("mesures_sql", default=None)
+_compteurs = []  # mesures ouvertes par `max_requetes`, hors de toute requête HTTP
+
+
+class MesuresSQL:
+    def __init__(self):
+        self.nb = 0
+        self.duree = 0.0  # secondes
+        self.instructions = Counter()
+
+    def ajouter(self, instruction, duree):
+        self.nb += 1
+        self.duree += duree
+        self.instructions[instruction] += 1
+
+    def repetitions(self, seuil=None):
+        """ Instructions exécutées au moins `seuil` fois : texte -> nombre. """
+        seuil = seuil or settings.SQL_REPETITION_SEUIL
+        return {instruction: n for instruction, n in self.instructions.items() if n >= seuil}
+
+
+def mesures_courantes():
+    """ Mesures de la requête HTTP en cours (None hors requête instrumentée). """
+    return _mesures_courantes.get()
+
+
+def ouvrir_mesures():
+    """
+    Mesures de la requête en cours, créées si besoin : (mesures, jeton).
+    Le jeton (None si les mesures existaient déjà) est à rendre à `fermer_mesures`.
+    """
+    mesures = _mesures_courantes.get()
+    if mesures is not None:
+        return mesures, None
+    mesures = MesuresSQL()
+    return mesures, _mesures_courantes.set(mesures)
+
+
+def fermer_mesures(jeton):
+    if jeton is not None:
+        _mesures_courantes.reset(jeton)
+
+
+def _avant(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("debuts_instrumentation", []).append(time.perf_counter())
+
+
+def _apres(conn, cursor, statement, parameters, context, executemany):
+    debuts = conn.info.get("debuts_instrumentation")
+    if not debuts:
+        return
+    duree = time.perf_counter() - debuts.pop()
+    mesures = _mesures_courantes.get()
+    if mesures is not None:
+        mesures.ajouter(statement, duree)
+    for compteur in _compteurs:
+        compteur.ajouter(statement, duree)
+
+
+def instrumenter_moteurs(*moteurs):
+    """ Attache les écouteurs aux moteurs (idempotent ; AsyncEngine accepté). """
+    for moteur in moteurs:
+        moteur = getattr(moteur, "sync_engine", moteur)
+        if not event.contains(moteur, "before_cursor_execute", _avant):
+            event.listen(moteur, "before_cursor_execute", _avant)
+            event.listen(moteur, "after_cursor_execute", _apres)
+
+
+def server_timing(mesures, duree_totale):
+    """ Valeur de l'en-tête Server-Timing (durées en millisecondes). """
+    parties = [
+        f'db;dur={mesures.duree * 1000:.1f};desc="{mesures.nb} requetes SQL"',
+        f"app;dur={(duree_totale - mesures.duree) * 1000:.1f}",
+    ]
+    repetitions = mesures.repetitions()
+    if repetitions:
+        parties.append(f'n1;desc="{len(repetitions)} instruction(s) repetee(s), max {max(repetitions.values())}x"')
+    return ", ".join(parties)
+
+
+class InstrumentationSQLMiddleware:
+    """ Middleware ASGI : mesures SQL par requête, en-tête Server-Timing, alerte N+1. """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mesures, jeton = ouvrir_mesures()
+        debut = time.perf_counter()
+
+        async def envoyer(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(mesures, time.perf_counter() - debut))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, envoyer)
+        finally:
+            fermer_mesures(jeton)
+            for instruction, n in mesures.repetitions().items():
+                logger.warning("N+1 probable sur %s %s : %d x %s",
+                               scope["method"], scope["path"], n, " ".join(instruction.split())[:300])
+
+
+@contextmanager
+def max_requetes(limite, *moteurs):
+    """
+    Échoue (AssertionError) si le bloc exécute plus de `limite` instructions SQL
+    sur les moteurs donnés (par défaut ceux de l'application) :
+
+        with max_requetes(3):
+            client.get("/api/hierarchie/institution/UF")
+    """
+    if not moteurs:
+        from app import database
+        moteurs = (database.engine, database.read_engine, database.async_engine, database.async_read_engine)
+    instrumenter_moteurs(*moteurs)
+    mesures = MesuresSQL()
+    _compteurs.append(mesures)
+    try:
+        yield mesures
+    finally:
+        _compteurs.remove(mesures)
+    if mesures.nb > limite:
+        detail = "\n".join(f"  {n} x {' '.join(sql.split())[:200]}" for sql, n in mesures.instructions.most_common(10))
+        raise AssertionError(f"{mesures.nb} requêtes SQL exécutées (maximum {limite}) :\n{detail}")
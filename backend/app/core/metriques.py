@@ -0,0 +1,302 @@
+# app/core/metriques.py
+"""
+Métriques de production au format texte Prometheus (exposées sur /metrics).
+
+- Par route (gabarit FastAPI, ex. /api/etudiants) : histogramme des latences,
+  tailles de réponse, nombre de requêtes SQL et part du temps passé en base.
+- Requêtes en cours, attente au checkout du pool de connexions, cache de référence.
+- Profileur par échantillonnage (optionnel, PROFILAGE_SEUIL_MS > 0) : les piles
+  des threads de l'application sont relevées à intervalle fixe et conservées
+  pour les requêtes plus lentes que le seuil (format « folded » des flamegraphs).
+
+Les valeurs sont propres à chaque worker : Prometheus agrège les instances.
+"""
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+from app.core.config import settings
+from app.core.instrumentation import ouvrir_mesures, fermer_mesures
+
+BUCKETS_LATENCE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BUCKETS_TAILLE = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+BUCKETS_PART = (0.1, 0.25, 0.5, 0.75, 0.9, 1)
+BUCKETS_REQUETES = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+BUCKETS_ATTENTE = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+
+
+def _echapper(valeur):
+    return str(valeur).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(noms, valeurs, **extra):
+    paires = list(zip(noms, valeurs)) + list(extra.items())
+    if not paires:
+        return ""
+    return "{" + ",".join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in paires) + "}"
+
+
+class Compteur:
+    type = "counter"
+
+    def __init__(self, nom, aide, labels=()):
+        self.nom, self.aide, self.labels = nom, aide, labels
+        self._valeurs = defaultdict(float)
+        self._verrou = threading.Lock()
+
+    def inc(self, *valeurs_labels, valeur=1):
+        with self._verrou:
+            self._valeurs[valeurs_labels] += valeur
+
+    def lignes(self):
+        with self._verrou:
+            for valeurs_labels, valeur in sorted(self._valeurs.items()):
+                yield f"{self.nom}{_labels(self.labels, valeurs_labels)} {valeur}"
+
+
+class Jauge(Compteur):
+    type = "gauge"
+
+    def set(self, *valeurs_labels, valeur):
+        with self._verrou:
+            self._valeurs[valeurs_labels] = valeur
+
+
+class Histogramme:
+    type = "histogram"
+
+    def __init__(self, nom, aide, buckets, labels=()):
+        self.nom, self.aide, self.labels, self.buckets = nom, aide, labels, buckets
+        self._series = {}  # labels -> [compte par bucket..., somme, total]
+        self._verrou = threading.Lock()
+
+    def observe(self, *valeurs_labels, valeur):
+        with self._verrou:
+            serie = self._series.setdefault(valeurs_labels, [0] * len(self.buckets) + [0.0, 0])
+            for i, borne in enumerate(self.buckets):
+                if valeur <= borne:
+                    serie[i] += 1
+            serie[-2] += valeur
+            serie[-1] += 1
+
+    def lignes(self):
+        with self._verrou:
+            for valeurs_labels, serie in sorted(self._series.items()):
+                for borne, compte in zip(self.buckets, serie):
+                    yield f"{self.nom}_bucket{_labels(self.labels, valeurs_labels, le=borne)} {compte}"
+                yield f"{self.nom}_bucket{_labels(self.labels, valeurs_labels, le='+Inf')} {serie[-1]}"
+                yield f"{self.nom}_sum{_labels(self.labels, valeurs_labels)} {serie[-2]}"
+                yield f"{self.nom}_count{_labels(self.labels, valeurs_labels)} {serie[-1]}"
+
+
+REQUETES = Compteur("http_requests_total", "Requêtes HTTP traitées", ("method", "route", "status"))
+LATENCE = Histogramme("http_request_duration_seconds", "Durée des requêtes HTTP", BUCKETS_LATENCE,
+                      ("method", "route"))
+EN_COURS = Jauge("http_requests_in_flight", "Requêtes HTTP en cours de traitement")
+TAILLE = Histogramme("http_response_size_bytes", "Taille des réponses envoyées (après compression)",
+                     BUCKETS_TAILLE, ("route",))
+REQUETES_SQL = Histogramme("http_request_sql_queries", "Instructions SQL par requête HTTP",
+                           BUCKETS_REQUETES, ("route",))
+PART_SQL = Histogramme("http_request_sql_time_ratio", "Part de la durée de la requête passée en base",
+                       BUCKETS_PART, ("route",))
+ATTENTE_POOL = Histogramme("db_pool_checkout_wait_seconds", "Attente pour obtenir une connexion du pool",
+                           BUCKETS_ATTENTE, ("pool",))
+
+METRIQUES = [REQUETES, LATENCE, EN_COURS, TAILLE, REQUETES_SQL, PART_SQL, ATTENTE_POOL]
+
+
+# -------------------------------------------------------------------
+# --- POOL DE CONNEXIONS ---
+# -------------------------------------------------------------------
+
+class _AttenteMesuree:
+    """ Mesure l'attente (et l'éventuelle ouverture) de chaque checkout. """
+    nom_pool = "sync"
+
+    def _do_get(self):
+        debut = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            ATTENTE_POOL.observe(self.nom_pool, valeur=time.perf_counter() - debut)
+
+
+class PoolMesure(_AttenteMesuree, QueuePool):
+    nom_pool = "sync"
+
+
+class AsyncPoolMesure(_AttenteMesuree, AsyncAdaptedQueuePool):
+    nom_pool = "async"
+
+
+_pools = {}
+
+
+def suivre_pool(nom, moteur):
+    """ Expose l'occupation du pool de ce moteur (connexions prêtées / ouvertes). """
+    _pools[nom] = getattr(moteur, "sync_engine", moteur).pool
+
+
+def _lignes_pools():
+    yield "# HELP db_pool_checked_out Connexions actuellement prêtées"
+    yield "# TYPE db_pool_checked_out gauge"
+    for nom, pool in sorted(_pools.items()):
+        yield f'db_pool_checked_out{{pool="{nom}"}} {pool.checkedout()}'
+    yield "# HELP db_pool_size Connexions ouvertes dans le pool"
+    yield "# TYPE db_pool_size gauge"
+    for nom, pool in sorted(_pools.items()):
+        yield f'db_pool_size{{pool="{nom}"}} {pool.checkedin() + pool.checkedout()}'
+
+
+def _lignes_cache():
+    from app.core.cache import reference_cache
+
+    stats = reference_cache.stats()
+    for cle in ("hits", "misses", "evictions", "expirations", "invalidations"):
+        yield f"# TYPE reference_cache_{cle}_total counter"
+        yield f"reference_cache_{cle}_total {stats[cle]}"
+    yield "# TYPE reference_cache_entries gauge"
+    yield f"reference_cache_entries {stats['entrees']}"
+
+
+def exposition():
+    """ Texte au format d'exposition Prometheus 0.0.4. """
+    lignes = []
+    for metrique in METRIQUES:
+        lignes.append(f"# HELP {metrique.nom} {metrique.aide}")
+        lignes.append(f"# TYPE {metrique.nom} {metrique.type}")
+        lignes.extend(metrique.lignes())
+    lignes.extend(_lignes_pools())
+    lignes.extend(_lignes_cache())
+    return "\n".join(lignes) + "\n"
+
+
+# -------------------------------------------------------------------
+# --- PROFILEUR PAR ÉCHANTILLONNAGE ---
+# -------------------------------------------------------------------
+
+RACINE_APPLICATION = str(Path(__file__).resolve().parents[1])
+
+
+class Echantillonneur:
+    """
+    Thread qui relève les piles des threads exécutant du code de l'application.
+    Les échantillons couvrent tous ces threads pendant la fenêtre de la requête
+    (boucle d'événements partagée entre requêtes concurrentes comprise).
+    """
+
+    def __init__(self, intervalle, duree_max=30):
+        self.intervalle = intervalle
+        self._echantillons = deque(maxlen=int(duree_max / intervalle))  # (instant, pile)
+        self._thread = None
+        self.rapports = deque(maxlen=settings.PROFILAGE_MAX_RAPPORTS)
+
+    def demarrer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._boucle, name="echantillonneur", daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        moi = threading.get_ident()
+        while True:
+            instant = time.perf_counter()
+            for ident, frame in sys._current_frames().items():
+                if ident == moi:
+                    continue
+                pile = []
+                dans_application = False
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename.startswith(RACINE_APPLICATION):
+                        dans_application = True
+                        pile.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                    else:
+                        pile.append(f"{code.co_name} ({Path(code.co_filename).name})")
+                    frame = frame.f_back
+                # Threads inactifs (boucle au repos, pool en attente) ignorés
+                if dans_application:
+                    self._echantillons.append((instant, ";".join(reversed(pile))))
+            time.sleep(self.intervalle)
+
+    def rapport(self, methode, route, debut, fin):
+        piles = Counter(pile for instant, pile in list(self._echantillons) if debut <= instant <= fin)
+        self.rapports.append({
+            "route": f"{methode} {route}",
+            "duree_ms": round((fin - debut) * 1000, 1),
+            "echantillons": sum(piles.values()),
+            "intervalle_ms": self.intervalle * 1000,
+            "piles": [f"{pile} {n}" for pile, n in piles.most_common(50)],
+        })
+
+
+echantillonneur = Echantillonneur(settings.PROFILAGE_INTERVALLE_MS / 1000)
+
+
+# -------------------------------------------------------------------
+# --- MIDDLEWARE ---
+# -------------------------------------------------------------------
+
+def gabarit_route(scope):
+    """
+    Gabarit de la route servie, préfixe d'inclusion compris (/api/etudiants/{code}).
+    Selon la version de FastAPI, `route.path` est relatif au routeur inclus :
+    le préfixe est alors la partie du chemin qui précède la portion reconnue.
+    """
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_regex"):
+        return "non_routee"
+    chemin = scope["path"]
+    for i, caractere in enumerate(chemin):
+        if caractere == "/" and route.path_regex.match(chemin[i:]):
+            return chemin[:i] + route.path
+    return route.path
+
+
+class MetriquesMiddleware:
+    """ Middleware ASGI : latence, taille, requêtes SQL et part SQL par gabarit de route. """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mesures, jeton = ouvrir_mesures()
+        statut = 500
+        taille = 0
+        profilage = settings.PROFILAGE_SEUIL_MS > 0
+        if profilage:
+            echantillonneur.demarrer()
+
+        async def envoyer(message):
+            nonlocal statut, taille
+            if message["type"] == "http.response.start":
+                statut = message["status"]
+            elif message["type"] == "http.response.body":
+                taille += len(message.get("body", b""))
+            await send(message)
+
+        EN_COURS.inc(valeur=1)
+        debut = time.perf_counter()
+        try:
+            await self.app(scope, receive, envoyer)
+        finally:
+            fin = time.perf_counter()
+            duree = fin - debut
+            EN_COURS.inc(valeur=-1)
+            fermer_mesures(jeton)
+            route = gabarit_route(scope)
+            methode = scope["method"]
+            REQUETES.inc(methode, route, f"{statut // 100}xx")
+            LATENCE.observe(methode, route, valeur=duree)
+            TAILLE.observe(route, valeur=taille)
+            REQUETES_SQL.observe(route, valeur=mesures.nb)
+            PART_SQL.observe(route, valeur=min(1.0, mesures.duree / duree) if duree else 0.0)
+            if profilage and duree * 1000 >= settings.PROFILAGE_SEUIL_MS:
+                echantillonneur.rapport(methode, route, debut, fin)
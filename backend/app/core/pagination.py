@@ -0,0 +1,61 @@
+# app/core/pagination.py
+"""
+Pagination par curseur (keyset) : la page suivante est sélectionnée par
+`WHERE (cle_tri, cle_primaire) > (dernières valeurs vues)`, ce qui reste en
+temps constant quelle que soit la profondeur (contrairement à OFFSET).
+"""
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+LIMITE_DEFAUT = 50
+LIMITE_MAX = 500
+
+
+def encoder_curseur(valeurs):
+    return base64.urlsafe_b64encode(json.dumps(valeurs).encode("utf-8")).decode("ascii")
+
+
+def decoder_curseur(curseur, nb_valeurs):
+    try:
+        valeurs = json.loads(base64.urlsafe_b64decode(curseur.encode("ascii")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    if not isinstance(valeurs, list) or len(valeurs) != nb_valeurs:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+    return valeurs
+
+
+def champs_demandes(fields, autorises, obligatoires):
+    """
+    Colonnes à sélectionner pour le paramètre `fields=a,b,c` (toutes si absent).
+    Les colonnes nécessaires au curseur sont toujours incluses.
+    """
+    if not fields:
+        return list(autorises)
+    demandes = [f.strip() for f in fields.split(",") if f.strip()]
+    inconnus = [f for f in demandes if f not in autorises]
+    if inconnus:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus : {', '.join(inconnus)}")
+    return list(dict.fromkeys(list(obligatoires) + demandes))
+
+
+def paginer(stmt, colonnes_tri, curseur, limite, descendant=False):
+    """ Applique le filtre keyset, l'ordre et la limite (+1 pour détecter la page suivante). """
+    if curseur:
+        valeurs = decoder_curseur(curseur, len(colonnes_tri))
+        cle = tuple_(*colonnes_tri)
+        stmt = stmt.where(cle < tuple_(*valeurs) if descendant else cle > tuple_(*valeurs))
+    ordre = [col.desc() if descendant else col.asc() for col in colonnes_tri]
+    return stmt.order_by(*ordre).limit(limite + 1)
+
+
+def page(lignes, noms_tri, limite):
+    """ Réponse paginée : éléments de la page et curseur de la suivante (None en fin de liste). """
+    items = [dict(ligne) for ligne in lignes[:limite]]
+    suivant = None
+    if len(lignes) > limite:
+        suivant = encoder_curseur([items[-1][nom] for nom in noms_tri])
+    return {"items": items, "next_cursor": suivant, "limit": limite}
@@ -0,0 +1,46 @@
+# app/core/workers.py
+"""
+Pool de processus partagé pour les traitements lourds en CPU
+(rendu de documents, miniatures...). Créé à la première utilisation.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.core.config import settings
+
+_pool = None
+
+
+def nb_workers():
+    return settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+
+
+def get_process_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=nb_workers())
+    return _pool
+
+
+def map_borne(fonction, elements, fenetre=None):
+    """
+    Équivalent de `Executor.map` qui ne garde au plus que `fenetre` tâches en vol :
+    les résultats sont produits dans l'ordre, sans accumuler tout le lot en mémoire.
+    """
+    pool = get_process_pool()
+    fenetre = fenetre or 4 * nb_workers()
+    en_vol = deque()
+    for element in elements:
+        en_vol.append(pool.submit(fonction, element))
+        if len(en_vol) >= fenetre:
+            yield en_vol.popleft().result()
+    while en_vol:
+        yield en_vol.popleft().result()
+
+
+def arreter_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
@@ -1,20 +1,136 @@
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.core.config import settings
+from app.core.metriques import PoolMesure, AsyncPoolMesure
 
-DATABASE_URL = (
-    f"postgresql+psycopg2://{settings.DB_USER}:{settings.DB_PASS}"
-    f"@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
-)
 
-engine = create_engine(DATABASE_URL, echo=True)
+def build_database_url(host, port, driver="psycopg2"):
+    return (
+        f"postgresql+{driver}://{settings.DB_USER}:{settings.DB_PASS}"
+        f"@{host}:{port}/{settings.DB_NAME}"
+    )
+
+
+DATABASE_URL = build_database_url(settings.DB_HOST, settings.DB_PORT)
+ASYNC_DATABASE_URL = build_database_url(settings.DB_HOST, settings.DB_PORT, driver="asyncpg")
+
+
+def _pool_options():
+    return dict(
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+def create_app_engine(url, lecture_seule=False):
+    """ Moteur configuré depuis `Settings` : pool, pre-ping, recyclage, timeout par requête. """
+    options = []
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        options.append(f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}")
+    if lecture_seule:
+        options.append("-c default_transaction_read_only=on")
+    return create_engine(
+        url,
+        poolclass=PoolMesure,
+        **_pool_options(),
+        connect_args={"options": " ".join(options)} if options else {},
+    )
+
+
+def create_app_async_engine(url, lecture_seule=False):
+    """ Équivalent asyncpg de `create_app_engine` (mêmes réglages de pool et de timeout). """
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    if lecture_seule:
+        server_settings["default_transaction_read_only"] = "on"
+    return create_async_engine(
+        url,
+        poolclass=AsyncPoolMesure,
+        **_pool_options(),
+        connect_args={"server_settings": server_settings} if server_settings else {},
+    )
+
+
+engine = create_app_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+# Réplique en lecture seule : à défaut, les lectures passent par le primaire
+if settings.DB_READ_HOST:
+    read_engine = create_app_engine(
+        build_database_url(settings.DB_READ_HOST, settings.DB_READ_PORT or settings.DB_PORT),
+        lecture_seule=True,
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+else:
+    read_engine = engine
+    ReadSessionLocal = SessionLocal
+
+# 🔹 Accès asynchrone (asyncpg) pour les routes `async def`
+async_engine = create_app_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.DB_READ_HOST:
+    async_read_engine = create_app_async_engine(
+        build_database_url(settings.DB_READ_HOST, settings.DB_READ_PORT or settings.DB_PORT, driver="asyncpg"),
+        lecture_seule=True,
+    )
+    AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_read_engine = async_engine
+    AsyncReadSessionLocal = AsyncSessionLocal
+
+
+def prechauffer_pool(moteur, nb_connexions):
+    """ Ouvre `nb_connexions` connexions simultanées puis les rend au pool. """
+    connexions = []
+    try:
+        for _ in range(min(nb_connexions, settings.DB_POOL_SIZE)):
+            connexions.append(moteur.connect())
+    finally:
+        for connexion in connexions:
+            connexion.close()
 
-def get_db():
+
+async def aprechauffer_pool(moteur, nb_connexions):
+    connexions = []
+    try:
+        for _ in range(min(nb_connexions, settings.DB_POOL_SIZE)):
+            connexions.append(await moteur.connect())
+    finally:
+        for connexion in connexions:
+            await connexion.close()
+
+READ_METHODS = ("GET", "HEAD")
+
+
+def get_db(request: Request):
+    """ Session par requête : les GET/HEAD vont sur la réplique, le reste sur le primaire. """
+    factory = ReadSessionLocal if request.method in READ_METHODS else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_primary_db():
+    """ Session toujours sur le primaire (lecture de ses propres écritures). """
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db(request: Request):
+    """ Équivalent asynchrone de `get_db` (AsyncSession, même routage lecture / écriture). """
+    factory = AsyncReadSessionLocal if request.method in READ_METHODS else AsyncSessionLocal
+    async with factory() as db:
+        yield db
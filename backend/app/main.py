@@ -1,15 +1,108 @@
 # backend/app/main.py
-from fastapi import FastAPI
+from app.core import demarrage  # en premier : chronométrage des imports
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.routers import administration
-from app.database import engine
-from app.models import Base
+from app.routers import administration, resultats, notes, releves, systeme, etudiants, inscriptions, recherche, hierarchie, metriques, statistiques, charges, exports, medias, reconduction, archives
+from app.database import (
+    engine, async_engine, ReadSessionLocal, read_engine, async_read_engine, prechauffer_pool, aprechauffer_pool,
+)
+from app.core.http_cache import ETagMiddleware, middleware_compression
+from app.core.instrumentation import InstrumentationSQLMiddleware, instrumenter_moteurs
+from app.core.metriques import MetriquesMiddleware, suivre_pool
+from app.core.workers import arreter_pool
+from app.services import propagation  # noqa: F401  (écouteurs de recalcul des résultats)
+from app.services.archives import AnneeArchivee
+from app.services.references import prechauffer
+from app.services.schema import verifier_schema, creer_schema
+
+logger = logging.getLogger(__name__)
+
+demarrage.marquer("imports")
+
+
+async def _verifier_schema():
+    """ Une requête, bornée dans le temps : une base injoignable n'empêche pas le démarrage. """
+    mode = settings.SCHEMA_AU_DEMARRAGE
+    if mode == "ignorer":
+        return
+    fonction = creer_schema if mode == "creer" else verifier_schema
+    try:
+        etat = await asyncio.wait_for(
+            asyncio.to_thread(fonction, engine),
+            timeout=None if mode == "creer" else settings.SCHEMA_VERIFICATION_TIMEOUT,
+        )
+    except Exception as exc:
+        demarrage.etat["schema"] = "indisponible"
+        logger.warning("Vérification du schéma impossible (%s), démarrage poursuivi", exc or type(exc).__name__)
+        return
+    demarrage.etat["schema"] = etat or "cree"
+    if etat in ("different", "absente"):
+        message = f"Révision du schéma {etat} : lancer `alembic upgrade head`"
+        if mode == "exiger":
+            raise RuntimeError(message)
+        logger.warning(message)
+
+
+def _prechauffer_sync():
+    prechauffer_pool(read_engine, settings.PRECHAUFFAGE_CONNEXIONS)
+    with ReadSessionLocal() as db:
+        prechauffer(db)
+
 
-# Création des tables si elles n'existent pas
-Base.metadata.create_all(bind=engine)
+async def _prechauffer():
+    """ Pools et cache de référence remplis après la prise de trafic. """
+    demarrage.etat["prechauffage"] = "en cours"
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(_prechauffer_sync),
+            aprechauffer_pool(async_engine, settings.PRECHAUFFAGE_CONNEXIONS),
+        )
+    except Exception as exc:
+        demarrage.etat["prechauffage"] = "échec"
+        logger.warning("Préchauffage interrompu : %s", exc)
+        return
+    demarrage.etat["prechauffage"] = "terminé"
+    demarrage.marquer("prechauffage")
 
-app = FastAPI(title="Gestion Académique")
+
+@asynccontextmanager
+async def lifespan(app):
+    await _verifier_schema()
+    demarrage.marquer("schema")
+    tache = asyncio.create_task(_prechauffer()) if settings.PRECHAUFFAGE else None
+    logger.info("Worker prêt en %.0f ms", demarrage.marquer("pret"))
+    yield
+    if tache is not None:
+        tache.cancel()
+    arreter_pool()
+    engine.dispose()
+    await async_engine.dispose()
+
+
+app = FastAPI(title="Gestion Académique", lifespan=lifespan)
+
+
+# Écriture refusée sur une année archivée (notes, statistiques), quelle que soit la route
+@app.exception_handler(AnneeArchivee)
+async def annee_archivee(request: Request, exc: AnneeArchivee):
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+
+# Instrumentation SQL (nombre de requêtes, temps en base, N+1) en développement
+if settings.SQL_INSTRUMENTATION:
+    instrumenter_moteurs(engine, read_engine, async_engine, async_read_engine)
+    app.add_middleware(InstrumentationSQLMiddleware)
+
+# Validation conditionnelle (ETag -> 304) puis compression des réponses
+app.add_middleware(ETagMiddleware)
+app.add_middleware(middleware_compression(), minimum_size=settings.COMPRESSION_MIN_SIZE)
 
 # Middleware CORS
 app.add_middleware(
@@ -20,5 +113,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Métriques par route (middleware le plus externe : durée et taille réellement envoyées)
+if settings.METRIQUES:
+    instrumenter_moteurs(engine, read_engine, async_engine, async_read_engine)
+    suivre_pool("primaire", engine)
+    suivre_pool("primaire_async", async_engine)
+    if read_engine is not engine:
+        suivre_pool("replique", read_engine)
+        suivre_pool("replique_async", async_read_engine)
+    app.add_middleware(MetriquesMiddleware)
+
 # Inclure les routes avec prefix /api
 app.include_router(administration.router, prefix="/api")
+app.include_router(resultats.router, prefix="/api")
+app.include_router(notes.router, prefix="/api")
+app.include_router(releves.router, prefix="/api")
+app.include_router(systeme.router, prefix="/api")
+app.include_router(etudiants.router, prefix="/api")
+app.include_router(inscriptions.router, prefix="/api")
+app.include_router(recherche.router, prefix="/api")
+app.include_router(hierarchie.router, prefix="/api")
+app.include_router(statistiques.router, prefix="/api")
+app.include_router(charges.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
+app.include_router(medias.router, prefix="/api")
+app.include_router(reconduction.router, prefix="/api")
+app.include_router(archives.router, prefix="/api")
+
+# /metrics sans préfixe : chemin attendu par Prometheus
+app.include_router(metriques.router)
@@ -1,8 +1,9 @@
 # models.py
 
 from sqlalchemy import (
-    Column, Integer, String, Date, Numeric, ForeignKey, 
-    UniqueConstraint, Text, Boolean, CheckConstraint 
+    Column, Integer, String, Date, DateTime, Numeric, ForeignKey, 
+    UniqueConstraint, Text, Boolean, CheckConstraint,
+    Index, Identity, DDL, event, func, literal_column
 )
 from sqlalchemy.orm import relationship, declarative_base
 
@@ -33,7 +34,10 @@ class Institution(Base):
 
 class Composante(Base):
     __tablename__ = 'composantes'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_composantes_institution', 'id_institution'),
+        {'extend_existing': True}
+    )
     
     code = Column(String(50), primary_key=True)
     label = Column(String(100))
@@ -66,6 +70,7 @@ class Mention(Base):
     __tablename__ = 'mentions'
     __table_args__ = (
         UniqueConstraint('code_mention', 'composante_code', name='unique_mention_code_composante'),
+        Index('ix_mentions_composante', 'composante_code'),
         {'extend_existing': True}
     )
     
@@ -89,6 +94,7 @@ class Parcours(Base):
     __tablename__ = 'parcours'
     __table_args__ = (
         UniqueConstraint('code_parcours', 'mention_id', name='unique_parcours_code_mention'),
+        Index('ix_parcours_mention', 'mention_id'),
         {'extend_existing': True}
     )
     
@@ -176,10 +182,13 @@ class Semestre(Base):
     __table_args__ = (
         # Réintroduction de la contrainte pour assurer la cohérence des codes L1_S01
         UniqueConstraint('niveau_code', 'numero_semestre', name='uq_niveau_numero_semestre'), 
+        UniqueConstraint('semestre_id', name='uq_semestre_id'),
         {'extend_existing': True}
     )
     
     code_semestre = Column(String(10), primary_key=True) # Ex: L1_S01
+    # Clé technique entière, référencée par les tables de faits (le code reste l'identifiant public)
+    semestre_id = Column(Integer, Identity(), nullable=False)
     numero_semestre = Column(String(10), nullable=False) # Ex: S01
     
     niveau_code = Column(String(10), ForeignKey('niveaux.code'), nullable=False)
@@ -194,9 +203,15 @@ class Semestre(Base):
 
 class UniteEnseignement(Base):
     __tablename__ = 'unites_enseignement'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_unites_enseignement_semestre', 'code_semestre'),
+        UniqueConstraint('ue_id', name='uq_ue_id'),
+        {'extend_existing': True}
+    )
     
     id_ue = Column(String(50), primary_key=True)
+    # Clé technique entière, référencée par les tables de faits
+    ue_id = Column(Integer, Identity(), nullable=False)
     code_ue = Column(String(20), unique=True, nullable=False)
     intitule = Column(String(255), nullable=False)
     credit_ue = Column(Integer, nullable=False)
@@ -210,9 +225,15 @@ class UniteEnseignement(Base):
 
 class ElementConstitutif(Base):
     __tablename__ = 'elements_constitutifs'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_elements_constitutifs_ue', 'id_ue'),
+        UniqueConstraint('ec_id', name='uq_ec_id'),
+        {'extend_existing': True}
+    )
     
     id_ec = Column(String(50), primary_key=True)
+    # Clé technique entière, référencée par les tables de faits
+    ec_id = Column(Integer, Identity(), nullable=False)
     code_ec = Column(String(20), unique=True, nullable=False)
     intitule = Column(String(255), nullable=False)
     coefficient = Column(Integer, default=1, nullable=False)
@@ -298,10 +319,15 @@ class AnneeUniversitaire(Base):
 class Etudiant(Base):
     __tablename__ = 'etudiants'
     __table_args__ = (
+        # Tri / pagination par nom
+        Index('ix_etudiants_nom', 'nom', 'code_etudiant'),
+        UniqueConstraint('etudiant_id', name='uq_etudiant_id'),
         {'extend_existing': True} 
     )
     
     code_etudiant = Column(String(50), primary_key=True) 
+    # Clé technique entière, référencée par les tables de faits (le code reste l'identifiant public)
+    etudiant_id = Column(Integer, Identity(), nullable=False)
     numero_inscription = Column(String(100))
     nom = Column(String(100), nullable=False)
     prenoms = Column(String(150))
@@ -340,22 +366,25 @@ class Inscription(Base):
     __tablename__ = 'inscriptions'
     __table_args__ = (
         UniqueConstraint(
-            'code_etudiant', 
+            'etudiant_id', 
             'annee_universitaire', 
             'id_parcours', 
-            'code_semestre', 
+            'semestre_id', 
             name='uq_etudiant_annee_parcours_semestre' 
         ),
+        # Listes par parcours / semestre et calcul des résultats d'un semestre
+        Index('ix_inscriptions_parcours_annee_semestre', 'id_parcours', 'annee_universitaire', 'semestre_id'),
+        Index('ix_inscriptions_annee_semestre', 'annee_universitaire', 'semestre_id'),
         {'extend_existing': True} 
     )
     
     code_inscription = Column(String(100), primary_key=True)
     
-    # Clés étrangères
-    code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
+    # Clés étrangères (étudiant et semestre : clés techniques entières)
+    etudiant_id = Column(Integer, ForeignKey('etudiants.etudiant_id'), nullable=False)
     annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
     id_parcours = Column(String(50), ForeignKey('parcours.id_parcours'), nullable=False)
-    code_semestre = Column(String(10), ForeignKey('semestres.code_semestre'), nullable=False)
+    semestre_id = Column(Integer, ForeignKey('semestres.semestre_id'), nullable=False)
     # Mise à jour de la clé étrangère
     code_mode_inscription = Column(String(10), ForeignKey('modes_inscription.code'), nullable=False) # 👈 CHANGEMENT DE TABLE RÉFÉRENCÉE et NOM DE COLONNE
     # 🚨 NOUVELLE CLÉ ÉTRANGÈRE : code_type_formation
@@ -381,14 +410,15 @@ class ResultatSemestre(Base):
     __tablename__ = 'resultats_semestre'
     __table_args__ = (
         # 🚨 MISE À JOUR DE LA CONTRAINTE D'UNICITÉ : Ajout de 'code_session' 🚨
-        UniqueConstraint('code_etudiant', 'code_semestre', 'annee_universitaire', 'code_session', name='uq_resultat_semestre_session'),
+        UniqueConstraint('etudiant_id', 'semestre_id', 'annee_universitaire', 'code_session', name='uq_resultat_semestre_session'),
+        Index('ix_resultats_semestre_semestre_annee_session', 'semestre_id', 'annee_universitaire', 'code_session'),
     )
     
     id_resultat = Column(Integer, primary_key=True, autoincrement=True)
     
-    # Clés Étrangères
-    code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
-    code_semestre = Column(String(50), ForeignKey('semestres.code_semestre'), nullable=False)
+    # Clés Étrangères (étudiant et semestre : clés techniques entières)
+    etudiant_id = Column(Integer, ForeignKey('etudiants.etudiant_id'), nullable=False)
+    semestre_id = Column(Integer, ForeignKey('semestres.semestre_id'), nullable=False)
     annee_universitaire = Column(String(10), ForeignKey('annees_universitaires.annee'), nullable=False)
     
     # 🚨 AJOUT DE LA CLÉ ÉTRANGÈRE VERS LA SESSION D'EXAMEN 🚨
@@ -410,7 +440,7 @@ class ResultatSemestre(Base):
     annee_univ = relationship("AnneeUniversitaire") # Utilise le backref dans AnneeUniversitaire si défini
 
     def __repr__(self):
-        return (f"<ResultatSemestre {self.code_etudiant} - {self.code_semestre} "
+        return (f"<ResultatSemestre {self.etudiant_id} - {self.semestre_id} "
                 f"(Sess: {self.code_session}, Moy: {self.moyenne_obtenue}): {self.statut_validation}>")   
     
 class ResultatUE(Base):
@@ -421,14 +451,15 @@ class ResultatUE(Base):
     __tablename__ = 'resultats_ue'
     __table_args__ = (
         # Un seul résultat final par UE, étudiant, année et session
-        UniqueConstraint('code_etudiant', 'id_ue', 'annee_universitaire', 'code_session', name='uq_resultat_ue_unique'),
+        UniqueConstraint('etudiant_id', 'ue_id', 'annee_universitaire', 'code_session', name='uq_resultat_ue_unique'),
+        Index('ix_resultats_ue_ue_annee_session', 'ue_id', 'annee_universitaire', 'code_session'),
     )
     
     id_resultat_ue = Column(Integer, primary_key=True, autoincrement=True)
     
-    # Clés Étrangères
-    code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
-    id_ue = Column(String(50), ForeignKey('unites_enseignement.id_ue'), nullable=False)
+    # Clés Étrangères (étudiant et UE : clés techniques entières)
+    etudiant_id = Column(Integer, ForeignKey('etudiants.etudiant_id'), nullable=False)
+    ue_id = Column(Integer, ForeignKey('unites_enseignement.ue_id'), nullable=False)
     annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
     code_session = Column(String(5), ForeignKey('sessions_examen.code_session'), nullable=False) 
     
@@ -447,27 +478,29 @@ class ResultatUE(Base):
     annee_univ = relationship("AnneeUniversitaire", back_populates="resultats_ue")
     
     def __repr__(self):
-        return (f"<ResultatUE {self.code_etudiant} - {self.id_ue} "
+        return (f"<ResultatUE {self.etudiant_id} - {self.ue_id} "
                 f"(Sess: {self.code_session}, Moy: {self.moyenne_ue}): {self.is_ue_acquise}>")
 
 class Note(Base):
     __tablename__ = 'notes'
     __table_args__ = (
         UniqueConstraint(
-            'code_etudiant', 
-            'id_ec', 
+            'etudiant_id', 
+            'ec_id', 
             'annee_universitaire',
             'code_session',
             name='uq_etudiant_ec_annee_session' 
         ),
+        # Notes d'un EC (saisie, import, calcul des moyennes)
+        Index('ix_notes_ec_annee_session', 'ec_id', 'annee_universitaire', 'code_session'),
         {'extend_existing': True}
     )
     
     id_note = Column(Integer, primary_key=True, autoincrement=True)
     
-    # Clés Étrangères Composites
-    code_etudiant = Column(String(50), ForeignKey('etudiants.code_etudiant'), nullable=False)
-    id_ec = Column(String(50), ForeignKey('elements_constitutifs.id_ec'), nullable=False)
+    # Clés Étrangères Composites (étudiant et EC : clés techniques entières)
+    etudiant_id = Column(Integer, ForeignKey('etudiants.etudiant_id'), nullable=False)
+    ec_id = Column(Integer, ForeignKey('elements_constitutifs.ec_id'), nullable=False)
     annee_universitaire = Column(String(9), ForeignKey('annees_universitaires.annee'), nullable=False)
     code_session = Column(String(5), ForeignKey('sessions_examen.code_session'), nullable=False)
     
@@ -484,7 +517,7 @@ class Note(Base):
     session = relationship("SessionExamen", back_populates="notes_session")
 
     def __repr__(self):
-        return (f"<Note {self.code_etudiant} - {self.id_ec} "
+        return (f"<Note {self.etudiant_id} - {self.ec_id} "
                 f"({self.annee_universitaire}, {self.code_session}): {self.valeur_note}>")
 
 
@@ -602,6 +635,7 @@ class AffectationEC(Base):
         # Un EC, pour un type d'enseignement et une année donnée, 
         # ne doit être assuré que par un seul enseignant (pour simplifier la gestion de la responsabilité)
         UniqueConstraint('id_ec', 'code_type_enseignement', 'annee_universitaire', name='uq_affectation_unique'), 
+        Index('ix_affectations_ec_enseignant_annee', 'id_enseignant', 'annee_universitaire'),
         {'extend_existing': True}
     )
     
@@ -660,4 +694,145 @@ class Jury(Base):
     
     def __repr__(self):
         return (f"<Jury Sémestre {self.code_semestre} ({self.annee_universitaire}) "
-                f"présidé par {self.id_enseignant}>")
\ No newline at end of file
+                f"présidé par {self.id_enseignant}>")
+
+
+# ===================================================================
+# --- TABLES DÉRIVÉES: STATISTIQUES DU TABLEAU DE BORD ---
+# ===================================================================
+# Agrégats pré-calculés à partir de `resultats_semestre`, `resultats_ue` et
+# `inscriptions` (app/services/statistiques.py). Rafraîchis par groupe à chaque
+# propagation de notes ; reconstruits avec `python -m app.services.statistiques reconstruire`.
+
+class StatistiqueSemestre(Base):
+    """ Réussite et moyennes par parcours, semestre, année et session. """
+    __tablename__ = 'stats_semestre'
+    __table_args__ = (
+        UniqueConstraint('id_parcours', 'code_semestre', 'annee_universitaire', 'code_session', name='uq_stats_semestre'),
+        Index('ix_stats_semestre_annee_semestre', 'annee_universitaire', 'code_semestre'),
+    )
+
+    id_stat = Column(Integer, primary_key=True, autoincrement=True)
+
+    id_parcours = Column(String(50), nullable=False)
+    code_semestre = Column(String(10), nullable=False)
+    annee_universitaire = Column(String(9), nullable=False)
+    code_session = Column(String(5), nullable=False)
+
+    nb_etudiants = Column(Integer, nullable=False) # Étudiants ayant un résultat
+    nb_valides = Column(Integer, nullable=False) # Statut V
+    moyenne = Column(Numeric(4, 2))
+    moyenne_min = Column(Numeric(4, 2))
+    moyenne_max = Column(Numeric(4, 2))
+    credits_moyens = Column(Numeric(4, 1))
+    date_maj = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return (f"<StatistiqueSemestre {self.id_parcours} - {self.code_semestre} "
+                f"({self.annee_universitaire}, {self.code_session}): {self.nb_valides}/{self.nb_etudiants}>")
+
+
+class StatistiqueUE(Base):
+    """ Taux d'acquisition et moyenne de chaque UE, par parcours, année et session. """
+    __tablename__ = 'stats_ue'
+    __table_args__ = (
+        UniqueConstraint('id_parcours', 'id_ue', 'annee_universitaire', 'code_session', name='uq_stats_ue'),
+        Index('ix_stats_ue_annee_semestre', 'annee_universitaire', 'code_semestre'),
+    )
+
+    id_stat = Column(Integer, primary_key=True, autoincrement=True)
+
+    id_parcours = Column(String(50), nullable=False)
+    code_semestre = Column(String(10), nullable=False)
+    id_ue = Column(String(50), nullable=False)
+    annee_universitaire = Column(String(9), nullable=False)
+    code_session = Column(String(5), nullable=False)
+
+    nb_etudiants = Column(Integer, nullable=False)
+    nb_acquises = Column(Integer, nullable=False)
+    moyenne = Column(Numeric(4, 2))
+    date_maj = Column(DateTime, server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return (f"<StatistiqueUE {self.id_parcours} - {self.id_ue} "
+                f"({self.annee_universitaire}, {self.code_session}): {self.nb_acquises}/{self.nb_etudiants}>")
+
+
+class RepartitionCredits(Base):
+    """ Nombre d'étudiants par total de crédits acquis au semestre. """
+    __tablename__ = 'stats_credits'
+    __table_args__ = (
+        UniqueConstraint('id_parcours', 'code_semestre', 'annee_universitaire', 'code_session', 'credits_acquis',
+                         name='uq_stats_credits'),
+        Index('ix_stats_credits_annee_semestre', 'annee_universitaire', 'code_semestre'),
+    )
+
+    id_stat = Column(Integer, primary_key=True, autoincrement=True)
+
+    id_parcours = Column(String(50), nullable=False)
+    code_semestre = Column(String(10), nullable=False)
+    annee_universitaire = Column(String(9), nullable=False)
+    code_session = Column(String(5), nullable=False)
+
+    credits_acquis = Column(Numeric(4, 1), nullable=False)
+    nb_etudiants = Column(Integer, nullable=False)
+
+    def __repr__(self):
+        return (f"<RepartitionCredits {self.id_parcours} - {self.code_semestre} "
+                f"({self.annee_universitaire}, {self.code_session}): {self.credits_acquis} -> {self.nb_etudiants}>")
+
+
+# ===================================================================
+# --- INDEX DE RECHERCHE FLOUE (PostgreSQL : pg_trgm + unaccent) ---
+# ===================================================================
+
+# Extensions et fonction `immutable_unaccent` (unaccent n'est pas IMMUTABLE,
+# ce qui interdit de l'utiliser directement dans un index)
+for _ddl in (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS "
+    "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT",
+):
+    event.listen(Base.metadata, "before_create", DDL(_ddl).execute_if(dialect="postgresql"))
+
+
+def texte_recherche(*colonnes):
+    """
+    Expression normalisée (minuscules, sans accents) utilisée par les index ET les requêtes.
+    Les constantes sont écrites en littéraux SQL (pas de paramètres liés) pour que
+    l'expression compilée soit identique à celle de l'index, y compris en requête préparée.
+    """
+    vide, espace = literal_column("''"), literal_column("' '")
+    expression = func.coalesce(colonnes[0], vide)
+    for colonne in colonnes[1:]:
+        expression = expression.op("||")(espace).op("||")(func.coalesce(colonne, vide))
+    return func.immutable_unaccent(func.lower(expression))
+
+
+RECHERCHE_ETUDIANT_NOM = texte_recherche(Etudiant.nom, Etudiant.prenoms)
+RECHERCHE_ETUDIANT_IDENTIFIANTS = texte_recherche(Etudiant.numero_inscription, Etudiant.cin, Etudiant.telephone)
+RECHERCHE_ENSEIGNANT = texte_recherche(Enseignant.nom, Enseignant.prenoms, Enseignant.matricule)
+
+# Les expressions ne désignent pas une table unique : rattachement explicite
+Etudiant.__table__.append_constraint(Index(
+    "ix_etudiants_recherche_nom_trgm",
+    RECHERCHE_ETUDIANT_NOM.label("recherche_nom"),
+    postgresql_using="gin",
+    postgresql_ops={"recherche_nom": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql"))
+
+Etudiant.__table__.append_constraint(Index(
+    "ix_etudiants_recherche_identifiants_trgm",
+    RECHERCHE_ETUDIANT_IDENTIFIANTS.label("recherche_identifiants"),
+    postgresql_using="gin",
+    postgresql_ops={"recherche_identifiants": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql"))
+
+Enseignant.__table__.append_constraint(Index(
+    "ix_enseignants_recherche_trgm",
+    RECHERCHE_ENSEIGNANT.label("recherche"),
+    postgresql_using="gin",
+    postgresql_ops={"recherche": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql"))
@@ -1,37 +1,49 @@
 # app/routers/administration.py
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.models import Institution, Composante
 from app.schemas import InstitutionSchema, ComposanteSchema
-from app.database import get_db
+from app.database import get_async_db
+from app.core.http_cache import etag, reponse_non_modifiee
+from app.services.references import alister, aobtenir, aempreinte
 
 router = APIRouter()
 
 # 🔹 Liste de toutes les institutions
 @router.get("/institutions", response_model=List[InstitutionSchema])
-def get_institutions(db: Session = Depends(get_db)):
-    return db.query(Institution).all()
+async def get_institutions(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    non_modifiee = reponse_non_modifiee(request, response, etag(await aempreinte(db, Institution)))
+    if non_modifiee:
+        return non_modifiee
+    return await alister(db, Institution)
 
 # 🔹 Détails d'une institution
 @router.get("/institutions/{id_institution}", response_model=InstitutionSchema)
-def get_institution(id_institution: str, db: Session = Depends(get_db)):
-    institution = (
-        db.query(Institution)
-        .filter(Institution.id_institution == id_institution)
-        .first()
-    )
+async def get_institution(
+    id_institution: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)
+):
+    institution = await aobtenir(db, Institution, id_institution)
     if not institution:
         raise HTTPException(status_code=404, detail="Institution non trouvée")
+    non_modifiee = reponse_non_modifiee(
+        request, response, etag(await aempreinte(db, Institution), id_institution)
+    )
+    if non_modifiee:
+        return non_modifiee
     return institution
 
 # 🔹 Liste des composantes d'une institution
 @router.get("/composantes", response_model=List[ComposanteSchema])
-def get_composantes(institution_id: str = Query(...), db: Session = Depends(get_db)):
-    composantes = (
-        db.query(Composante)
-        .filter(Composante.id_institution == institution_id)
-        .all()
+async def get_composantes(
+    request: Request, response: Response,
+    institution_id: str = Query(...), db: AsyncSession = Depends(get_async_db),
+):
+    non_modifiee = reponse_non_modifiee(
+        request, response, etag(await aempreinte(db, Composante), institution_id)
     )
-    return composantes
+    if non_modifiee:
+        return non_modifiee
+    composantes = await alister(db, Composante)
+    return [c for c in composantes if c["id_institution"] == institution_id]
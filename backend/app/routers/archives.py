@@ -0,0 +1,55 @@
+# app/routers/archives.py
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from sqlalchemy.orm import Session
+
+from app.models import AnneeUniversitaire
+from app.database import get_db
+from app.services.references import obtenir
+from app.services.archives import (
+    ArchiveIndisponible, annees_archivees, manifeste, verifier, archiver, restaurer, supprimer_archive,
+)
+
+router = APIRouter()
+
+# 🔹 Années archivées et leur manifeste
+@router.get("/archives")
+def get_archives():
+    return [manifeste(annee) for annee in annees_archivees()]
+
+# 🔹 Manifeste d'une année archivée ; verifier = contrôle des empreintes des fichiers
+@router.get("/archives/{annee_universitaire}")
+def get_archive(annee_universitaire: str = Path(...), verifier_fichiers: bool = Query(False, alias="verifier")):
+    contenu = manifeste(annee_universitaire)
+    if contenu is None:
+        raise HTTPException(status_code=404, detail="Année non archivée")
+    if verifier_fichiers:
+        contenu["fichiers_alteres"] = verifier(annee_universitaire)
+    return contenu
+
+# 🔹 Archivage d'une année close (Parquet) et purge de ses notes et résultats
+@router.post("/archives/{annee_universitaire}")
+def archiver_annee(annee_universitaire: str = Path(...), db: Session = Depends(get_db)):
+    if not obtenir(db, AnneeUniversitaire, annee_universitaire):
+        raise HTTPException(status_code=404, detail="Année universitaire non trouvée")
+    try:
+        rapport = archiver(db, annee_universitaire)
+    except ArchiveIndisponible as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    db.commit()
+    return rapport
+
+# 🔹 Restauration d'une année archivée dans les tables (l'archive est supprimée)
+@router.delete("/archives/{annee_universitaire}")
+def restaurer_annee(annee_universitaire: str = Path(...), db: Session = Depends(get_db)):
+    try:
+        rapport = restaurer(db, annee_universitaire)
+    except ArchiveIndisponible as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(exc))
+    db.commit()
+    supprimer_archive(annee_universitaire)
+    return rapport
@@ -0,0 +1,63 @@
+# app/routers/charges.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Enseignant
+from app.database import get_async_db
+from app.services.charges import acharges, totaux_par_composante
+
+router = APIRouter()
+
+# 🔹 Charges d'enseignement de l'année (pages Affectation et Nomination)
+@router.get("/charges")
+async def get_charges(
+    annee_universitaire: str = Query(...),
+    code_composante: Optional[str] = Query(None),
+    code_type_enseignement: Optional[str] = Query(None, description="Enseignants ayant des heures de ce type"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    charges = (await acharges(db, annee_universitaire)).values()
+    if code_composante is not None:
+        charges = [charge for charge in charges if charge["code_composante"] == code_composante]
+    if code_type_enseignement is not None:
+        charges = [charge for charge in charges if code_type_enseignement in charge["heures_par_type"]]
+    return sorted(charges, key=lambda charge: charge["id_enseignant"])
+
+
+# 🔹 Heures par composante d'affectation et par type
+@router.get("/charges/composantes")
+async def get_charges_composantes(
+    annee_universitaire: str = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    totaux = totaux_par_composante(await acharges(db, annee_universitaire))
+    return [
+        {"code_composante": composante, "heures_par_type": par_type, "total_heures": sum(par_type.values())}
+        for composante, par_type in sorted(totaux.items(), key=lambda item: item[0] or "")
+    ]
+
+
+# 🔹 Charge d'un enseignant
+@router.get("/charges/{id_enseignant}")
+async def get_charge_enseignant(
+    id_enseignant: str = Path(...),
+    annee_universitaire: str = Query(...),
+    db: AsyncSession = Depends(get_async_db),
+):
+    charge = (await acharges(db, annee_universitaire)).get(id_enseignant)
+    if charge is not None:
+        return charge
+    enseignant = await db.get(Enseignant, id_enseignant)
+    if enseignant is None:
+        raise HTTPException(status_code=404, detail="Enseignant non trouvé")
+    return {
+        "id_enseignant": id_enseignant,
+        "code_composante": enseignant.code_composante_affectation,
+        "annee_universitaire": annee_universitaire,
+        "heures_par_type": {},
+        "total_heures": 0,
+        "nb_affectations": 0,
+        "nb_sans_volume": 0,
+    }
@@ -0,0 +1,76 @@
+# app/routers/etudiants.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Etudiant, Inscription
+from app.database import get_async_db
+from app.core.pagination import LIMITE_DEFAUT, LIMITE_MAX, champs_demandes, paginer, page
+from app.core.config import settings
+from app.services.medias import url_media
+from app.services.resultats import id_semestre
+
+router = APIRouter()
+
+# La clé technique (etudiant_id) reste interne : l'identifiant public est le code
+CHAMPS_ETUDIANT = [col.key for col in Etudiant.__table__.columns if col.key != "etudiant_id"]
+
+# Clés de tri autorisées (non nulles), départagées par la clé primaire
+TRIS_ETUDIANT = {
+    "code_etudiant": ["code_etudiant"],
+    "nom": ["nom", "code_etudiant"],
+}
+
+# 🔹 Liste paginée (keyset) et filtrable des étudiants
+@router.get("/etudiants")
+async def get_etudiants(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(LIMITE_DEFAUT, ge=1, le=LIMITE_MAX),
+    sort: Literal["code_etudiant", "nom"] = Query("code_etudiant"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    fields: Optional[str] = Query(None, description="Colonnes à retourner, séparées par des virgules"),
+    id_parcours: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    annee_universitaire: Optional[str] = Query(None),
+    code_mode_inscription: Optional[str] = Query(None),
+    sexe: Optional[str] = Query(None),
+    bacc_serie: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    noms_tri = TRIS_ETUDIANT[sort]
+    champs = champs_demandes(fields, CHAMPS_ETUDIANT, noms_tri)
+    stmt = select(*[getattr(Etudiant, champ) for champ in champs])
+
+    if sexe is not None:
+        stmt = stmt.where(Etudiant.sexe == sexe)
+    if bacc_serie is not None:
+        stmt = stmt.where(Etudiant.bacc_serie == bacc_serie)
+
+    # Filtres portant sur les inscriptions : EXISTS pour ne pas dupliquer les étudiants
+    filtres_inscription = [
+        colonne == valeur
+        for colonne, valeur in (
+            (Inscription.id_parcours, id_parcours),
+            (Inscription.annee_universitaire, annee_universitaire),
+            (Inscription.code_mode_inscription, code_mode_inscription),
+        )
+        if valeur is not None
+    ]
+    if code_semestre is not None:
+        filtres_inscription.append(Inscription.semestre_id == id_semestre(code_semestre))
+    if filtres_inscription:
+        stmt = stmt.where(
+            exists().where(Inscription.etudiant_id == Etudiant.etudiant_id, *filtres_inscription)
+        )
+
+    stmt = paginer(stmt, [getattr(Etudiant, nom) for nom in noms_tri], cursor, limit, order == "desc")
+    lignes = (await db.execute(stmt)).mappings().all()
+    reponse = page(lignes, noms_tri, limit)
+    if "photo_profil_path" in champs:
+        # Listes : la plus petite miniature, jamais la photo d'origine
+        taille = min(settings.MEDIA_MINIATURES)
+        for item in reponse["items"]:
+            item["photo_miniature"] = url_media(item["photo_profil_path"], taille)
+    return reponse
@@ -0,0 +1,51 @@
+# app/routers/exports.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import AnneeUniversitaire, Composante, Semestre, SessionExamen
+from app.database import get_async_db
+from app.services.references import aobtenir
+from app.services.archives import est_archivee
+from app.services.exports import EXPORTS, FORMATS, exporter, flux_annulable, verifier_format
+from app.services.lecture_tabulaire import FormatFichierError
+
+router = APIRouter()
+
+# 🔹 Export en flux (CSV / XLSX) des notes ou résultats d'une année, par composante
+@router.get("/exports/{type_export}")
+async def get_export(
+    request: Request,
+    type_export: Literal[tuple(EXPORTS)] = Path(...),
+    annee_universitaire: str = Query(...),
+    format: Literal[tuple(FORMATS)] = Query("csv"),
+    code_composante: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    code_session: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    if not await aobtenir(db, AnneeUniversitaire, annee_universitaire):
+        raise HTTPException(status_code=404, detail="Année universitaire non trouvée")
+    if est_archivee(annee_universitaire):
+        raise HTTPException(status_code=409, detail="Année universitaire archivée : données disponibles dans son archive Parquet")
+    if code_composante is not None and not await aobtenir(db, Composante, code_composante):
+        raise HTTPException(status_code=404, detail="Composante non trouvée")
+    if code_semestre is not None and not await aobtenir(db, Semestre, code_semestre):
+        raise HTTPException(status_code=404, detail="Semestre non trouvé")
+    if code_session is not None and not await aobtenir(db, SessionExamen, code_session):
+        raise HTTPException(status_code=404, detail="Session d'examen non trouvée")
+    try:
+        verifier_format(format)
+    except FormatFichierError as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+
+    morceaux = exporter(
+        db, type_export, format, annee_universitaire,
+        code_composante=code_composante, code_semestre=code_semestre, code_session=code_session,
+    )
+    media_type, extension = FORMATS[format]
+    nom = "_".join(filter(None, (type_export, code_composante, code_semestre, annee_universitaire, code_session)))
+    entetes = {"Content-Disposition": f'attachment; filename="{nom}.{extension}"'}
+    return StreamingResponse(flux_annulable(request, morceaux), media_type=media_type, headers=entetes)
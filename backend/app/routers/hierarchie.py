@@ -0,0 +1,29 @@
+# app/routers/hierarchie.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.core.http_cache import reponse_non_modifiee
+from app.services.hierarchie import NIVEAUX, aarbre
+
+router = APIRouter()
+
+# 🔹 Sous-arbre de l'offre de formation (Institution → ... → EC) à partir d'un nœud
+@router.get("/hierarchie/{niveau}/{identifiant}")
+async def get_hierarchie(
+    request: Request,
+    niveau: Literal[NIVEAUX] = Path(...),
+    identifiant: str = Path(...),
+    profondeur: Optional[int] = Query(None, ge=0, le=len(NIVEAUX) - 1,
+                                      description="Niveaux sous la racine (défaut : jusqu'aux EC)"),
+    annee: Optional[str] = Query(None, pattern=r"^\d{4}", description="Ne garder que les parcours ouverts cette année"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    arbre = await aarbre(db, niveau, identifiant, profondeur, annee)
+    if arbre is None:
+        raise HTTPException(status_code=404, detail=f"{niveau.capitalize()} non trouvé(e)")
+    contenu, valeur_etag = arbre
+    reponse = Response(content=contenu, media_type="application/json")
+    return reponse_non_modifiee(request, reponse, valeur_etag) or reponse
@@ -0,0 +1,98 @@
+# app/routers/inscriptions.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Etudiant, Inscription, Semestre
+from app.database import get_async_db, get_db
+from app.services.import_inscriptions import importer_inscriptions
+from app.services.resultats import id_semestre
+from app.services.lecture_tabulaire import FormatFichierError
+from app.core.pagination import LIMITE_DEFAUT, LIMITE_MAX, champs_demandes, paginer, page
+
+router = APIRouter()
+
+# Champs publics : étudiant et semestre exposés par leur code (clés techniques internes)
+CHAMPS_INSCRIPTION = {
+    "code_inscription": Inscription.code_inscription,
+    "code_etudiant": Etudiant.code_etudiant,
+    "annee_universitaire": Inscription.annee_universitaire,
+    "id_parcours": Inscription.id_parcours,
+    "code_semestre": Semestre.code_semestre,
+    "code_mode_inscription": Inscription.code_mode_inscription,
+    "credit_acquis_semestre": Inscription.credit_acquis_semestre,
+    "is_semestre_valide": Inscription.is_semestre_valide,
+}
+
+TRIS_INSCRIPTION = {
+    "code_inscription": ["code_inscription"],
+    "code_etudiant": ["code_etudiant", "code_inscription"],
+}
+
+# 🔹 Liste paginée (keyset) et filtrable des inscriptions
+@router.get("/inscriptions")
+async def get_inscriptions(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(LIMITE_DEFAUT, ge=1, le=LIMITE_MAX),
+    sort: Literal["code_inscription", "code_etudiant"] = Query("code_inscription"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    fields: Optional[str] = Query(None, description="Colonnes à retourner, séparées par des virgules"),
+    id_parcours: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    annee_universitaire: Optional[str] = Query(None),
+    code_mode_inscription: Optional[str] = Query(None),
+    sexe: Optional[str] = Query(None),
+    bacc_serie: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    noms_tri = TRIS_INSCRIPTION[sort]
+    champs = champs_demandes(fields, CHAMPS_INSCRIPTION, noms_tri)
+    stmt = select(*[CHAMPS_INSCRIPTION[champ].label(champ) for champ in champs]).select_from(Inscription)
+
+    if code_semestre is not None:
+        stmt = stmt.where(Inscription.semestre_id == id_semestre(code_semestre))
+    for colonne, valeur in (
+        (Inscription.id_parcours, id_parcours),
+        (Inscription.annee_universitaire, annee_universitaire),
+        (Inscription.code_mode_inscription, code_mode_inscription),
+    ):
+        if valeur is not None:
+            stmt = stmt.where(colonne == valeur)
+
+    # Jointures uniquement si nécessaires (codes demandés, filtres sur l'étudiant)
+    if "code_semestre" in champs:
+        stmt = stmt.join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+    if "code_etudiant" in champs or sexe is not None or bacc_serie is not None:
+        stmt = stmt.join(Etudiant, Etudiant.etudiant_id == Inscription.etudiant_id)
+        if sexe is not None:
+            stmt = stmt.where(Etudiant.sexe == sexe)
+        if bacc_serie is not None:
+            stmt = stmt.where(Etudiant.bacc_serie == bacc_serie)
+
+    stmt = paginer(stmt, [CHAMPS_INSCRIPTION[nom] for nom in noms_tri], cursor, limit, order == "desc")
+    lignes = (await db.execute(stmt)).mappings().all()
+    return page(lignes, noms_tri, limit)
+
+
+# 🔹 Import en masse des inscriptions (CSV / XLSX) avec rapport d'erreurs par ligne
+@router.post("/inscriptions/import")
+def import_inscriptions(
+    fichier: UploadFile = File(...),
+    annee_universitaire: Optional[str] = Query(None, description="Année de toutes les lignes (sinon colonne du fichier)"),
+    code_mode_inscription: Optional[str] = Query(None, description="Mode de toutes les lignes (sinon colonne du fichier)"),
+    db: Session = Depends(get_db),
+):
+    try:
+        rapport = importer_inscriptions(
+            db, fichier.file, fichier.filename,
+            annee_universitaire=annee_universitaire, code_mode_inscription=code_mode_inscription,
+        )
+    except FormatFichierError as exc:
+        db.rollback()
+        raise HTTPException(status_code=415, detail=str(exc))
+
+    db.commit()
+    return rapport
@@ -0,0 +1,88 @@
+# app/routers/medias.py
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, UploadFile, File
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.models import Institution, Composante, Mention, Parcours, Etudiant, Enseignant
+from app.database import get_db
+from app.core.config import settings
+from app.core.http_cache import CACHE_CONTROL_IMMUABLE, reponse_non_modifiee
+from app.services.medias import (
+    MediaInvalide, enregistrer, generer_miniatures, fichier_a_servir, cle_valide, url_media,
+)
+
+router = APIRouter()
+
+# Entité -> (modèle, champ du média -> colonne)
+ENTITES = {
+    "institution": (Institution, {"logo": "logo_path"}),
+    "composante": (Composante, {"logo": "logo_path"}),
+    "mention": (Mention, {"logo": "logo_path"}),
+    "parcours": (Parcours, {"logo": "logo_path"}),
+    "etudiant": (Etudiant, {
+        "photo": "photo_profil_path",
+        "scan_cin": "scan_cin_path",
+        "scan_releves_notes_bacc": "scan_releves_notes_bacc_path",
+    }),
+    "enseignant": (Enseignant, {"photo": "photo_profil_path", "scan_cin": "scan_cin_path"}),
+}
+
+
+def _stocker(fichier):
+    try:
+        cle, nouveau = enregistrer(fichier.file)
+    except MediaInvalide as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+    generer_miniatures(cle)
+    return {
+        "cle": cle,
+        "deja_present": not nouveau,
+        "url": url_media(cle),
+        "miniatures": {taille: url_media(cle, taille) for taille in settings.MEDIA_MINIATURES},
+    }
+
+
+# 🔹 Envoi d'un média (dédupliqué par contenu, miniatures générées une fois)
+@router.post("/medias")
+def post_media(fichier: UploadFile = File(...)):
+    return _stocker(fichier)
+
+
+# 🔹 Envoi et rattachement d'un média à une entité (logo, photo, scan)
+@router.put("/medias/{entite}/{identifiant}/{champ}")
+def put_media_entite(
+    entite: Literal[tuple(ENTITES)] = Path(...),
+    identifiant: str = Path(...),
+    champ: str = Path(...),
+    fichier: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    modele, champs = ENTITES[entite]
+    if champ not in champs:
+        raise HTTPException(status_code=404, detail=f"Champ inconnu pour {entite} : {', '.join(champs)}")
+    objet = db.get(modele, identifiant)
+    if objet is None:
+        raise HTTPException(status_code=404, detail=f"{entite.capitalize()} non trouvé(e)")
+    media = _stocker(fichier)
+    setattr(objet, champs[champ], media["cle"])
+    db.commit()
+    return media
+
+
+# 🔹 Lecture d'un média (ou de sa miniature) : contenu immuable, mis en cache sans limite
+@router.get("/medias/{cle}")
+def get_media(
+    request: Request,
+    cle: str = Path(...),
+    taille: Optional[int] = Query(None, ge=1, description="Côté maximal souhaité (miniature la plus proche)"),
+):
+    if not cle_valide(cle):
+        raise HTTPException(status_code=404, detail="Média non trouvé")
+    fichier = fichier_a_servir(cle, taille)
+    if fichier is None:
+        raise HTTPException(status_code=404, detail="Média non trouvé")
+    chemin, media_type, valeur_etag = fichier
+    reponse = FileResponse(chemin, media_type=media_type)
+    return reponse_non_modifiee(request, reponse, valeur_etag, CACHE_CONTROL_IMMUABLE) or reponse
@@ -0,0 +1,17 @@
+# app/routers/metriques.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metriques import exposition, echantillonneur
+
+router = APIRouter()
+
+# 🔹 Métriques au format Prometheus (latences par route, pool, SQL, cache)
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(exposition(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# 🔹 Profils des dernières requêtes lentes (piles au format « folded »)
+@router.get("/metrics/profils")
+def get_profils():
+    return list(echantillonneur.rapports)
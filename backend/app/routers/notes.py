@@ -0,0 +1,48 @@
+# app/routers/notes.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from sqlalchemy.orm import Session
+
+from app.models import SessionExamen, AnneeUniversitaire
+from app.database import get_db
+from app.services.references import obtenir
+from app.services.archives import est_archivee
+from app.services.import_notes import importer_notes
+from app.services.lecture_tabulaire import FormatFichierError
+
+router = APIRouter()
+
+# 🔹 Import en masse des notes (CSV / XLSX) pour un EC ou un semestre
+@router.post("/notes/import")
+def import_notes(
+    fichier: UploadFile = File(...),
+    annee_universitaire: str = Query(...),
+    code_session: str = Query(...),
+    id_ec: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    if (id_ec is None) == (code_semestre is None):
+        raise HTTPException(status_code=400, detail="Préciser soit id_ec, soit code_semestre")
+    if not obtenir(db, AnneeUniversitaire, annee_universitaire):
+        raise HTTPException(status_code=404, detail="Année universitaire non trouvée")
+    if est_archivee(annee_universitaire):
+        raise HTTPException(status_code=409, detail="Année universitaire archivée (lecture seule)")
+    if not obtenir(db, SessionExamen, code_session):
+        raise HTTPException(status_code=404, detail="Session d'examen non trouvée")
+
+    try:
+        rapport = importer_notes(
+            db, fichier.file, fichier.filename, annee_universitaire, code_session,
+            id_ec=id_ec, code_semestre=code_semestre,
+        )
+    except FormatFichierError as exc:
+        db.rollback()
+        raise HTTPException(status_code=415, detail=str(exc))
+    except ValueError as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    db.commit()
+    return rapport
@@ -0,0 +1,26 @@
+# app/routers/recherche.py
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.services.recherche import requete_etudiants, requete_enseignants
+
+router = APIRouter()
+
+# 🔹 Recherche floue (nom, numéro d'inscription, CIN, téléphone, matricule)
+@router.get("/recherche")
+async def rechercher(
+    q: str = Query(..., min_length=2, max_length=100),
+    cible: Literal["etudiants", "enseignants", "tous"] = Query("tous"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+    q = q.strip()
+    resultats = {}
+    if cible in ("etudiants", "tous"):
+        resultats["etudiants"] = (await db.execute(requete_etudiants(q, limit))).mappings().all()
+    if cible in ("enseignants", "tous"):
+        resultats["enseignants"] = (await db.execute(requete_enseignants(q, limit))).mappings().all()
+    return resultats
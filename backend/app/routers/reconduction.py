@@ -0,0 +1,36 @@
+# app/routers/reconduction.py
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from sqlalchemy.orm import Session
+
+from app.models import AnneeUniversitaire
+from app.database import get_db
+from app.services.references import obtenir
+from app.services.reconduction import ELEMENTS, reconduire
+
+router = APIRouter()
+
+# 🔹 Reconduction des volumes horaires, affectations et jurys vers une nouvelle année
+@router.post("/annees/{annee_universitaire}/reconduction")
+def reconduire_annee(
+    annee_universitaire: str = Path(...),
+    annee_source: Optional[str] = Query(None, description="Défaut : année précédente (ordre_annee)"),
+    elements: List[Literal[tuple(ELEMENTS)]] = Query(list(ELEMENTS)),
+    simulation: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    if not obtenir(db, AnneeUniversitaire, annee_universitaire):
+        raise HTTPException(status_code=404, detail="Année universitaire non trouvée")
+    if annee_source is not None and not obtenir(db, AnneeUniversitaire, annee_source):
+        raise HTTPException(status_code=404, detail="Année source non trouvée")
+
+    try:
+        rapport = reconduire(db, annee_universitaire, annee_source, elements=elements, simulation=simulation)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if simulation:
+        db.rollback()
+    else:
+        db.commit()
+    return rapport
@@ -0,0 +1,42 @@
+# app/routers/releves.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.models import Parcours, Semestre, SessionExamen
+from app.database import get_db
+from app.services.references import obtenir
+from app.services.releves import precharger_releves, zip_releves
+from app.services.archives import ArchiveIndisponible
+
+router = APIRouter()
+
+# 🔹 Relevés de notes d'un parcours (archive ZIP, un document par étudiant)
+@router.get("/releves")
+def get_releves(
+    id_parcours: str = Query(...),
+    annee_universitaire: str = Query(...),
+    code_semestre: str = Query(...),
+    code_session: str = Query(...),
+    db: Session = Depends(get_db),
+):
+    if not obtenir(db, Parcours, id_parcours):
+        raise HTTPException(status_code=404, detail="Parcours non trouvé")
+    if not obtenir(db, Semestre, code_semestre):
+        raise HTTPException(status_code=404, detail="Semestre non trouvé")
+    if not obtenir(db, SessionExamen, code_session):
+        raise HTTPException(status_code=404, detail="Session d'examen non trouvée")
+
+    try:
+        lot = precharger_releves(db, id_parcours, annee_universitaire, code_semestre, code_session)
+    except ArchiveIndisponible as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    if not lot:
+        raise HTTPException(status_code=404, detail="Aucun étudiant inscrit pour ces critères")
+
+    nom_archive = f"releves_{id_parcours}_{code_semestre}_{annee_universitaire}_{code_session}.zip"
+    return StreamingResponse(
+        zip_releves(lot),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{nom_archive}"'},
+    )
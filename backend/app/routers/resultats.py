@@ -0,0 +1,66 @@
+# app/routers/resultats.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.models import Semestre, SessionExamen, AnneeUniversitaire
+from app.database import get_db
+from app.services.references import obtenir
+from app.services.archives import est_archivee
+from app.services.resultats import calculer_resultats_ue
+from app.services.statistiques import rafraichir_statistiques
+from app.services.deliberation import deliberer
+
+router = APIRouter()
+
+# 🔹 Calcul en masse des résultats par UE d'un semestre
+@router.post("/resultats/ue/calcul")
+def calculer_resultats_ue_semestre(
+    annee_universitaire: str = Query(...),
+    code_semestre: str = Query(...),
+    code_session: str = Query(...),
+    db: Session = Depends(get_db),
+):
+    if not obtenir(db, AnneeUniversitaire, annee_universitaire):
+        raise HTTPException(status_code=404, detail="Année universitaire non trouvée")
+    if est_archivee(annee_universitaire):
+        raise HTTPException(status_code=409, detail="Année universitaire archivée (lecture seule)")
+    if not obtenir(db, Semestre, code_semestre):
+        raise HTTPException(status_code=404, detail="Semestre non trouvé")
+    if not obtenir(db, SessionExamen, code_session):
+        raise HTTPException(status_code=404, detail="Session d'examen non trouvée")
+
+    lignes = calculer_resultats_ue(db, annee_universitaire, code_semestre, code_session)
+    rafraichir_statistiques(db, annee_universitaire, code_session, semestres=[code_semestre])
+    db.commit()
+    return {
+        "annee_universitaire": annee_universitaire,
+        "code_semestre": code_semestre,
+        "code_session": code_session,
+        "resultats_ue": lignes,
+    }
+
+
+# 🔹 Délibération d'un semestre (compensation, statut V/NV/AJ) ; simulation = écart sans écriture
+@router.post("/resultats/semestre/deliberation")
+def deliberer_semestre(
+    annee_universitaire: str = Query(...),
+    code_semestre: str = Query(...),
+    code_session: str = Query(...),
+    simulation: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    if not obtenir(db, AnneeUniversitaire, annee_universitaire):
+        raise HTTPException(status_code=404, detail="Année universitaire non trouvée")
+    if est_archivee(annee_universitaire):
+        raise HTTPException(status_code=409, detail="Année universitaire archivée (lecture seule)")
+    if not obtenir(db, Semestre, code_semestre):
+        raise HTTPException(status_code=404, detail="Semestre non trouvé")
+    if not obtenir(db, SessionExamen, code_session):
+        raise HTTPException(status_code=404, detail="Session d'examen non trouvée")
+
+    rapport = deliberer(db, annee_universitaire, code_semestre, code_session, simulation=simulation)
+    if simulation:
+        db.rollback()
+    else:
+        db.commit()
+    return rapport
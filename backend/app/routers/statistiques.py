@@ -0,0 +1,90 @@
+# app/routers/statistiques.py
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import StatistiqueSemestre, StatistiqueUE, RepartitionCredits
+from app.database import get_async_db
+
+router = APIRouter()
+
+# Les endpoints ne lisent que les tables pré-agrégées (app/services/statistiques.py)
+
+
+def _filtrer(stmt, modele, annee_universitaire, id_parcours, code_semestre, code_session):
+    stmt = stmt.where(modele.annee_universitaire == annee_universitaire)
+    for colonne, valeur in (
+        (modele.id_parcours, id_parcours),
+        (modele.code_semestre, code_semestre),
+        (modele.code_session, code_session),
+    ):
+        if valeur is not None:
+            stmt = stmt.where(colonne == valeur)
+    return stmt
+
+
+def _taux(numerateur, denominateur):
+    return round(100 * numerateur / denominateur, 1) if denominateur else None
+
+
+# 🔹 Taux de réussite et moyennes par parcours / semestre / session
+@router.get("/statistiques/semestres")
+async def get_statistiques_semestres(
+    annee_universitaire: str = Query(...),
+    id_parcours: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    code_session: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    colonnes = [col for col in StatistiqueSemestre.__table__.columns if col.key != "id_stat"]
+    stmt = _filtrer(select(*colonnes), StatistiqueSemestre,
+                    annee_universitaire, id_parcours, code_semestre, code_session)
+    stmt = stmt.order_by(StatistiqueSemestre.id_parcours, StatistiqueSemestre.code_semestre,
+                         StatistiqueSemestre.code_session)
+    lignes = (await db.execute(stmt)).mappings().all()
+    return [
+        {**ligne, "taux_reussite": _taux(ligne["nb_valides"], ligne["nb_etudiants"])}
+        for ligne in lignes
+    ]
+
+
+# 🔹 Taux d'acquisition et moyenne de chaque UE
+@router.get("/statistiques/ue")
+async def get_statistiques_ue(
+    annee_universitaire: str = Query(...),
+    id_parcours: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    code_session: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    colonnes = [col for col in StatistiqueUE.__table__.columns if col.key != "id_stat"]
+    stmt = _filtrer(select(*colonnes), StatistiqueUE,
+                    annee_universitaire, id_parcours, code_semestre, code_session)
+    stmt = stmt.order_by(StatistiqueUE.id_parcours, StatistiqueUE.id_ue, StatistiqueUE.code_session)
+    lignes = (await db.execute(stmt)).mappings().all()
+    return [
+        {**ligne, "taux_acquisition": _taux(ligne["nb_acquises"], ligne["nb_etudiants"])}
+        for ligne in lignes
+    ]
+
+
+# 🔹 Répartition des étudiants par crédits acquis au semestre
+@router.get("/statistiques/credits")
+async def get_repartition_credits(
+    annee_universitaire: str = Query(...),
+    id_parcours: Optional[str] = Query(None),
+    code_semestre: Optional[str] = Query(None),
+    code_session: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    stmt = _filtrer(
+        select(RepartitionCredits.id_parcours, RepartitionCredits.code_semestre,
+               RepartitionCredits.code_session, RepartitionCredits.credits_acquis,
+               RepartitionCredits.nb_etudiants),
+        RepartitionCredits, annee_universitaire, id_parcours, code_semestre, code_session,
+    )
+    stmt = stmt.order_by(RepartitionCredits.id_parcours, RepartitionCredits.code_semestre,
+                         RepartitionCredits.code_session, RepartitionCredits.credits_acquis)
+    return (await db.execute(stmt)).mappings().all()
@@ -0,0 +1,17 @@
+# app/routers/systeme.py
+from fastapi import APIRouter
+
+from app.core import demarrage
+from app.core.cache import reference_cache
+
+router = APIRouter()
+
+# 🔹 Statistiques du cache des tables de référence (hits, misses, évictions...)
+@router.get("/cache/stats")
+async def get_cache_stats():
+    return reference_cache.stats()
+
+# 🔹 Durées de démarrage du worker (imports, schéma, prêt, préchauffage) en ms
+@router.get("/demarrage")
+async def get_demarrage():
+    return demarrage.etapes()
@@ -0,0 +1,342 @@
+# app/services/archives.py
+"""
+Archivage des années closes : `notes`, `resultats_ue` et `resultats_semestre`
+d'une année sont écrits dans des fichiers Parquet compressés (un par table),
+puis retirés des tables, qui restent de taille bornée (index compris).
+
+Arborescence sous ARCHIVE_DIR :
+    2021-2022/manifest.json
+    2021-2022/notes.parquet
+    2021-2022/resultats_ue.parquet
+    2021-2022/resultats_semestre.parquet
+
+Les écritures sur ces trois tables sont bloquées (PostgreSQL : LOCK TABLE)
+de la lecture des lignes jusqu'au commit de la purge.
+Le répertoire de l'année est écrit à côté puis renommé : le manifeste (lignes,
+empreinte SHA-256, colonnes, tri de chaque fichier) n'existe que si tous les
+fichiers sont complets et vérifiés. Une année est archivée dès que son
+manifeste existe ; la lecture passe alors par `lire` (filtres appliqués aux
+groupes de lignes, triés comme la contrainte d'unicité). Les statistiques du
+tableau de bord (`stats_*`) ne sont pas archivées et restent servies telles quelles.
+Les fichiers reprennent les colonnes des tables, donc les clés techniques
+(`etudiant_id`, `ec_id`, `ue_id`, `semestre_id`) : une archive se restaure
+dans la base dont elle provient.
+
+pyarrow est facultatif : sans lui, archivage et lecture des années archivées
+sont indisponibles, le reste de l'application fonctionne.
+
+    python -m app.services.archives archiver 2021-2022
+    python -m app.services.archives restaurer 2021-2022
+    python -m app.services.archives lister
+"""
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import select, delete, func, text, tuple_, Integer, Numeric, Boolean
+
+from app.core.config import settings
+from app.models import AnneeUniversitaire, Note, ResultatUE, ResultatSemestre
+from app.services.references import lister as lister_references
+from app.services.upsert import upsert, colonnes_contrainte
+
+TAILLE_LOT = 2000
+LIGNES_PAR_GROUPE = 64 * 1024
+
+# Table archivée -> (modèle, contrainte d'unicité : clé de restauration et ordre des lignes)
+TABLES = {
+    "notes": (Note, "uq_etudiant_ec_annee_session"),
+    "resultats_ue": (ResultatUE, "uq_resultat_ue_unique"),
+    "resultats_semestre": (ResultatSemestre, "uq_resultat_semestre_session"),
+}
+
+
+class AnneeArchivee(ValueError):
+    """ Écriture demandée sur une année dont les données sont archivées. """
+
+
+class ArchiveIndisponible(RuntimeError):
+    """ pyarrow n'est pas installé. """
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ArchiveIndisponible("Archives indisponibles (pyarrow non installé)") from exc
+    return pyarrow, pyarrow.parquet
+
+
+def _dossier(annee_universitaire):
+    return Path(settings.ARCHIVE_DIR) / annee_universitaire
+
+
+def manifeste(annee_universitaire):
+    """ Manifeste de l'année, ou None si elle n'est pas archivée. """
+    try:
+        with open(_dossier(annee_universitaire) / "manifest.json", encoding="utf-8") as fichier:
+            return json.load(fichier)
+    except FileNotFoundError:
+        return None
+
+
+def est_archivee(annee_universitaire):
+    return (_dossier(annee_universitaire) / "manifest.json").exists()
+
+
+def verifier_non_archivee(annee_universitaire):
+    if est_archivee(annee_universitaire):
+        raise AnneeArchivee(f"L'année {annee_universitaire} est archivée (lecture seule)")
+
+
+def annees_archivees():
+    racine = Path(settings.ARCHIVE_DIR)
+    if not racine.is_dir():
+        return []
+    return sorted(dossier.name for dossier in racine.iterdir() if (dossier / "manifest.json").exists())
+
+
+def _schema(pa, modele):
+    types = []
+    for colonne in modele.__table__.columns:
+        if isinstance(colonne.type, Boolean):
+            type_pa = pa.bool_()
+        elif isinstance(colonne.type, Integer):
+            type_pa = pa.int64()
+        elif isinstance(colonne.type, Numeric):
+            type_pa = pa.decimal128(colonne.type.precision, colonne.type.scale)
+        else:
+            type_pa = pa.string()
+        types.append(pa.field(colonne.name, type_pa, nullable=colonne.nullable))
+    return pa.schema(types)
+
+
+def _empreinte(chemin):
+    empreinte = hashlib.sha256()
+    with open(chemin, "rb") as fichier:
+        while morceau := fichier.read(1024 * 1024):
+            empreinte.update(morceau)
+    return empreinte.hexdigest()
+
+
+def _ecrire_table(db, pa, pq, modele, contrainte, annee_universitaire, chemin):
+    """ Écrit les lignes de l'année, lues par lots sur un curseur côté serveur. Retourne le nombre de lignes. """
+    table = modele.__table__
+    tri = colonnes_contrainte(modele, contrainte)
+    schema = _schema(pa, modele)
+    resultat = db.execute(
+        select(table).where(table.c.annee_universitaire == annee_universitaire)
+        .order_by(*[table.c[nom] for nom in tri])
+        .execution_options(yield_per=TAILLE_LOT)
+    )
+    lignes = 0
+    try:
+        with pq.ParquetWriter(chemin, schema, compression=settings.ARCHIVE_COMPRESSION) as ecrivain:
+            tampon = []
+            for lot in resultat.mappings().partitions():
+                tampon.extend(dict(ligne) for ligne in lot)
+                if len(tampon) >= LIGNES_PAR_GROUPE:
+                    ecrivain.write_table(pa.Table.from_pylist(tampon, schema=schema))
+                    lignes += len(tampon)
+                    tampon = []
+            if tampon or not lignes:
+                ecrivain.write_table(pa.Table.from_pylist(tampon, schema=schema))
+                lignes += len(tampon)
+    finally:
+        resultat.close()
+    return lignes
+
+
+def _verrouiller(db):
+    """
+    PostgreSQL : bloque les écritures sur les tables archivées jusqu'à la fin de la
+    transaction (les lectures restent possibles). Une ligne écrite pendant la
+    production des fichiers serait sinon absente de l'archive, puis purgée.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {', '.join(TABLES)} IN SHARE ROW EXCLUSIVE MODE"))
+
+
+def _purger_cles_archivees(db, pq, annee_universitaire, nom, modele, contrainte):
+    """ Supprime les seules lignes dont la clé figure dans l'archive (écritures ultérieures conservées). """
+    table = modele.__table__
+    cle = colonnes_contrainte(modele, contrainte)
+    fichier = pq.ParquetFile(_dossier(annee_universitaire) / manifeste(annee_universitaire)["tables"][nom]["fichier"])
+    purgees = 0
+    for lot in fichier.iter_batches(batch_size=TAILLE_LOT, columns=cle):
+        valeurs = list(zip(*(lot.column(nom_colonne).to_pylist() for nom_colonne in cle)))
+        purgees += db.execute(
+            delete(table).where(tuple_(*[table.c[nom_colonne] for nom_colonne in cle]).in_(valeurs))
+        ).rowcount
+    return purgees
+
+
+def archiver(db, annee_universitaire, purger=True):
+    """
+    Archive l'année puis, si `purger`, supprime ses lignes des tables (dans la
+    transaction de l'appelant, qui garde les écritures bloquées jusqu'à son commit).
+    Une année déjà archivée n'est pas réécrite : seules ses lignes restées en base
+    et présentes dans l'archive sont purgées.
+    Lève ValueError si l'année est inconnue ou encore ouverte.
+    """
+    annees = {ligne["annee"]: ligne["ordre_annee"] for ligne in lister_references(db, AnneeUniversitaire)}
+    if annee_universitaire not in annees:
+        raise ValueError(f"Année universitaire {annee_universitaire} inconnue")
+    ouvertes = sorted(annees, key=annees.get)[-settings.ARCHIVE_ANNEES_OUVERTES:] \
+        if settings.ARCHIVE_ANNEES_OUVERTES else []
+    if annee_universitaire in ouvertes:
+        raise ValueError(f"L'année {annee_universitaire} est encore ouverte (années ouvertes : {', '.join(ouvertes)})")
+
+    _verrouiller(db)
+    deja_archivee = est_archivee(annee_universitaire)
+    pa, pq = _pyarrow()
+    if not deja_archivee:
+        dossier = _dossier(annee_universitaire)
+        temporaire = dossier.with_name(f"{dossier.name}.{os.getpid()}.tmp")
+        shutil.rmtree(temporaire, ignore_errors=True)
+        temporaire.mkdir(parents=True)
+        try:
+            tables = {}
+            for nom, (modele, contrainte) in TABLES.items():
+                chemin = temporaire / f"{nom}.parquet"
+                lignes = _ecrire_table(db, pa, pq, modele, contrainte, annee_universitaire, chemin)
+                attendues = db.scalar(
+                    select(func.count()).select_from(modele)
+                    .where(modele.annee_universitaire == annee_universitaire)
+                )
+                if pq.read_metadata(chemin).num_rows != lignes or lignes != attendues:
+                    raise RuntimeError(f"Archive {nom} incomplète ({lignes} lignes écrites, {attendues} en base)")
+                tables[nom] = {
+                    "fichier": chemin.name,
+                    "lignes": lignes,
+                    "sha256": _empreinte(chemin),
+                    "octets": chemin.stat().st_size,
+                    "colonnes": [colonne.name for colonne in modele.__table__.columns],
+                    "tri": colonnes_contrainte(modele, contrainte),
+                }
+            with open(temporaire / "manifest.json", "w", encoding="utf-8") as fichier:
+                json.dump({
+                    "annee_universitaire": annee_universitaire,
+                    "archivee_le": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "format": "parquet",
+                    "compression": settings.ARCHIVE_COMPRESSION,
+                    "tables": tables,
+                }, fichier, ensure_ascii=False, indent=2)
+            os.replace(temporaire, dossier)
+        except BaseException:
+            shutil.rmtree(temporaire, ignore_errors=True)
+            raise
+
+    purgees = {}
+    if purger:
+        for nom, (modele, contrainte) in TABLES.items():
+            if deja_archivee:
+                purgees[nom] = _purger_cles_archivees(db, pq, annee_universitaire, nom, modele, contrainte)
+            else:
+                # Écritures bloquées depuis la lecture : les lignes de l'année sont celles archivées
+                purgees[nom] = db.execute(
+                    delete(modele).where(modele.annee_universitaire == annee_universitaire)
+                ).rowcount
+    return {
+        "annee_universitaire": annee_universitaire,
+        "deja_archivee": deja_archivee,
+        "tables": manifeste(annee_universitaire)["tables"],
+        "lignes_purgees": purgees,
+    }
+
+
+def verifier(annee_universitaire):
+    """ Fichiers dont l'empreinte ne correspond plus au manifeste (liste vide si l'archive est intacte). """
+    contenu = manifeste(annee_universitaire)
+    if contenu is None:
+        raise ValueError(f"L'année {annee_universitaire} n'est pas archivée")
+    dossier = _dossier(annee_universitaire)
+    return [
+        description["fichier"]
+        for description in contenu["tables"].values()
+        if not (dossier / description["fichier"]).exists()
+        or _empreinte(dossier / description["fichier"]) != description["sha256"]
+    ]
+
+
+def lire(annee_universitaire, nom_table, colonnes=None, **filtres):
+    """
+    Lignes (dicts) d'une table archivée. `filtres` : colonne=valeur ou
+    colonne=collection de valeurs (IN), évalués sur les statistiques des groupes
+    de lignes puis sur les lignes.
+    """
+    _, pq = _pyarrow()
+    conditions = [
+        (colonne, "in", list(valeur)) if isinstance(valeur, (list, tuple, set, frozenset)) else (colonne, "==", valeur)
+        for colonne, valeur in filtres.items()
+    ]
+    if any(operateur == "in" and not valeur for _, operateur, valeur in conditions):
+        return []
+    fichier = manifeste(annee_universitaire)["tables"][nom_table]["fichier"]
+    return pq.read_table(
+        _dossier(annee_universitaire) / fichier,
+        columns=colonnes,
+        filters=conditions or None,
+    ).to_pylist()
+
+
+def restaurer(db, annee_universitaire):
+    """
+    Réintègre l'année archivée dans les tables (ON CONFLICT DO NOTHING, nouveaux
+    identifiants) puis supprime l'archive. La transaction est laissée à l'appelant :
+    l'archive n'est supprimée qu'après un commit réussi (`supprimer_archive`).
+    """
+    _, pq = _pyarrow()
+    contenu = manifeste(annee_universitaire)
+    if contenu is None:
+        raise ValueError(f"L'année {annee_universitaire} n'est pas archivée")
+    alterees = verifier(annee_universitaire)
+    if alterees:
+        raise ValueError(f"Archive altérée : {', '.join(alterees)}")
+    restaurees = {}
+    for nom, (modele, contrainte) in TABLES.items():
+        cle_primaire = {colonne.name for colonne in modele.__table__.primary_key}
+        colonnes = [colonne for colonne in contenu["tables"][nom]["colonnes"] if colonne not in cle_primaire]
+        fichier = pq.ParquetFile(_dossier(annee_universitaire) / contenu["tables"][nom]["fichier"])
+        restaurees[nom] = sum(
+            upsert(db, modele, contrainte, colonnes_maj=[], valeurs=lot.to_pylist())
+            for lot in fichier.iter_batches(batch_size=TAILLE_LOT, columns=colonnes)
+        )
+    return {"annee_universitaire": annee_universitaire, "lignes_restaurees": restaurees}
+
+
+def supprimer_archive(annee_universitaire):
+    shutil.rmtree(_dossier(annee_universitaire))
+
+
+def main():
+    from app.database import SessionLocal
+
+    commande = sys.argv[1] if len(sys.argv) > 1 else ""
+    if commande == "lister":
+        for annee in annees_archivees():
+            tables = manifeste(annee)["tables"]
+            print(annee, ", ".join(f"{nom} : {table['lignes']} lignes" for nom, table in tables.items()))
+        return
+    if commande not in ("archiver", "restaurer") or len(sys.argv) < 3:
+        sys.exit(f"Commande inconnue : {commande} (archiver <annee> | restaurer <annee> | lister)")
+    annee = sys.argv[2]
+    with SessionLocal() as db:
+        if commande == "archiver":
+            rapport = archiver(db, annee)
+            db.commit()
+            print(f"{annee} archivée : {rapport['tables']} ; lignes purgées : {rapport['lignes_purgees']}")
+        else:
+            rapport = restaurer(db, annee)
+            db.commit()
+            supprimer_archive(annee)
+            print(f"{annee} restaurée : {rapport['lignes_restaurees']}")
+
+
+if __name__ == "__main__":
+    main()
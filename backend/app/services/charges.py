@@ -0,0 +1,123 @@
+# app/services/charges.py
+"""
+Charges d'enseignement : heures par enseignant, type (C / TD / TP),
+composante d'affectation et année universitaire.
+
+Une seule requête groupée par année : les heures d'une affectation sont son
+`volume_heure_effectif` s'il est renseigné, sinon le volume théorique de l'EC
+(`volume_horaire_ec`) pour le même type et la même année. Le résultat est mis
+en cache par année et invalidé au commit d'une écriture sur les affectations,
+les volumes horaires ou les enseignants.
+
+Export de paie (CSV sur la sortie standard) :
+    python -m app.services.charges 2024-2025
+"""
+import csv
+import sys
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import select, func, case, and_
+
+from app.core.cache import reference_cache
+from app.models import AffectationEC, VolumeHoraireEC, Enseignant
+from app.services.references import surveiller
+
+TABLES_CHARGES = (AffectationEC.__tablename__, VolumeHoraireEC.__tablename__, Enseignant.__tablename__)
+surveiller(*TABLES_CHARGES)
+
+
+def select_charges(annee_universitaire):
+    """ Une ligne par (enseignant, type d'enseignement) de l'année. """
+    heures = func.coalesce(AffectationEC.volume_heure_effectif, VolumeHoraireEC.volume_heure)
+    return (
+        select(
+            AffectationEC.id_enseignant,
+            Enseignant.code_composante_affectation,
+            AffectationEC.code_type_enseignement,
+            func.coalesce(func.sum(heures), 0).label("heures"),
+            func.count().label("nb_affectations"),
+            # Ni volume effectif ni volume théorique : à compléter avant la paie
+            func.sum(case((heures.is_(None), 1), else_=0)).label("nb_sans_volume"),
+        )
+        .join(Enseignant, Enseignant.id_enseignant == AffectationEC.id_enseignant)
+        .outerjoin(VolumeHoraireEC, and_(
+            VolumeHoraireEC.id_ec == AffectationEC.id_ec,
+            VolumeHoraireEC.code_type_enseignement == AffectationEC.code_type_enseignement,
+            VolumeHoraireEC.annee_universitaire == AffectationEC.annee_universitaire,
+        ))
+        .where(AffectationEC.annee_universitaire == annee_universitaire)
+        .group_by(AffectationEC.id_enseignant, Enseignant.code_composante_affectation,
+                  AffectationEC.code_type_enseignement)
+    )
+
+
+def _regrouper(annee_universitaire, lignes):
+    """ Dict id_enseignant -> charge de l'année (heures par type et total). """
+    charges = {}
+    for ligne in lignes:
+        charge = charges.setdefault(ligne.id_enseignant, {
+            "id_enseignant": ligne.id_enseignant,
+            "code_composante": ligne.code_composante_affectation,
+            "annee_universitaire": annee_universitaire,
+            "heures_par_type": defaultdict(Decimal),
+            "total_heures": Decimal(0),
+            "nb_affectations": 0,
+            "nb_sans_volume": 0,
+        })
+        heures = Decimal(ligne.heures)
+        charge["heures_par_type"][ligne.code_type_enseignement] += heures
+        charge["total_heures"] += heures
+        charge["nb_affectations"] += ligne.nb_affectations
+        charge["nb_sans_volume"] += ligne.nb_sans_volume
+    for charge in charges.values():
+        charge["heures_par_type"] = dict(charge["heures_par_type"])
+    return charges
+
+
+def charges(db, annee_universitaire):
+    """ Charges de tous les enseignants affectés dans l'année (dict partagé, à ne pas modifier). """
+    return reference_cache.get_or_load(
+        ("charges", annee_universitaire), TABLES_CHARGES,
+        lambda: _regrouper(annee_universitaire, db.execute(select_charges(annee_universitaire)).all()),
+    )
+
+
+async def acharges(db, annee_universitaire):
+    """ Variante de `charges` pour une AsyncSession. """
+    async def charger():
+        return _regrouper(annee_universitaire, (await db.execute(select_charges(annee_universitaire))).all())
+
+    return await reference_cache.aget_or_load(("charges", annee_universitaire), TABLES_CHARGES, charger)
+
+
+def totaux_par_composante(charges_annee):
+    """ Heures par composante d'affectation et par type (None : enseignants sans composante). """
+    totaux = defaultdict(lambda: defaultdict(Decimal))
+    for charge in charges_annee.values():
+        for code_type, heures in charge["heures_par_type"].items():
+            totaux[charge["code_composante"]][code_type] += heures
+    return {composante: dict(par_type) for composante, par_type in totaux.items()}
+
+
+def main():
+    from app.database import SessionLocal
+
+    if len(sys.argv) < 2:
+        sys.exit("Usage : python -m app.services.charges <annee_universitaire>")
+    annee_universitaire = sys.argv[1]
+    with SessionLocal() as db:
+        charges_annee = charges(db, annee_universitaire)
+    types = sorted({code for charge in charges_annee.values() for code in charge["heures_par_type"]})
+    sortie = csv.writer(sys.stdout, delimiter=";")
+    sortie.writerow(["id_enseignant", "code_composante", *types, "total_heures", "nb_sans_volume"])
+    for id_enseignant, charge in sorted(charges_annee.items()):
+        sortie.writerow([
+            id_enseignant, charge["code_composante"] or "",
+            *(charge["heures_par_type"].get(code, 0) for code in types),
+            charge["total_heures"], charge["nb_sans_volume"],
+        ])
+
+
+if __name__ == "__main__":
+    main()
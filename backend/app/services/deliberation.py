@@ -0,0 +1,98 @@
+# app/services/deliberation.py
+"""
+Délibération d'un semestre pour toute une promotion.
+
+À partir des `resultats_ue` de la session, une seule passe ensembliste
+(`select_resultats_semestre`) calcule pour chaque étudiant la moyenne pondérée
+par les crédits, la compensation et le statut V / NV / AJ, écrit les
+`resultats_semestre` (upsert sur `uq_resultat_semestre_session`), puis reporte
+crédits et validation sur les inscriptions, le suivi des cycles et les
+statistiques du tableau de bord.
+
+En simulation, rien n'est écrit : on retourne l'écart avec les résultats
+enregistrés (calculé en SQL, seules les lignes qui changent sont lues) et le
+président du jury du semestre.
+"""
+from sqlalchemy import select, func, and_, or_
+
+from app.models import Inscription, ResultatSemestre, Etudiant, Jury, Enseignant
+from app.services.resultats import (
+    id_semestre, select_resultats_semestre, upsert_resultats_semestre,
+    maj_credits_inscriptions, upsert_suivi_credits_cycles,
+)
+from app.services.statistiques import rafraichir_statistiques
+
+CHAMPS_DECISION = ("statut_validation", "credits_acquis", "moyenne_obtenue")
+
+
+def president_jury(db, annee_universitaire, code_semestre):
+    """ Président du jury nommé pour le semestre et l'année, ou None. """
+    ligne = db.execute(
+        select(Jury.id_enseignant, Enseignant.nom, Enseignant.prenoms, Jury.date_nomination)
+        .join(Enseignant, Enseignant.id_enseignant == Jury.id_enseignant)
+        .where(Jury.code_semestre == code_semestre, Jury.annee_universitaire == annee_universitaire)
+    ).mappings().first()
+    return dict(ligne) if ligne else None
+
+
+def ecarts(db, annee_universitaire, code_semestre, code_session):
+    """ (nombre de décisions calculées, lignes dont la décision diffère de celle enregistrée). """
+    calcul = select_resultats_semestre(annee_universitaire, code_session, code_semestre=code_semestre) \
+        .subquery("calcul")
+    enregistre = ResultatSemestre.__table__.alias("enregistre")
+    jointure = calcul.outerjoin(enregistre, and_(
+        enregistre.c.etudiant_id == calcul.c.etudiant_id,
+        enregistre.c.semestre_id == calcul.c.semestre_id,
+        enregistre.c.annee_universitaire == calcul.c.annee_universitaire,
+        enregistre.c.code_session == calcul.c.code_session,
+    )).join(Etudiant, Etudiant.etudiant_id == calcul.c.etudiant_id)
+    total = db.scalar(select(func.count()).select_from(calcul))
+    lignes = db.execute(
+        select(
+            Etudiant.code_etudiant,
+            *[enregistre.c[champ].label(f"{champ}_avant") for champ in CHAMPS_DECISION],
+            *[calcul.c[champ] for champ in CHAMPS_DECISION],
+        )
+        .select_from(jointure)
+        .where(or_(*[enregistre.c[champ].is_distinct_from(calcul.c[champ]) for champ in CHAMPS_DECISION]))
+        .order_by(Etudiant.code_etudiant)
+    ).mappings().all()
+    return total, [
+        {
+            "code_etudiant": ligne["code_etudiant"],
+            "avant": None if ligne["statut_validation_avant"] is None
+            else {champ: ligne[f"{champ}_avant"] for champ in CHAMPS_DECISION},
+            "apres": {champ: ligne[champ] for champ in CHAMPS_DECISION},
+        }
+        for ligne in lignes
+    ]
+
+
+def deliberer(db, annee_universitaire, code_semestre, code_session, simulation=False):
+    """
+    Délibère le semestre. La transaction est laissée à l'appelant.
+    Retourne le président du jury, le nombre de décisions et les changements
+    (en simulation) ou le nombre de lignes écrites.
+    """
+    rapport = {
+        "annee_universitaire": annee_universitaire,
+        "code_semestre": code_semestre,
+        "code_session": code_session,
+        "president_jury": president_jury(db, annee_universitaire, code_semestre),
+        "simulation": simulation,
+    }
+    if simulation:
+        total, changements = ecarts(db, annee_universitaire, code_semestre, code_session)
+        return {**rapport, "decisions": total, "nb_changements": len(changements), "changements": changements}
+
+    ecrites = upsert_resultats_semestre(db, annee_universitaire, code_session, code_semestre=code_semestre)
+    inscriptions = maj_credits_inscriptions(db, annee_universitaire, code_semestre=code_semestre)
+    etudiants = db.scalars(
+        select(Inscription.etudiant_id).distinct().where(
+            Inscription.annee_universitaire == annee_universitaire,
+            Inscription.semestre_id == id_semestre(code_semestre),
+        )
+    ).all()
+    upsert_suivi_credits_cycles(db, etudiants)
+    rafraichir_statistiques(db, annee_universitaire, code_session, semestres=[code_semestre])
+    return {**rapport, "decisions": ecrites, "inscriptions": inscriptions}
@@ -0,0 +1,183 @@
+# app/services/exports.py
+"""
+Exports en flux (CSV ou XLSX) des notes et résultats d'une année.
+
+Les lignes sont lues par lots sur un curseur côté serveur (`AsyncSession.stream`
+avec `yield_per`) dans la session de la requête, et écrites au fur et à mesure :
+la mémoire reste constante quelle que soit la taille de l'export. `flux_annulable`
+arrête la lecture et ferme le curseur dès que le client se déconnecte.
+
+XLSX : openpyxl en mode write_only écrit les lignes dans des fichiers temporaires
+(dans un thread, lot par lot) ; l'archive n'est assemblée qu'à la fin, puis
+envoyée par morceaux.
+"""
+import csv
+import io
+import logging
+import tempfile
+from contextlib import aclosing
+
+import anyio
+from sqlalchemy import select, exists
+
+from app.models import (
+    Etudiant, Note, ResultatUE, ResultatSemestre, ElementConstitutif, UniteEnseignement,
+    Semestre, Inscription, Parcours, Mention,
+)
+from app.services.lecture_tabulaire import FormatFichierError
+from app.services.upsert import colonnes_contrainte
+
+logger = logging.getLogger(__name__)
+
+TAILLE_LOT = 2000
+TAILLE_MORCEAU = 256 * 1024
+LIGNES_MAX_FEUILLE = 1048575  # limite Excel, en-tête non compris
+
+# Type d'export -> (modèle, contrainte d'unicité (ordre de tri), colonnes, colonne du semestre, jointures)
+EXPORTS = {
+    "notes": (
+        Note, "uq_etudiant_ec_annee_session",
+        [Etudiant.code_etudiant, Etudiant.nom, Etudiant.prenoms, ElementConstitutif.code_ec, Note.annee_universitaire,
+         Note.code_session, Note.valeur_note],
+        UniteEnseignement.code_semestre,
+        [(Etudiant, Etudiant.etudiant_id == Note.etudiant_id),
+         (ElementConstitutif, ElementConstitutif.ec_id == Note.ec_id),
+         (UniteEnseignement, UniteEnseignement.id_ue == ElementConstitutif.id_ue)],
+    ),
+    "resultats_ue": (
+        ResultatUE, "uq_resultat_ue_unique",
+        [Etudiant.code_etudiant, Etudiant.nom, Etudiant.prenoms, UniteEnseignement.code_ue,
+         ResultatUE.annee_universitaire, ResultatUE.code_session, ResultatUE.moyenne_ue,
+         ResultatUE.is_ue_acquise, ResultatUE.credit_obtenu],
+        UniteEnseignement.code_semestre,
+        [(Etudiant, Etudiant.etudiant_id == ResultatUE.etudiant_id),
+         (UniteEnseignement, UniteEnseignement.ue_id == ResultatUE.ue_id)],
+    ),
+    "resultats_semestre": (
+        ResultatSemestre, "uq_resultat_semestre_session",
+        [Etudiant.code_etudiant, Etudiant.nom, Etudiant.prenoms, Semestre.code_semestre,
+         ResultatSemestre.annee_universitaire, ResultatSemestre.code_session, ResultatSemestre.statut_validation,
+         ResultatSemestre.credits_acquis, ResultatSemestre.moyenne_obtenue],
+        Semestre.code_semestre,
+        [(Etudiant, Etudiant.etudiant_id == ResultatSemestre.etudiant_id),
+         (Semestre, Semestre.semestre_id == ResultatSemestre.semestre_id)],
+    ),
+}
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+
+def requete_export(type_export, annee_universitaire, code_composante=None, code_semestre=None, code_session=None):
+    """ (en-têtes, requête) de l'export, triée sur les colonnes de la contrainte d'unicité (index). """
+    modele, contrainte, colonnes, colonne_semestre, jointures = EXPORTS[type_export]
+    stmt = select(*colonnes).select_from(modele)
+    for cible, condition in jointures:
+        stmt = stmt.join(cible, condition)
+    stmt = stmt.where(modele.annee_universitaire == annee_universitaire)
+    if code_session is not None:
+        stmt = stmt.where(modele.code_session == code_session)
+    if code_semestre is not None:
+        stmt = stmt.where(colonne_semestre == code_semestre)
+    if code_composante is not None:
+        # Étudiants inscrits cette année dans un parcours de la composante
+        stmt = stmt.where(exists(
+            select(Inscription.etudiant_id)
+            .join(Parcours, Parcours.id_parcours == Inscription.id_parcours)
+            .join(Mention, Mention.id_mention == Parcours.mention_id)
+            .where(
+                Inscription.etudiant_id == modele.etudiant_id,
+                Inscription.annee_universitaire == modele.annee_universitaire,
+                Mention.composante_code == code_composante,
+            )
+        ))
+    stmt = stmt.order_by(*[modele.__table__.c[nom] for nom in colonnes_contrainte(modele, contrainte)])
+    return [col.key for col in colonnes], stmt
+
+
+async def lots(db, stmt):
+    """ Lignes de la requête par lots, sur un curseur côté serveur fermé en fin de flux. """
+    resultat = await db.stream(stmt.execution_options(yield_per=TAILLE_LOT))
+    try:
+        async for lot in resultat.partitions():
+            yield lot
+    finally:
+        await resultat.close()
+
+
+async def _csv(entetes, lots_lignes):
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon, delimiter=";")
+    tampon.write("\ufeff")  # BOM : accents corrects à l'ouverture dans Excel
+    ecrivain.writerow(entetes)
+    async for lot in lots_lignes:
+        ecrivain.writerows(lot)
+        yield tampon.getvalue().encode("utf-8")
+        tampon.seek(0)
+        tampon.truncate()
+    if tampon.tell():
+        yield tampon.getvalue().encode("utf-8")
+
+
+async def _xlsx(entetes, lots_lignes):
+    from openpyxl import Workbook
+
+    classeur = Workbook(write_only=True)
+    feuille, nb_lignes = None, LIGNES_MAX_FEUILLE
+
+    def ecrire(lot):
+        nonlocal feuille, nb_lignes
+        for ligne in lot:
+            if nb_lignes == LIGNES_MAX_FEUILLE:
+                feuille = classeur.create_sheet(f"export_{len(classeur.worksheets) + 1}")
+                feuille.append(entetes)
+                nb_lignes = 0
+            feuille.append(list(ligne))
+            nb_lignes += 1
+
+    async for lot in lots_lignes:
+        await anyio.to_thread.run_sync(ecrire, lot)
+    if feuille is None:
+        classeur.create_sheet("export_1").append(entetes)
+    with tempfile.TemporaryFile() as fichier:
+        await anyio.to_thread.run_sync(classeur.save, fichier)
+        fichier.seek(0)
+        while morceau := await anyio.to_thread.run_sync(fichier.read, TAILLE_MORCEAU):
+            yield morceau
+
+
+def verifier_format(format_export):
+    if format_export == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError as exc:
+            raise FormatFichierError("Export XLSX indisponible (openpyxl non installé)") from exc
+
+
+async def exporter(db, type_export, format_export, annee_universitaire, **filtres):
+    """ Générateur asynchrone d'octets de l'export (à envelopper dans `flux_annulable`). """
+    entetes, stmt = requete_export(type_export, annee_universitaire, **filtres)
+    ecrire = _xlsx if format_export == "xlsx" else _csv
+    async with aclosing(lots(db, stmt)) as source, aclosing(ecrire(entetes, source)) as morceaux:
+        async for morceau in morceaux:
+            yield morceau
+
+
+async def flux_annulable(request, morceaux):
+    """
+    Transmet les morceaux tant que le client est connecté. Client déconnecté (ou
+    réponse annulée) : le générateur est fermé, ce qui ferme le curseur sans lire la suite.
+    """
+    try:
+        while not await request.is_disconnected():
+            try:
+                morceau = await anext(morceaux)
+            except StopAsyncIteration:
+                return
+            yield morceau
+        logger.info("Export interrompu : client déconnecté (%s)", request.url.path)
+    finally:
+        with anyio.CancelScope(shield=True):
+            await morceaux.aclose()
@@ -0,0 +1,156 @@
+# app/services/hierarchie.py
+"""
+Arbre de l'offre de formation :
+Institution → Composante → Mention → Parcours → Niveau → Semestre → UE → EC.
+
+Chaque niveau est chargé pour tous ses parents à la fois : les tables de
+référence viennent du cache mémoire, les trois autres (parcours_niveaux,
+unités d'enseignement, éléments constitutifs) coûtent une requête chacune,
+quelle que soit la taille du sous-arbre. Le JSON produit est mis en cache par
+sous-arbre et invalidé au commit d'une écriture sur l'une des tables lues ;
+la racine est vérifiée hors cache, seuls les arbres existants sont conservés.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from sqlalchemy import select, inspect
+
+from app.core.cache import reference_cache
+from app.models import (
+    Institution, Composante, Mention, Parcours, ParcoursNiveau, Niveau, Semestre,
+    UniteEnseignement, ElementConstitutif,
+)
+from app.services.references import alignes, alire, alister, aobtenir, surveiller
+
+NIVEAUX = ("institution", "composante", "mention", "parcours", "niveau", "semestre", "ue", "ec")
+
+MODELES = {
+    "institution": Institution,
+    "composante": Composante,
+    "mention": Mention,
+    "parcours": Parcours,
+    "niveau": Niveau,
+    "semestre": Semestre,
+    "ue": UniteEnseignement,
+    "ec": ElementConstitutif,
+}
+
+TABLES_ARBRE = tuple(sorted(
+    {modele.__tablename__ for modele in MODELES.values()} | {ParcoursNiveau.__tablename__}
+))
+surveiller(ParcoursNiveau.__tablename__, UniteEnseignement.__tablename__, ElementConstitutif.__tablename__)
+
+
+def _cle(niveau, ligne):
+    return ligne[inspect(MODELES[niveau]).primary_key[0].key]
+
+
+def _noeud(niveau, ligne):
+    return {"type": niveau, "id": _cle(niveau, ligne), **ligne}
+
+
+def _par_parent(lignes, colonne, parents):
+    groupes = defaultdict(list)
+    for ligne in lignes:
+        if ligne[colonne] in parents:
+            groupes[ligne[colonne]].append(ligne)
+    return groupes
+
+
+def _actif(parcours, annee):
+    """ Parcours ouvert l'année universitaire `annee` (ex. "2024-2025" -> 2024). """
+    debut = int(annee[:4])
+    return ((parcours["date_creation"] is None or parcours["date_creation"] <= debut)
+            and (parcours["date_fin"] is None or parcours["date_fin"] >= debut))
+
+
+async def _enfants(db, niveau, parents, annee):
+    """ Enfants de tous les nœuds `parents` d'un niveau : dict id parent -> lignes. """
+    if niveau == "institution":
+        return _par_parent(await alister(db, Composante), "id_institution", parents)
+    if niveau == "composante":
+        return _par_parent(await alister(db, Mention), "composante_code", parents)
+    if niveau == "mention":
+        parcours = await alister(db, Parcours)
+        if annee:
+            parcours = [p for p in parcours if _actif(p, annee)]
+        return _par_parent(parcours, "mention_id", parents)
+    if niveau == "parcours":
+        niveaux = {n["code"]: n for n in await alister(db, Niveau)}
+        groupes = defaultdict(list)
+        for id_parcours, code_niveau, ordre in (await db.execute(
+            select(ParcoursNiveau.id_parcours, ParcoursNiveau.code_niveau, ParcoursNiveau.ordre_niveau_parcours)
+            .where(ParcoursNiveau.id_parcours.in_(parents))
+            .order_by(ParcoursNiveau.ordre_niveau_parcours, ParcoursNiveau.code_niveau)
+        )).all():
+            if code_niveau in niveaux:
+                groupes[id_parcours].append({**niveaux[code_niveau], "ordre_niveau_parcours": ordre})
+        return groupes
+    if niveau == "niveau":
+        return _par_parent(await alister(db, Semestre), "niveau_code", parents)
+    if niveau == "semestre":
+        ues = await alignes(db, (
+            select(UniteEnseignement).where(UniteEnseignement.code_semestre.in_(parents))
+            .order_by(UniteEnseignement.code_ue)
+        ))
+        return _par_parent(ues, "code_semestre", parents)
+    if niveau == "ue":
+        ecs = await alignes(db, (
+            select(ElementConstitutif).where(ElementConstitutif.id_ue.in_(parents))
+            .order_by(ElementConstitutif.code_ec)
+        ))
+        return _par_parent(ecs, "id_ue", parents)
+    return {}
+
+
+async def _racine(db, niveau, identifiant):
+    if niveau in ("ue", "ec"):
+        return await alire(db, MODELES[niveau], identifiant)
+    return await aobtenir(db, MODELES[niveau], identifiant)
+
+
+async def _construire(db, niveau, ligne, profondeur, annee):
+    racine = _noeud(niveau, ligne)
+    courants = {racine["id"]: [racine]}
+    rang = NIVEAUX.index(niveau)
+    dernier = len(NIVEAUX) - 1 if profondeur is None else min(rang + profondeur, len(NIVEAUX) - 1)
+
+    # Un niveau à la fois, pour tous les nœuds du niveau courant
+    for rang_parent in range(rang, dernier):
+        niveau_parent, niveau_enfant = NIVEAUX[rang_parent], NIVEAUX[rang_parent + 1]
+        enfants = await _enfants(db, niveau_parent, set(courants), annee)
+        suivants = defaultdict(list)
+        for id_parent, noeuds in courants.items():
+            for noeud in noeuds:
+                noeud["enfants"] = []
+                for ligne_enfant in enfants.get(id_parent, []):
+                    enfant = _noeud(niveau_enfant, ligne_enfant)
+                    noeud["enfants"].append(enfant)
+                    suivants[enfant["id"]].append(enfant)
+        courants = suivants
+        if not courants:
+            break
+
+    contenu = json.dumps(racine, default=str, ensure_ascii=False).encode("utf-8")
+    return contenu, f'W/"{hashlib.sha1(contenu).hexdigest()}"'
+
+
+async def aarbre(db, niveau, identifiant, profondeur=None, annee=None):
+    """
+    Sous-arbre sérialisé en JSON à partir d'un nœud : (octets, etag), ou None
+    si le nœud n'existe pas. `profondeur` limite le nombre de niveaux sous la
+    racine (None = jusqu'aux EC) ; `annee` ne garde que les parcours ouverts.
+    """
+    # Hors cache : un nœud inconnu n'occupe pas d'entrée, et un nœud créé par un
+    # autre worker est trouvé dès sa création (`aobtenir` vérifie la base)
+    ligne = await _racine(db, niveau, identifiant)
+    if ligne is None:
+        return None
+
+    async def charger():
+        return await _construire(db, niveau, ligne, profondeur, annee)
+
+    return await reference_cache.aget_or_load(
+        ("arbre", niveau, identifiant, profondeur, annee), TABLES_ARBRE, charger
+    )
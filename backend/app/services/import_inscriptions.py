@@ -0,0 +1,191 @@
+# app/services/import_inscriptions.py
+"""
+Import en masse des inscriptions depuis un fichier CSV/XLSX.
+
+Le fichier est lu en flux et validé par lots : année, mode d'inscription,
+parcours et semestre sont contrôlés sur des ensembles en mémoire (cache de
+référence), la couverture (parcours, semestre) sur `parcours_niveaux` chargée
+une fois, et l'existence des étudiants par une requête par lot. Les lignes
+valides passent par une table temporaire (COPY sous PostgreSQL) puis sont
+versées dans `inscriptions` par un seul INSERT ... SELECT ... ON CONFLICT
+sur `uq_etudiant_annee_parcours_semestre`. Étudiant et semestre y sont
+désignés par leur clé technique, résolue pendant la validation.
+"""
+import csv
+import hashlib
+import io
+
+from sqlalchemy import Table, Column, MetaData, String, Integer, select
+
+from app.core.cache import reference_cache
+from app.models import (
+    Inscription, Etudiant, ParcoursNiveau, Parcours, Semestre, AnneeUniversitaire, ModeInscription,
+)
+from app.services.lecture_tabulaire import iter_lignes, par_lots, valeur_texte
+from app.services.references import index, surveiller
+from app.services.upsert import upsert
+
+TAILLE_LOT = 5000
+MAX_ERREURS_RAPPORTEES = 1000
+
+COLONNES_INSCRIPTION = [
+    "code_inscription", "etudiant_id", "annee_universitaire", "id_parcours",
+    "semestre_id", "code_mode_inscription",
+]
+
+# Table de transit, propre à la transaction (ON COMMIT DROP sous PostgreSQL)
+inscriptions_import = Table(
+    "inscriptions_import",
+    MetaData(),
+    Column("ligne", Integer),
+    *[Column(nom, Integer if nom.endswith("_id") else String(100)) for nom in COLONNES_INSCRIPTION],
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+surveiller(ParcoursNiveau.__tablename__)
+
+
+def code_inscription(code_etudiant, annee_universitaire, id_parcours, code_semestre):
+    """ Code par défaut, déterministe : une ligne réimportée retombe sur la même inscription. """
+    code = f"{code_etudiant}_{annee_universitaire}_{id_parcours}_{code_semestre}"
+    if len(code) <= 100:
+        return code
+    return f"{code_etudiant}_{hashlib.sha1(code.encode('utf-8')).hexdigest()[:20]}"
+
+
+def _niveaux_des_parcours(db):
+    """ Ensemble (id_parcours, code_niveau), chargé une fois par version de la table. """
+    table = ParcoursNiveau.__tablename__
+    return reference_cache.get_or_load(
+        ("couverture", table), (table,),
+        lambda: frozenset(db.execute(select(ParcoursNiveau.id_parcours, ParcoursNiveau.code_niveau)).all()),
+    )
+
+
+def _creer_table_transit(db):
+    connexion = db.connection()
+    if connexion.dialect.name != "postgresql":
+        inscriptions_import.drop(connexion, checkfirst=True)
+    inscriptions_import.create(connexion)
+
+
+def _charger_lot(db, lignes):
+    """ COPY du lot dans la table de transit (INSERT multi-lignes hors PostgreSQL). """
+    connexion = db.connection()
+    colonnes = ["ligne", *COLONNES_INSCRIPTION]
+    if connexion.dialect.name != "postgresql":
+        connexion.execute(inscriptions_import.insert(), [{nom: ligne[nom] for nom in colonnes} for ligne in lignes])
+        return
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    for ligne in lignes:
+        ecrivain.writerow([ligne[nom] for nom in colonnes])
+    tampon.seek(0)
+    with connexion.connection.cursor() as curseur:
+        curseur.copy_expert(
+            f"COPY inscriptions_import ({', '.join(colonnes)}) FROM STDIN WITH (FORMAT csv)",
+            tampon,
+        )
+
+
+def importer_inscriptions(db, fichier, nom_fichier, annee_universitaire=None, code_mode_inscription=None):
+    """
+    Colonnes attendues : code_etudiant, id_parcours, code_semestre, et, si elles ne
+    sont pas fixées pour tout le fichier, annee_universitaire et code_mode_inscription.
+    code_inscription est facultatif. Une inscription existante voit son mode mis à jour.
+    Retourne un rapport {lignes_lues, inscriptions_importees, erreurs, nb_erreurs}.
+    La transaction est laissée à l'appelant.
+    """
+    annees = index(db, AnneeUniversitaire)
+    modes = index(db, ModeInscription)
+    parcours = index(db, Parcours)
+    semestres = index(db, Semestre)
+    couverture = _niveaux_des_parcours(db)
+
+    erreurs = []
+    nb_erreurs = 0
+    lignes_lues = 0
+    cles_vues = set()
+
+    def erreur(numero, message):
+        nonlocal nb_erreurs
+        nb_erreurs += 1
+        if len(erreurs) < MAX_ERREURS_RAPPORTEES:
+            erreurs.append({"ligne": numero, "erreur": message})
+
+    _creer_table_transit(db)
+
+    for lot in par_lots(iter_lignes(fichier, nom_fichier), TAILLE_LOT):
+        lignes_lues += len(lot)
+        candidates = []
+        for numero, ligne in lot:
+            code_etudiant = valeur_texte(ligne, "code_etudiant")
+            id_parcours = valeur_texte(ligne, "id_parcours", "parcours")
+            code_semestre = valeur_texte(ligne, "code_semestre", "semestre")
+            annee = annee_universitaire or valeur_texte(ligne, "annee_universitaire", "annee")
+            mode = code_mode_inscription or valeur_texte(ligne, "code_mode_inscription", "mode_inscription")
+            if not code_etudiant:
+                erreur(numero, "code_etudiant manquant")
+                continue
+            if annee not in annees:
+                erreur(numero, f"année universitaire '{annee}' inconnue")
+                continue
+            if mode not in modes:
+                erreur(numero, f"mode d'inscription '{mode}' inconnu")
+                continue
+            if id_parcours not in parcours:
+                erreur(numero, f"parcours '{id_parcours}' inconnu")
+                continue
+            if code_semestre not in semestres:
+                erreur(numero, f"semestre '{code_semestre}' inconnu")
+                continue
+            if (id_parcours, semestres[code_semestre]["niveau_code"]) not in couverture:
+                erreur(numero, f"le parcours '{id_parcours}' ne couvre pas le semestre '{code_semestre}'")
+                continue
+            cle = (code_etudiant, annee, id_parcours, code_semestre)
+            if cle in cles_vues:
+                erreur(numero, f"doublon pour {code_etudiant} / {id_parcours} / {code_semestre} ({annee})")
+                continue
+            cles_vues.add(cle)
+            candidates.append({
+                "ligne": numero,
+                "code_inscription": valeur_texte(ligne, "code_inscription") or code_inscription(*cle),
+                "code_etudiant": code_etudiant,
+                "annee_universitaire": annee,
+                "id_parcours": id_parcours,
+                "semestre_id": semestres[code_semestre]["semestre_id"],
+                "code_mode_inscription": mode,
+            })
+
+        if not candidates:
+            continue
+
+        # Étudiants du lot vérifiés (et leur clé technique résolue) en une requête
+        connus = dict(db.execute(
+            select(Etudiant.code_etudiant, Etudiant.etudiant_id).where(
+                Etudiant.code_etudiant.in_({c["code_etudiant"] for c in candidates})
+            )
+        ).all())
+        valides = []
+        for candidate in candidates:
+            if candidate["code_etudiant"] in connus:
+                valides.append({**candidate, "etudiant_id": connus[candidate["code_etudiant"]]})
+            else:
+                erreur(candidate["ligne"], f"étudiant '{candidate['code_etudiant']}' inconnu")
+        if valides:
+            _charger_lot(db, valides)
+
+    importees = upsert(
+        db, Inscription, "uq_etudiant_annee_parcours_semestre",
+        colonnes_maj=["code_mode_inscription"],
+        source=select(*[inscriptions_import.c[nom] for nom in COLONNES_INSCRIPTION]),
+        colonnes=COLONNES_INSCRIPTION,
+    )
+
+    return {
+        "lignes_lues": lignes_lues,
+        "inscriptions_importees": importees,
+        "nb_erreurs": nb_erreurs,
+        "erreurs": sorted(erreurs, key=lambda e: e["ligne"]),
+    }
@@ -0,0 +1,191 @@
+# app/services/import_notes.py
+"""
+Import en masse des notes depuis un fichier CSV/XLSX.
+
+Le fichier est lu en flux, validé par lots (étudiants inscrits, EC du périmètre,
+doublons sur `uq_etudiant_ec_annee_session`), chargé par COPY dans une table
+temporaire, puis versé dans `notes` par un seul INSERT ... SELECT ... ON CONFLICT.
+Les verrous sur `notes` ne sont donc tenus que le temps de cette dernière requête.
+Les codes du fichier sont traduits en clés techniques (`etudiant_id`, `ec_id`)
+lors de la validation : la table de transit ne contient que des entiers.
+"""
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import Table, Column, MetaData, String, Numeric, Integer, select, literal
+
+from app.models import Note, Inscription, Etudiant, Semestre, ElementConstitutif, UniteEnseignement
+from app.services.lecture_tabulaire import iter_lignes, par_lots, valeur_texte
+from app.services.propagation import marquer_notes
+from app.services.upsert import upsert
+
+TAILLE_LOT = 5000
+MAX_ERREURS_RAPPORTEES = 1000
+NOTE_MAX = Decimal("20")
+
+# Table de transit, propre à la transaction (ON COMMIT DROP sous PostgreSQL)
+notes_import = Table(
+    "notes_import",
+    MetaData(),
+    Column("ligne", Integer),
+    Column("etudiant_id", Integer),
+    Column("ec_id", Integer),
+    Column("valeur_note", Numeric(5, 2)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def _parse_note(brute):
+    if brute is None:
+        raise ValueError("note manquante")
+    try:
+        valeur = Decimal(str(brute).replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"note invalide '{brute}'")
+    if not Decimal(0) <= valeur <= NOTE_MAX:
+        raise ValueError(f"note hors barème (0-{NOTE_MAX}) : {valeur}")
+    return valeur.quantize(Decimal("0.01"))
+
+
+def _creer_table_transit(db):
+    connexion = db.connection()
+    if connexion.dialect.name != "postgresql":
+        notes_import.drop(connexion, checkfirst=True)
+    notes_import.create(connexion)
+
+
+def _charger_lot(db, lignes):
+    """ COPY du lot dans la table de transit (INSERT multi-lignes hors PostgreSQL). """
+    connexion = db.connection()
+    if connexion.dialect.name != "postgresql":
+        connexion.execute(notes_import.insert(), lignes)
+        return
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    for ligne in lignes:
+        ecrivain.writerow((ligne["ligne"], ligne["etudiant_id"], ligne["ec_id"], ligne["valeur_note"]))
+    tampon.seek(0)
+    with connexion.connection.cursor() as curseur:
+        curseur.copy_expert(
+            "COPY notes_import (ligne, etudiant_id, ec_id, valeur_note) FROM STDIN WITH (FORMAT csv)",
+            tampon,
+        )
+
+
+def importer_notes(db, fichier, nom_fichier, annee_universitaire, code_session, id_ec=None, code_semestre=None):
+    """
+    Importe les notes d'un EC (`id_ec`) ou d'un semestre entier (`code_semestre`).
+    Colonnes attendues : code_etudiant, valeur_note (ou note), et id_ec en mode semestre.
+    Retourne un rapport {lignes_lues, notes_importees, erreurs, nb_erreurs}.
+    La transaction est laissée à l'appelant.
+    """
+    # Périmètre des EC autorisés et semestre d'inscription à vérifier
+    requete_ecs = select(
+        ElementConstitutif.id_ec, UniteEnseignement.code_semestre, ElementConstitutif.ec_id,
+    ).join(UniteEnseignement)
+    if id_ec is not None:
+        requete_ecs = requete_ecs.where(ElementConstitutif.id_ec == id_ec)
+    else:
+        requete_ecs = requete_ecs.where(UniteEnseignement.code_semestre == code_semestre)
+    # id_ec -> (code du semestre, clé technique de l'EC)
+    semestre_par_ec = {ec: (semestre, ec_id) for ec, semestre, ec_id in db.execute(requete_ecs)}
+    if not semestre_par_ec:
+        raise ValueError("Aucun élément constitutif dans le périmètre de l'import")
+    semestres = {semestre for semestre, _ in semestre_par_ec.values()}
+
+    erreurs = []
+    nb_erreurs = 0
+    lignes_lues = 0
+    cles_vues = set()
+    cles_importees = set()
+
+    def erreur(numero, message):
+        nonlocal nb_erreurs
+        nb_erreurs += 1
+        if len(erreurs) < MAX_ERREURS_RAPPORTEES:
+            erreurs.append({"ligne": numero, "erreur": message})
+
+    _creer_table_transit(db)
+
+    for lot in par_lots(iter_lignes(fichier, nom_fichier), TAILLE_LOT):
+        lignes_lues += len(lot)
+        candidates = []
+        for numero, ligne in lot:
+            code_etudiant = valeur_texte(ligne, "code_etudiant")
+            ec = id_ec or valeur_texte(ligne, "id_ec", "code_ec")
+            if not code_etudiant:
+                erreur(numero, "code_etudiant manquant")
+                continue
+            if ec not in semestre_par_ec:
+                erreur(numero, f"EC '{ec}' hors du périmètre de l'import")
+                continue
+            try:
+                note = _parse_note(valeur_texte(ligne, "valeur_note", "note"))
+            except ValueError as exc:
+                erreur(numero, str(exc))
+                continue
+            if (code_etudiant, ec) in cles_vues:
+                erreur(numero, f"doublon pour {code_etudiant} / {ec}")
+                continue
+            cles_vues.add((code_etudiant, ec))
+            candidates.append({"ligne": numero, "code_etudiant": code_etudiant, "id_ec": ec, "valeur_note": note})
+
+        if not candidates:
+            continue
+
+        # Inscriptions du lot vérifiées en une requête : (code étudiant, semestre) -> etudiant_id
+        inscrits = {
+            (code, semestre): etudiant_id
+            for code, semestre, etudiant_id in db.execute(
+                select(Etudiant.code_etudiant, Semestre.code_semestre, Etudiant.etudiant_id).distinct()
+                .join(Inscription, Inscription.etudiant_id == Etudiant.etudiant_id)
+                .join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+                .where(
+                    Inscription.annee_universitaire == annee_universitaire,
+                    Semestre.code_semestre.in_(semestres),
+                    Etudiant.code_etudiant.in_({c["code_etudiant"] for c in candidates}),
+                )
+            )
+        }
+        valides = []
+        for candidate in candidates:
+            semestre, ec_id = semestre_par_ec[candidate["id_ec"]]
+            etudiant_id = inscrits.get((candidate["code_etudiant"], semestre))
+            if etudiant_id is not None:
+                valides.append({
+                    "ligne": candidate["ligne"], "etudiant_id": etudiant_id,
+                    "ec_id": ec_id, "valeur_note": candidate["valeur_note"],
+                })
+                cles_importees.add((etudiant_id, ec_id))
+            else:
+                erreur(candidate["ligne"], f"étudiant '{candidate['code_etudiant']}' non inscrit au semestre")
+        if valides:
+            _charger_lot(db, valides)
+
+    source = select(
+        notes_import.c.etudiant_id,
+        notes_import.c.ec_id,
+        literal(annee_universitaire, String).label("annee_universitaire"),
+        literal(code_session, String).label("code_session"),
+        notes_import.c.valeur_note,
+    )
+    importees = upsert(
+        db, Note, "uq_etudiant_ec_annee_session",
+        colonnes_maj=["valeur_note"],
+        source=source,
+        colonnes=["etudiant_id", "ec_id", "annee_universitaire", "code_session", "valeur_note"],
+    )
+
+    # Les résultats dépendants seront recalculés au commit
+    marquer_notes(db, {
+        (etudiant_id, ec_id, annee_universitaire, code_session) for etudiant_id, ec_id in cles_importees
+    })
+
+    return {
+        "lignes_lues": lignes_lues,
+        "notes_importees": importees,
+        "nb_erreurs": nb_erreurs,
+        "erreurs": erreurs,
+    }
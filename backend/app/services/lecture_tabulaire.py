@@ -0,0 +1,87 @@
+# app/services/lecture_tabulaire.py
+"""
+Lecture en flux de fichiers tabulaires (CSV ou XLSX) ligne par ligne,
+sans charger le fichier entier en mémoire.
+"""
+import csv
+import io
+from itertools import islice
+
+
+class FormatFichierError(ValueError):
+    """ Fichier illisible ou format non supporté. """
+
+
+def _normaliser_entete(valeur):
+    return str(valeur or "").strip().lower().replace(" ", "_")
+
+
+def _lignes_csv(fichier):
+    texte = io.TextIOWrapper(fichier, encoding="utf-8-sig", newline="")
+    debut = texte.read(4096)
+    texte.seek(0)
+    try:
+        dialecte = csv.Sniffer().sniff(debut, delimiters=";,\t")
+    except csv.Error:
+        dialecte = csv.excel
+    lecteur = csv.reader(texte, dialecte)
+    try:
+        yield from lecteur
+    finally:
+        texte.detach()
+
+
+def _lignes_xlsx(fichier):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise FormatFichierError("Lecture XLSX indisponible (openpyxl non installé)") from exc
+    classeur = load_workbook(fichier, read_only=True, data_only=True)
+    try:
+        for ligne in classeur.active.iter_rows(values_only=True):
+            yield ["" if v is None else v for v in ligne]
+    finally:
+        classeur.close()
+
+
+def iter_lignes(fichier, nom_fichier):
+    """
+    Itère sur les lignes d'un CSV (séparateur ; , ou tabulation) ou d'un XLSX.
+    Produit des tuples (numero_ligne, dict colonne -> valeur), la 1re ligne étant l'en-tête.
+    """
+    nom = (nom_fichier or "").lower()
+    if nom.endswith(".xlsx"):
+        lignes = _lignes_xlsx(fichier)
+    elif nom.endswith((".csv", ".txt")):
+        lignes = _lignes_csv(fichier)
+    else:
+        raise FormatFichierError("Format non supporté (CSV ou XLSX attendu)")
+
+    entete = next(lignes, None)
+    if not entete:
+        raise FormatFichierError("Fichier vide")
+    colonnes = [_normaliser_entete(c) for c in entete]
+
+    for numero, valeurs in enumerate(lignes, start=2):
+        if not any(str(v).strip() for v in valeurs):
+            continue
+        yield numero, dict(zip(colonnes, valeurs))
+
+
+def par_lots(iterable, taille):
+    """ Découpe un itérable en listes de `taille` éléments au plus. """
+    iterateur = iter(iterable)
+    while lot := list(islice(iterateur, taille)):
+        yield lot
+
+
+def valeur_texte(ligne, *noms):
+    """ Première valeur non vide parmi les colonnes `noms`, en texte épuré. """
+    for nom in noms:
+        valeur = ligne.get(nom)
+        if valeur not in (None, ""):
+            # Les cellules XLSX numériques arrivent en float (ex: 1234.0 pour un code)
+            if isinstance(valeur, float) and valeur.is_integer():
+                valeur = int(valeur)
+            return str(valeur).strip()
+    return None
@@ -0,0 +1,191 @@
+# app/services/medias.py
+"""
+Stockage des médias (logos, photos, scans) adressé par le contenu.
+
+Un fichier envoyé est haché (SHA-256) pendant sa copie : sa clé est
+`<empreinte>.<extension>`, c'est elle qui est enregistrée dans les colonnes
+`*_path` des modèles. Un contenu déjà présent n'est pas stocké deux fois, et
+une clé ne désigne jamais qu'un seul contenu : les réponses peuvent être
+mises en cache sans limite (`immutable`).
+
+Arborescence sous MEDIA_DIR :
+    originaux/ab/abcd....jpg
+    miniatures/160/ab/abcd....webp
+
+Les miniatures (MEDIA_MINIATURES) sont produites une seule fois, dans le pool
+de processus ; sans Pillow, les images sont servies en taille d'origine.
+"""
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.workers import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+TAILLE_MORCEAU = 1024 * 1024
+
+# Signature des premiers octets -> (extension, type MIME)
+SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png", "image/png"),
+    (b"GIF87a", "gif", "image/gif"),
+    (b"GIF89a", "gif", "image/gif"),
+    (b"%PDF-", "pdf", "application/pdf"),
+)
+TYPES_MIME = {extension: mime for _, extension, mime in SIGNATURES}
+TYPES_MIME["webp"] = "image/webp"
+IMAGES = {"jpg", "png", "gif", "webp"}
+
+CLE_VALIDE = re.compile(r"^[0-9a-f]{64}\.(jpg|png|gif|webp|pdf)$")
+
+
+class MediaInvalide(ValueError):
+    """ Fichier refusé (type non reconnu, taille excessive). """
+
+
+def _racine():
+    return Path(settings.MEDIA_DIR)
+
+
+def _type_fichier(debut):
+    for signature, extension, _ in SIGNATURES:
+        if debut.startswith(signature):
+            return extension
+    if debut[:4] == b"RIFF" and debut[8:12] == b"WEBP":
+        return "webp"
+    raise MediaInvalide("Type de fichier non supporté (JPEG, PNG, GIF, WebP ou PDF attendu)")
+
+
+def chemin_original(cle):
+    return _racine() / "originaux" / cle[:2] / cle
+
+
+def chemin_miniature(cle, taille):
+    return _racine() / "miniatures" / str(taille) / cle[:2] / f"{cle.rsplit('.', 1)[0]}.webp"
+
+
+def cle_valide(cle):
+    return bool(cle and CLE_VALIDE.match(cle))
+
+
+def type_mime(cle):
+    return TYPES_MIME[cle.rsplit(".", 1)[1]]
+
+
+def url_media(cle, taille=None):
+    """ URL publique d'un média (miniature si `taille`), ou None si la clé n'en est pas une. """
+    if not cle_valide(cle):
+        return None
+    return f"/api/medias/{cle}" + (f"?taille={taille}" if taille else "")
+
+
+def taille_miniature(demandee):
+    """ Plus petite miniature au moins aussi grande que la demande (sinon la plus grande). """
+    tailles = sorted(settings.MEDIA_MINIATURES)
+    return next((taille for taille in tailles if taille >= demandee), tailles[-1])
+
+
+# -------------------------------------------------------------------
+# --- ENREGISTREMENT ---
+# -------------------------------------------------------------------
+
+def enregistrer(fichier):
+    """
+    Copie le flux `fichier` dans le stockage en le hachant, sans le charger en mémoire.
+    Retourne (clé, nouveau) ; `nouveau` est faux si le contenu était déjà stocké.
+    """
+    dossier_tmp = _racine() / "tmp"
+    dossier_tmp.mkdir(parents=True, exist_ok=True)
+    empreinte = hashlib.sha256()
+    taille = 0
+    extension = None
+    with tempfile.NamedTemporaryFile(dir=dossier_tmp, delete=False) as tmp:
+        try:
+            while morceau := fichier.read(TAILLE_MORCEAU):
+                if extension is None:
+                    extension = _type_fichier(morceau[:16])
+                taille += len(morceau)
+                if taille > settings.MEDIA_TAILLE_MAX:
+                    raise MediaInvalide(f"Fichier trop volumineux (max {settings.MEDIA_TAILLE_MAX} octets)")
+                empreinte.update(morceau)
+                tmp.write(morceau)
+            if extension is None:
+                raise MediaInvalide("Fichier vide")
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+
+    cle = f"{empreinte.hexdigest()}.{extension}"
+    destination = chemin_original(cle)
+    if destination.exists():
+        os.unlink(tmp.name)
+        return cle, False
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(tmp.name, destination)  # atomique : jamais de fichier partiel sous une clé
+    return cle, True
+
+
+# -------------------------------------------------------------------
+# --- MINIATURES (pool de processus) ---
+# -------------------------------------------------------------------
+
+def _produire_miniatures(source, cibles):
+    """ Exécuté dans un processus du pool : `cibles` = [(taille, chemin)]. Retourne les tailles produites. """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return []
+    produites = []
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for taille, chemin in sorted(cibles, reverse=True):
+            image.thumbnail((taille, taille))
+            chemin = Path(chemin)
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            tmp = chemin.with_suffix(f".{os.getpid()}.tmp")
+            image.save(tmp, "WEBP", quality=80)
+            os.replace(tmp, chemin)
+            produites.append(taille)
+    return produites
+
+
+def generer_miniatures(cle, tailles=None):
+    """
+    Produit (dans le pool de processus) les miniatures manquantes d'une image.
+    Bloquant : à appeler depuis une route synchrone ou un thread.
+    """
+    if not cle_valide(cle) or cle.rsplit(".", 1)[1] not in IMAGES:
+        return []
+    cibles = [
+        (taille, str(chemin_miniature(cle, taille)))
+        for taille in (tailles or settings.MEDIA_MINIATURES)
+        if not chemin_miniature(cle, taille).exists()
+    ]
+    if not cibles:
+        return []
+    try:
+        return get_process_pool().submit(_produire_miniatures, str(chemin_original(cle)), cibles).result()
+    except Exception as exc:
+        logger.warning("Miniatures de %s impossibles : %s", cle, exc)
+        return []
+
+
+def fichier_a_servir(cle, taille=None):
+    """ (chemin, type MIME, ETag) du fichier à envoyer, ou None si le média n'existe pas. """
+    original = chemin_original(cle)
+    if not original.exists():
+        return None
+    if taille and cle.rsplit(".", 1)[1] in IMAGES:
+        taille = taille_miniature(taille)
+        miniature = chemin_miniature(cle, taille)
+        if miniature.exists() or generer_miniatures(cle, [taille]):
+            return miniature, "image/webp", f'"{cle}-{taille}"'
+    return original, type_mime(cle), f'"{cle}"'
@@ -0,0 +1,158 @@
+# app/services/propagation.py
+"""
+Propagation incrémentale des changements de notes.
+
+Chaque modification d'une `Note` (ORM ou import en masse) marque la clé
+(etudiant_id, ec_id, annee_universitaire, code_session) comme « sale » dans
+`session.info`. Au commit, seules les lignes dépendantes sont recalculées,
+dans la même transaction :
+
+    Note -> ResultatUE -> ResultatSemestre -> Inscription (crédits, validation)
+         -> SuiviCreditCycle
+
+Chaque niveau est une seule requête ciblée (pas de recalcul du semestre entier).
+Les statistiques du tableau de bord (groupes parcours/semestre touchés) sont
+rafraîchies après le commit, dans une transaction séparée.
+"""
+from collections import defaultdict
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models import Note, ElementConstitutif, UniteEnseignement, Semestre, ResultatUE
+from app.services.archives import verifier_non_archivee
+from app.services.resultats import (
+    SESSIONS_ORDRE, upsert_resultats_ue, upsert_resultats_semestre,
+    maj_credits_inscriptions, upsert_suivi_credits_cycles,
+)
+from app.services.statistiques import marquer_groupes, rafraichir_groupes_marques, oublier_groupes_marques
+
+CLE_NOTES_SALES = "notes_sales"
+
+
+def marquer_notes(db, cles):
+    """
+    Marque des clés (etudiant_id, ec_id, annee_universitaire, code_session) à recalculer.
+    Lève AnneeArchivee si l'une d'elles porte sur une année archivée (lecture seule) :
+    appelée avant le flush, l'écriture est refusée avant d'atteindre la base.
+    """
+    for annee_universitaire in {cle[2] for cle in cles}:
+        verifier_non_archivee(annee_universitaire)
+    db.info.setdefault(CLE_NOTES_SALES, set()).update(cles)
+
+
+def _cles_note(note):
+    """ Clé courante d'une note, plus l'ancienne si une colonne de la clé a changé. """
+    cles = {(note.etudiant_id, note.ec_id, note.annee_universitaire, note.code_session)}
+    etat = inspect(note)
+    anciennes = [
+        etat.attrs[attr].history.deleted
+        for attr in ("etudiant_id", "ec_id", "annee_universitaire", "code_session")
+    ]
+    if any(anciennes):
+        cles.add(tuple(
+            ancien[0] if ancien else getattr(note, attr)
+            for ancien, attr in zip(anciennes, ("etudiant_id", "ec_id", "annee_universitaire", "code_session"))
+        ))
+    return cles
+
+
+def _sessions_impactees(db, annee_universitaire, code_session, etudiants, ues):
+    """
+    Une note de session N compte aussi en rattrapage : les sessions suivantes sont
+    recalculées, mais uniquement pour les étudiants qui y ont déjà un résultat.
+    """
+    yield code_session, etudiants
+    if code_session not in SESSIONS_ORDRE:
+        return
+    for suivante in SESSIONS_ORDRE[SESSIONS_ORDRE.index(code_session) + 1:]:
+        concernes = set(db.scalars(
+            select(ResultatUE.etudiant_id).distinct().where(
+                ResultatUE.annee_universitaire == annee_universitaire,
+                ResultatUE.code_session == suivante,
+                ResultatUE.ue_id.in_(ues),
+                ResultatUE.etudiant_id.in_(etudiants),
+            )
+        ))
+        if concernes:
+            yield suivante, concernes
+
+
+def propager(db):
+    """ Recalcule les résultats dépendant des notes marquées, puis vide la liste. """
+    cles = db.info.pop(CLE_NOTES_SALES, None)
+    if not cles:
+        return
+
+    # EC -> (UE, semestre) en une requête
+    ecs = {cle[1] for cle in cles}
+    ue_par_ec = {
+        ec_id: (ue_id, code_semestre, semestre_id)
+        for ec_id, ue_id, code_semestre, semestre_id in db.execute(
+            select(
+                ElementConstitutif.ec_id, UniteEnseignement.ue_id,
+                UniteEnseignement.code_semestre, Semestre.semestre_id,
+            )
+            .join(UniteEnseignement, UniteEnseignement.id_ue == ElementConstitutif.id_ue)
+            .join(Semestre, Semestre.code_semestre == UniteEnseignement.code_semestre)
+            .where(ElementConstitutif.ec_id.in_(ecs))
+        )
+    }
+    id_par_semestre = {code_semestre: semestre_id for _, code_semestre, semestre_id in ue_par_ec.values()}
+
+    # Regroupement par (année, session) : étudiants et UE touchés
+    groupes = defaultdict(lambda: (set(), set(), set()))
+    for etudiant_id, ec_id, annee, code_session in cles:
+        if ec_id not in ue_par_ec:
+            continue
+        ue_id, code_semestre, _ = ue_par_ec[ec_id]
+        etudiants, ues, semestres = groupes[(annee, code_session)]
+        etudiants.add(etudiant_id)
+        ues.add(ue_id)
+        semestres.add(code_semestre)
+
+    credits_par_annee = defaultdict(set)
+    for (annee, code_session), (etudiants, ues, semestres) in groupes.items():
+        for session_cible, concernes in _sessions_impactees(db, annee, code_session, etudiants, ues):
+            upsert_resultats_ue(db, annee, session_cible, etudiants=concernes, ues=ues)
+            upsert_resultats_semestre(db, annee, session_cible, etudiants=concernes, semestres=semestres)
+            marquer_groupes(db, annee, session_cible, concernes, semestres)
+        credits_par_annee[annee].update(
+            (etudiant_id, id_par_semestre[code_semestre]) for etudiant_id in etudiants for code_semestre in semestres
+        )
+
+    etudiants_touches = set()
+    for annee, paires in credits_par_annee.items():
+        maj_credits_inscriptions(db, annee, paires)
+        etudiants_touches.update(etudiant_id for etudiant_id, _ in paires)
+    upsert_suivi_credits_cycles(db, etudiants_touches)
+
+
+# -------------------------------------------------------------------
+# --- ÉCOUTEURS DE SESSION ---
+# -------------------------------------------------------------------
+
+@event.listens_for(Session, "before_flush")
+def _collecter_notes_modifiees(session, flush_context, instances):
+    cles = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Note):
+            cles |= _cles_note(obj)
+    if cles:
+        marquer_notes(session, cles)
+
+
+@event.listens_for(Session, "before_commit")
+def _propager_avant_commit(session):
+    session.flush()
+    propager(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _statistiques_apres_commit(session):
+    rafraichir_groupes_marques(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _oublier_apres_rollback(session):
+    oublier_groupes_marques(session)
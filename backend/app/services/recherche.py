@@ -0,0 +1,60 @@
+# app/services/recherche.py
+"""
+Recherche floue des étudiants et des enseignants.
+
+Les conditions portent sur les mêmes expressions que les index GIN trigrammes
+définis dans `app.models` (minuscules, sans accents) : `%>` (similarité de mots)
+pour les fautes de frappe, LIKE '%x%' pour les fragments. Tri par pertinence.
+"""
+from sqlalchemy import select, func, or_
+
+from app.models import (
+    Etudiant, Enseignant,
+    RECHERCHE_ETUDIANT_NOM, RECHERCHE_ETUDIANT_IDENTIFIANTS, RECHERCHE_ENSEIGNANT,
+)
+
+
+def _normaliser(q):
+    return func.immutable_unaccent(func.lower(q))
+
+
+def _echapper_like(q):
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _correspond(expression, q):
+    motif = "%" + _echapper_like(q) + "%"
+    return or_(
+        expression.op("%>")(_normaliser(q)),
+        expression.like(_normaliser(motif), escape="\\"),
+    )
+
+
+def requete_etudiants(q, limite):
+    score = func.greatest(
+        func.word_similarity(_normaliser(q), RECHERCHE_ETUDIANT_NOM),
+        func.word_similarity(_normaliser(q), RECHERCHE_ETUDIANT_IDENTIFIANTS),
+    )
+    return (
+        select(
+            Etudiant.code_etudiant, Etudiant.nom, Etudiant.prenoms,
+            Etudiant.numero_inscription, Etudiant.cin, Etudiant.telephone,
+            score.label("score"),
+        )
+        .where(or_(_correspond(RECHERCHE_ETUDIANT_NOM, q), _correspond(RECHERCHE_ETUDIANT_IDENTIFIANTS, q)))
+        .order_by(score.desc(), Etudiant.nom)
+        .limit(limite)
+    )
+
+
+def requete_enseignants(q, limite):
+    score = func.word_similarity(_normaliser(q), RECHERCHE_ENSEIGNANT)
+    return (
+        select(
+            Enseignant.id_enseignant, Enseignant.matricule, Enseignant.nom,
+            Enseignant.prenoms, Enseignant.grade, score.label("score"),
+        )
+        .where(_correspond(RECHERCHE_ENSEIGNANT, q))
+        .order_by(score.desc(), Enseignant.nom)
+        .limit(limite)
+    )
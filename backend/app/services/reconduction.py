@@ -0,0 +1,97 @@
+# app/services/reconduction.py
+"""
+Reconduction d'une année universitaire : copie des volumes horaires, des
+affectations et des jurys de l'année précédente (selon `ordre_annee`)
+vers une nouvelle année, pour être ensuite ajustés.
+
+Chaque table est copiée côté serveur par un INSERT ... SELECT ... ON CONFLICT
+DO NOTHING sur sa contrainte d'unicité (`uq_ec_vh_type_annee`,
+`uq_affectation_unique`, `uq_jury_unique`) : les lignes déjà saisies pour la
+nouvelle année sont conservées. Le tout dans la transaction de l'appelant.
+La simulation compte, pour chaque table, les lignes à copier et celles déjà présentes.
+"""
+from sqlalchemy import select, func, case, exists, literal, String
+
+from app.models import AnneeUniversitaire, VolumeHoraireEC, AffectationEC, Jury
+from app.services.references import lister
+from app.services.upsert import upsert, colonnes_contrainte
+
+# Élément -> (modèle, contrainte, colonnes copiées telles quelles)
+ELEMENTS = {
+    "volumes_horaires": (
+        VolumeHoraireEC, "uq_ec_vh_type_annee",
+        ["id_ec", "code_type_enseignement", "volume_heure"],
+    ),
+    "affectations": (
+        AffectationEC, "uq_affectation_unique",
+        ["id_enseignant", "id_ec", "code_type_enseignement", "volume_heure_effectif"],
+    ),
+    # Nouvelle nomination : date à renseigner
+    "jurys": (Jury, "uq_jury_unique", ["id_enseignant", "code_semestre"]),
+}
+
+
+def annee_precedente(db, annee_universitaire):
+    """ Année d'`ordre_annee` immédiatement inférieur, ou None. """
+    annees = {ligne["annee"]: ligne["ordre_annee"] for ligne in lister(db, AnneeUniversitaire)}
+    ordre = annees.get(annee_universitaire)
+    if ordre is None:
+        return None
+    precedentes = [(o, annee) for annee, o in annees.items() if o < ordre]
+    return max(precedentes)[1] if precedentes else None
+
+
+def _source(modele, colonnes, annee_source, annee_cible):
+    return select(
+        *[getattr(modele, nom) for nom in colonnes],
+        literal(annee_cible, String).label("annee_universitaire"),
+    ).where(modele.annee_universitaire == annee_source)
+
+
+def _compter(db, modele, contrainte, annee_source, annee_cible):
+    """ (lignes de l'année source, dont déjà présentes dans l'année cible). """
+    cible = modele.__table__.alias("cible")
+    cle = [nom for nom in colonnes_contrainte(modele, contrainte) if nom != "annee_universitaire"]
+    deja = exists().where(
+        cible.c.annee_universitaire == annee_cible,
+        *[cible.c[nom] == getattr(modele, nom) for nom in cle],
+    )
+    total, presentes = db.execute(
+        select(func.count(), func.coalesce(func.sum(case((deja, 1), else_=0)), 0))
+        .where(modele.annee_universitaire == annee_source)
+    ).one()
+    return total, presentes
+
+
+def reconduire(db, annee_cible, annee_source=None, elements=tuple(ELEMENTS), simulation=False):
+    """
+    Copie `elements` de `annee_source` (par défaut l'année précédente) vers `annee_cible`.
+    Retourne par élément : lignes source, déjà présentes, à copier (simulation) ou copiées.
+    Lève ValueError si aucune année source n'est disponible.
+    """
+    annee_source = annee_source or annee_precedente(db, annee_cible)
+    if annee_source is None:
+        raise ValueError(f"Aucune année antérieure à {annee_cible}")
+    if annee_source == annee_cible:
+        raise ValueError("L'année source et l'année cible sont identiques")
+
+    rapport = {}
+    for nom in elements:
+        modele, contrainte, colonnes = ELEMENTS[nom]
+        total, presentes = _compter(db, modele, contrainte, annee_source, annee_cible)
+        ligne = {"source": total, "deja_presentes": presentes}
+        if simulation:
+            ligne["a_copier"] = total - presentes
+        else:
+            ligne["copiees"] = upsert(
+                db, modele, contrainte, colonnes_maj=[],
+                source=_source(modele, colonnes, annee_source, annee_cible),
+                colonnes=colonnes + ["annee_universitaire"],
+            )
+        rapport[nom] = ligne
+    return {
+        "annee_source": annee_source,
+        "annee_cible": annee_cible,
+        "simulation": simulation,
+        "elements": rapport,
+    }
@@ -0,0 +1,208 @@
+# app/services/references.py
+"""
+Lecture des tables de référence (hiérarchie LMD et listes de valeurs) via le cache mémoire.
+
+Les écritures sur ces tables, qu'elles passent par l'ORM ou par un
+INSERT/UPDATE/DELETE exécuté dans une session, invalident la table au commit.
+"""
+import hashlib
+import json
+
+from sqlalchemy import event, select, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import reference_cache
+from app.models import (
+    Institution, Composante, Domaine, Mention, Parcours, Cycle, Niveau, Semestre,
+    SessionExamen, TypeFormation, ModeInscription, TypeEnseignement, AnneeUniversitaire,
+)
+
+MODELES_REFERENCE = (
+    Institution, Composante, Domaine, Mention, Parcours, Cycle, Niveau, Semestre,
+    SessionExamen, TypeFormation, ModeInscription, TypeEnseignement, AnneeUniversitaire,
+)
+TABLES_REFERENCE = {modele.__tablename__ for modele in MODELES_REFERENCE}
+
+CLE_TABLES_MODIFIEES = "tables_reference_modifiees"
+
+
+def _ligne(objet):
+    """ Copie détachée des colonnes d'un objet (partageable entre sessions). """
+    return {col.key: getattr(objet, col.key) for col in inspect(objet).mapper.column_attrs}
+
+
+def _cle_primaire(modele):
+    return inspect(modele).primary_key[0].key
+
+
+def _requete(modele):
+    # Ordre stable : même contenu => même empreinte
+    return select(modele).order_by(*inspect(modele).primary_key)
+
+
+def _empreinte(lignes):
+    """ Empreinte du contenu, utilisée comme ETag des réponses construites sur la table. """
+    contenu = json.dumps(lignes, default=str, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(contenu).hexdigest()
+
+
+def _charger(lignes):
+    return lignes, _empreinte(lignes)
+
+
+def _lister_avec_empreinte(db, modele):
+    table = modele.__tablename__
+    return reference_cache.get_or_load(
+        ("liste", table), (table,),
+        lambda: _charger([_ligne(obj) for obj in db.scalars(_requete(modele))]),
+    )
+
+
+async def _alister_avec_empreinte(db, modele):
+    table = modele.__tablename__
+
+    async def charger():
+        return _charger([_ligne(obj) for obj in (await db.scalars(_requete(modele)))])
+
+    return await reference_cache.aget_or_load(("liste", table), (table,), charger)
+
+
+def lister(db, modele):
+    """ Toutes les lignes d'une table de référence (liste de dicts, à ne pas modifier). """
+    return _lister_avec_empreinte(db, modele)[0]
+
+
+async def alister(db, modele):
+    """ Variante de `lister` pour une AsyncSession. """
+    return (await _alister_avec_empreinte(db, modele))[0]
+
+
+def empreinte(db, modele):
+    """ Empreinte du contenu en cache de la table (change à chaque modification). """
+    return _lister_avec_empreinte(db, modele)[1]
+
+
+async def aempreinte(db, modele):
+    return (await _alister_avec_empreinte(db, modele))[1]
+
+
+def _construire_index(modele, lignes):
+    cle = _cle_primaire(modele)
+    return {ligne[cle]: ligne for ligne in lignes}
+
+
+def index(db, modele):
+    """ Dict clé primaire -> ligne, construit une fois par version de la table. """
+    table = modele.__tablename__
+    return reference_cache.get_or_load(
+        ("index", table), (table,),
+        lambda: _construire_index(modele, lister(db, modele)),
+    )
+
+
+async def aindex(db, modele):
+    table = modele.__tablename__
+
+    async def charger():
+        return _construire_index(modele, await alister(db, modele))
+
+    return await reference_cache.aget_or_load(("index", table), (table,), charger)
+
+
+def _absente_du_cache(modele, objet):
+    """
+    Clé absente de l'index en cache mais lue en base : la ligne a été créée par un
+    autre worker (l'invalidation au commit est locale au processus). La version en
+    cache est périmée : elle est invalidée pour être rechargée à la prochaine lecture.
+    """
+    if objet is None:
+        return None
+    reference_cache.invalider(modele.__tablename__)
+    return _ligne(objet)
+
+
+def obtenir(db, modele, cle):
+    """
+    Ligne d'une table de référence par clé primaire, ou None. Une clé absente du
+    cache est vérifiée en base avant de conclure qu'elle n'existe pas.
+    """
+    ligne = index(db, modele).get(cle)
+    if ligne is None:
+        ligne = _absente_du_cache(modele, db.get(modele, cle))
+    return ligne
+
+
+async def aobtenir(db, modele, cle):
+    ligne = (await aindex(db, modele)).get(cle)
+    if ligne is None:
+        ligne = _absente_du_cache(modele, await db.get(modele, cle))
+    return ligne
+
+
+async def alire(db, modele, cle):
+    """
+    Ligne d'une table hors cache (UE, EC...) par clé primaire, lue en base, sous la
+    même forme que `aobtenir` (dict détaché), ou None.
+    """
+    objet = await db.get(modele, cle)
+    return _ligne(objet) if objet is not None else None
+
+
+async def alignes(db, stmt):
+    """ Lignes (dicts détachés) d'une requête `select(modele)`, lues en base. """
+    return [_ligne(objet) for objet in (await db.scalars(stmt)).all()]
+
+
+def prechauffer(db):
+    """ Charge en cache toutes les tables de référence (après le démarrage du worker). """
+    for modele in MODELES_REFERENCE:
+        index(db, modele)
+
+
+# -------------------------------------------------------------------
+# --- INVALIDATION SUR ÉCRITURE ---
+# -------------------------------------------------------------------
+
+# Tables dont les écritures invalident le cache : les tables de référence,
+# plus celles enregistrées par les services qui mettent d'autres lectures en cache
+TABLES_SURVEILLEES = set(TABLES_REFERENCE)
+
+
+def surveiller(*tables):
+    """ Invalide aussi le cache au commit d'une écriture sur ces tables. """
+    TABLES_SURVEILLEES.update(tables)
+
+
+def _noter_tables(session, tables):
+    tables = set(tables) & TABLES_SURVEILLEES
+    if tables:
+        session.info.setdefault(CLE_TABLES_MODIFIEES, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _tables_modifiees_orm(session, flush_context):
+    _noter_tables(session, (
+        obj.__tablename__
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, "__tablename__")
+    ))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _tables_modifiees_requete(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _noter_tables(orm_execute_state.session, {table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalider_apres_commit(session):
+    tables = session.info.pop(CLE_TABLES_MODIFIEES, None)
+    if tables:
+        reference_cache.invalider(*tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _oublier_apres_rollback(session):
+    session.info.pop(CLE_TABLES_MODIFIEES, None)
@@ -0,0 +1,271 @@
+# app/services/releves.py
+"""
+Génération en lot des relevés de notes d'un parcours pour un semestre et une session.
+
+1. Préchargement de tout le lot en quelques requêtes ensemblistes
+   (inscrits, structure UE/EC, notes, résultats UE et semestre) ; pour une
+   année archivée, notes et résultats sont lus dans son archive Parquet.
+2. Rendu d'un document par étudiant dans le pool de processus (tous les cœurs).
+3. Archive ZIP produite en flux, document par document.
+"""
+import io
+import zipfile
+from collections import defaultdict
+from html import escape
+
+from sqlalchemy import select, func
+
+from app.models import (
+    Etudiant, Inscription, Parcours, Semestre, SessionExamen, UniteEnseignement,
+    ElementConstitutif, Note, ResultatUE, ResultatSemestre,
+)
+from app.core.workers import map_borne
+from app.services.archives import est_archivee, lire as lire_archive
+from app.services.references import obtenir
+from app.services.resultats import sessions_jusqua, id_semestre
+
+STATUTS = {"V": "Validé", "NV": "Non validé", "AJ": "Ajourné"}
+
+
+def precharger_releves(db, id_parcours, annee_universitaire, code_semestre, code_session):
+    """
+    Retourne la liste des données (dicts sérialisables) de chaque relevé du lot.
+    Nombre de requêtes fixe, quel que soit le nombre d'étudiants. Les lignes de faits
+    sont rattachées par clés techniques (`etudiant_id`, `ue_id`, `ec_id`).
+    """
+    parcours = obtenir(db, Parcours, id_parcours) or {}
+    session_examen = obtenir(db, SessionExamen, code_session) or {}
+    entete = {
+        "parcours": parcours.get("label") or id_parcours,
+        "semestre": code_semestre,
+        "annee_universitaire": annee_universitaire,
+        "session": session_examen.get("label") or code_session,
+    }
+
+    inscrits = (
+        select(Inscription.etudiant_id)
+        .where(
+            Inscription.id_parcours == id_parcours,
+            Inscription.annee_universitaire == annee_universitaire,
+            Inscription.semestre_id == id_semestre(code_semestre),
+        )
+    )
+    etudiants = db.execute(
+        select(
+            Etudiant.etudiant_id, Etudiant.code_etudiant, Etudiant.numero_inscription, Etudiant.nom,
+            Etudiant.prenoms, Etudiant.naissance_date, Etudiant.naissance_lieu,
+        )
+        .where(Etudiant.etudiant_id.in_(inscrits))
+        .order_by(Etudiant.nom, Etudiant.prenoms)
+    ).mappings().all()
+
+    structure = db.execute(
+        select(
+            UniteEnseignement.ue_id, UniteEnseignement.code_ue, UniteEnseignement.intitule.label("ue"),
+            UniteEnseignement.credit_ue, ElementConstitutif.ec_id, ElementConstitutif.code_ec,
+            ElementConstitutif.intitule.label("ec"), ElementConstitutif.coefficient,
+        )
+        .join(ElementConstitutif, ElementConstitutif.id_ue == UniteEnseignement.id_ue)
+        .where(UniteEnseignement.code_semestre == code_semestre)
+        .order_by(UniteEnseignement.code_ue, ElementConstitutif.code_ec)
+    ).mappings().all()
+
+    if est_archivee(annee_universitaire):
+        semestre = obtenir(db, Semestre, code_semestre) or {}
+        notes, resultats_ue, resultats_semestre = _resultats_archives(
+            annee_universitaire, semestre.get("semestre_id"), code_session,
+            [etudiant["etudiant_id"] for etudiant in etudiants], structure,
+        )
+    else:
+        notes, resultats_ue, resultats_semestre = _resultats_en_base(
+            db, annee_universitaire, code_semestre, code_session, inscrits, structure,
+        )
+
+    releves = []
+    for ligne in etudiants:
+        etudiant = dict(ligne)
+        etudiant_id = etudiant.pop("etudiant_id")
+        releves.append(_assembler(entete, etudiant, structure, notes[etudiant_id],
+                                  resultats_ue[etudiant_id], resultats_semestre.get(etudiant_id)))
+    return releves
+
+
+def _resultats_en_base(db, annee_universitaire, code_semestre, code_session, inscrits, structure):
+    """ Notes (meilleure par EC sur les sessions), résultats UE et semestre des inscrits. """
+    ecs = [ligne["ec_id"] for ligne in structure]
+    notes = defaultdict(dict)
+    for etudiant_id, ec_id, valeur in db.execute(
+        select(Note.etudiant_id, Note.ec_id, func.max(Note.valeur_note))
+        .where(
+            Note.annee_universitaire == annee_universitaire,
+            Note.code_session.in_(sessions_jusqua(code_session)),
+            Note.ec_id.in_(ecs),
+            Note.etudiant_id.in_(inscrits),
+        )
+        .group_by(Note.etudiant_id, Note.ec_id)
+    ):
+        notes[etudiant_id][ec_id] = valeur
+
+    resultats_ue = defaultdict(dict)
+    for resultat in db.execute(
+        select(ResultatUE.etudiant_id, ResultatUE.ue_id, ResultatUE.moyenne_ue,
+               ResultatUE.is_ue_acquise, ResultatUE.credit_obtenu)
+        .join(UniteEnseignement, UniteEnseignement.ue_id == ResultatUE.ue_id)
+        .where(
+            UniteEnseignement.code_semestre == code_semestre,
+            ResultatUE.annee_universitaire == annee_universitaire,
+            ResultatUE.code_session == code_session,
+            ResultatUE.etudiant_id.in_(inscrits),
+        )
+    ).mappings():
+        resultats_ue[resultat["etudiant_id"]][resultat["ue_id"]] = resultat
+
+    resultats_semestre = {
+        resultat["etudiant_id"]: resultat
+        for resultat in db.execute(
+            select(ResultatSemestre.etudiant_id, ResultatSemestre.moyenne_obtenue,
+                   ResultatSemestre.credits_acquis, ResultatSemestre.statut_validation)
+            .where(
+                ResultatSemestre.semestre_id == id_semestre(code_semestre),
+                ResultatSemestre.annee_universitaire == annee_universitaire,
+                ResultatSemestre.code_session == code_session,
+                ResultatSemestre.etudiant_id.in_(inscrits),
+            )
+        ).mappings()
+    }
+    return notes, resultats_ue, resultats_semestre
+
+
+def _resultats_archives(annee_universitaire, semestre_id, code_session, etudiants, structure):
+    """ Comme `_resultats_en_base`, lus dans l'archive Parquet de l'année. """
+    ecs = {ligne["ec_id"] for ligne in structure}
+    ues = {ligne["ue_id"] for ligne in structure}
+
+    notes = defaultdict(dict)
+    for note in lire_archive(
+        annee_universitaire, "notes", ["etudiant_id", "ec_id", "valeur_note"],
+        etudiant_id=etudiants, ec_id=ecs, code_session=sessions_jusqua(code_session),
+    ):
+        meilleures = notes[note["etudiant_id"]]
+        if meilleures.get(note["ec_id"]) is None or note["valeur_note"] > meilleures[note["ec_id"]]:
+            meilleures[note["ec_id"]] = note["valeur_note"]
+
+    resultats_ue = defaultdict(dict)
+    for resultat in lire_archive(
+        annee_universitaire, "resultats_ue",
+        ["etudiant_id", "ue_id", "moyenne_ue", "is_ue_acquise", "credit_obtenu"],
+        etudiant_id=etudiants, ue_id=ues, code_session=code_session,
+    ):
+        resultats_ue[resultat["etudiant_id"]][resultat["ue_id"]] = resultat
+
+    resultats_semestre = {
+        resultat["etudiant_id"]: resultat
+        for resultat in lire_archive(
+            annee_universitaire, "resultats_semestre",
+            ["etudiant_id", "moyenne_obtenue", "credits_acquis", "statut_validation"],
+            etudiant_id=etudiants, semestre_id=semestre_id, code_session=code_session,
+        )
+    }
+    return notes, resultats_ue, resultats_semestre
+
+
+def _assembler(entete, etudiant, structure, notes, resultats_ue, resultat_semestre):
+    ues = {}
+    for ligne in structure:
+        ue = ues.setdefault(ligne["ue_id"], {
+            "code_ue": ligne["code_ue"],
+            "intitule": ligne["ue"],
+            "credit_ue": ligne["credit_ue"],
+            "resultat": dict(resultats_ue[ligne["ue_id"]]) if ligne["ue_id"] in resultats_ue else None,
+            "ecs": [],
+        })
+        ue["ecs"].append({
+            "code_ec": ligne["code_ec"],
+            "intitule": ligne["ec"],
+            "coefficient": ligne["coefficient"],
+            "note": notes.get(ligne["ec_id"]),
+        })
+    return {
+        **entete,
+        "etudiant": etudiant,
+        "ues": list(ues.values()),
+        "resultat_semestre": dict(resultat_semestre) if resultat_semestre else None,
+    }
+
+
+def _f(valeur, defaut="-"):
+    return defaut if valeur is None else escape(str(valeur))
+
+
+def rendre_releve(donnees):
+    """ Rend un relevé en HTML imprimable. Exécuté dans le pool de processus. """
+    etudiant = donnees["etudiant"]
+    lignes = []
+    for ue in donnees["ues"]:
+        resultat = ue["resultat"] or {}
+        lignes.append(
+            f"<tr class='ue'><td>{_f(ue['code_ue'])}</td><td>{_f(ue['intitule'])}</td>"
+            f"<td>{_f(ue['credit_ue'])}</td><td>{_f(resultat.get('moyenne_ue'))}</td>"
+            f"<td>{_f(resultat.get('credit_obtenu'))}</td></tr>"
+        )
+        for ec in ue["ecs"]:
+            lignes.append(
+                f"<tr class='ec'><td>{_f(ec['code_ec'])}</td><td>{_f(ec['intitule'])}</td>"
+                f"<td>coef. {_f(ec['coefficient'])}</td><td>{_f(ec['note'])}</td><td></td></tr>"
+            )
+    semestre = donnees["resultat_semestre"] or {}
+    statut = STATUTS.get(semestre.get("statut_validation"), semestre.get("statut_validation"))
+
+    html = f"""<!DOCTYPE html>
+<html lang="fr"><head><meta charset="utf-8">
+<title>Relevé de notes - {_f(etudiant['code_etudiant'])}</title>
+<style>
+body {{ font-family: sans-serif; font-size: 12px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td, th {{ border: 1px solid #999; padding: 3px 6px; }}
+tr.ue {{ font-weight: bold; background: #eee; }}
+</style></head><body>
+<h1>Relevé de notes</h1>
+<p>{_f(donnees['parcours'])} &mdash; {_f(donnees['semestre'])} &mdash;
+Année {_f(donnees['annee_universitaire'])} &mdash; Session {_f(donnees['session'])}</p>
+<p><strong>{_f(etudiant['nom'])} {_f(etudiant['prenoms'], '')}</strong><br>
+N° inscription : {_f(etudiant['numero_inscription'])}<br>
+Né(e) le {_f(etudiant['naissance_date'])} à {_f(etudiant['naissance_lieu'])}</p>
+<table>
+<tr><th>Code</th><th>Intitulé</th><th>Crédits / Coef.</th><th>Moyenne / Note</th><th>Crédits obtenus</th></tr>
+{''.join(lignes)}
+</table>
+<p>Moyenne du semestre : {_f(semestre.get('moyenne_obtenue'))} &mdash;
+Crédits acquis : {_f(semestre.get('credits_acquis'))} &mdash;
+Résultat : {_f(statut)}</p>
+</body></html>"""
+    return f"releve_{etudiant['code_etudiant']}.html", html.encode("utf-8")
+
+
+class _TamponFlux(io.RawIOBase):
+    """ Flux non positionnable : `zipfile` y écrit, on vide après chaque document. """
+
+    def __init__(self):
+        self._morceaux = []
+
+    def writable(self):
+        return True
+
+    def write(self, donnees):
+        self._morceaux.append(bytes(donnees))
+        return len(donnees)
+
+    def vider(self):
+        contenu = b"".join(self._morceaux)
+        self._morceaux.clear()
+        return contenu
+
+
+def zip_releves(lot):
+    """ Générateur d'octets d'une archive ZIP des relevés, rendus en parallèle. """
+    tampon = _TamponFlux()
+    with zipfile.ZipFile(tampon, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for nom_fichier, contenu in map_borne(rendre_releve, lot):
+            archive.writestr(nom_fichier, contenu)
+            yield tampon.vider()
+    yield tampon.vider()
@@ -0,0 +1,305 @@
+# app/services/resultats.py
+"""
+Moteur de calcul des résultats (tables `resultats_ue`, `resultats_semestre`,
+`inscriptions.credit_acquis_semestre` et `suivi_credits_cycles`).
+
+Tout le calcul est fait côté PostgreSQL en requêtes groupées :
+meilleure note de chaque EC sur les sessions prises en compte, moyenne de l'UE
+pondérée par les coefficients des EC, puis un INSERT ... SELECT ... ON CONFLICT
+sur `uq_resultat_ue_unique`. Aucune boucle ORM par étudiant.
+Chaque niveau accepte des filtres (étudiants, UE, semestres) pour le recalcul ciblé.
+
+Les tables de faits référencent étudiants, EC, UE et semestres par leur clé
+technique entière (`etudiant_id`, `ec_id`, `ue_id`, `semestre_id`) : les filtres
+`etudiants` et `ues` sont des ensembles de ces clés, `code_semestre` et
+`semestres` restent des codes publics.
+"""
+from sqlalchemy import select, update, func, case, and_, or_, exists, literal, tuple_, cast, String, Integer
+
+from app.models import (
+    Inscription, UniteEnseignement, ElementConstitutif, Note, ResultatUE,
+    ResultatSemestre, Semestre, Niveau, SuiviCreditCycle, Etudiant,
+)
+from app.services.upsert import upsert
+
+# Ordre chronologique des sessions : une session tient compte des précédentes
+# (en rattrapage, on garde la meilleure note de chaque EC entre N et R).
+SESSIONS_ORDRE = ("N", "R")
+
+# Moyenne minimale pour acquérir une UE
+MOYENNE_VALIDATION = 10
+
+# Moyenne semestrielle (pondérée par les crédits) qui valide le semestre par
+# compensation : toutes ses UE sont alors acquises, y compris celles < 10
+MOYENNE_COMPENSATION = 10
+
+COLONNES_RESULTAT_UE = [
+    "etudiant_id", "ue_id", "annee_universitaire", "code_session",
+    "moyenne_ue", "is_ue_acquise", "credit_obtenu",
+]
+
+
+def sessions_jusqua(code_session):
+    """ Sessions dont les notes comptent pour `code_session` (elle-même et les précédentes). """
+    if code_session in SESSIONS_ORDRE:
+        return SESSIONS_ORDRE[: SESSIONS_ORDRE.index(code_session) + 1]
+    return (code_session,)
+
+
+def id_semestre(code_semestre):
+    """ Sous-requête scalaire : clé technique du semestre `code_semestre`. """
+    return select(Semestre.semestre_id).where(Semestre.code_semestre == code_semestre).scalar_subquery()
+
+
+def select_resultats_ue(annee_universitaire, code_session, code_semestre=None, etudiants=None, ues=None):
+    """
+    Requête groupée qui produit une ligne `resultats_ue` par (étudiant inscrit, UE du semestre).
+
+    - `code_semestre` : restreint au semestre (calcul de masse)
+    - `etudiants` / `ues` : restreint à un sous-ensemble (recalcul ciblé)
+    Une note absente compte pour 0.
+    """
+    ecs_cibles = select(ElementConstitutif.ec_id).join(UniteEnseignement)
+    if code_semestre is not None:
+        ecs_cibles = ecs_cibles.where(UniteEnseignement.code_semestre == code_semestre)
+    if ues is not None:
+        ecs_cibles = ecs_cibles.where(UniteEnseignement.ue_id.in_(ues))
+
+    # Meilleure note par (étudiant, EC) sur les sessions prises en compte
+    meilleures = (
+        select(Note.etudiant_id, Note.ec_id, func.max(Note.valeur_note).label("note"))
+        .where(
+            Note.annee_universitaire == annee_universitaire,
+            Note.code_session.in_(sessions_jusqua(code_session)),
+            Note.ec_id.in_(ecs_cibles),
+        )
+        .group_by(Note.etudiant_id, Note.ec_id)
+    )
+    if etudiants is not None:
+        meilleures = meilleures.where(Note.etudiant_id.in_(etudiants))
+    meilleures = meilleures.subquery("meilleures")
+
+    # Étudiants inscrits (un étudiant peut être inscrit au même semestre dans deux parcours)
+    inscrits = (
+        select(Inscription.etudiant_id, Semestre.code_semestre)
+        .join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+        .where(Inscription.annee_universitaire == annee_universitaire)
+        .distinct()
+    )
+    if code_semestre is not None:
+        inscrits = inscrits.where(Inscription.semestre_id == id_semestre(code_semestre))
+    if etudiants is not None:
+        inscrits = inscrits.where(Inscription.etudiant_id.in_(etudiants))
+    inscrits = inscrits.subquery("inscrits")
+
+    moyenne = func.round(
+        func.sum(ElementConstitutif.coefficient * func.coalesce(meilleures.c.note, 0))
+        / func.sum(ElementConstitutif.coefficient),
+        2,
+    )
+    acquise = moyenne >= MOYENNE_VALIDATION
+
+    stmt = (
+        select(
+            inscrits.c.etudiant_id,
+            UniteEnseignement.ue_id,
+            literal(annee_universitaire, String).label("annee_universitaire"),
+            literal(code_session, String).label("code_session"),
+            moyenne.label("moyenne_ue"),
+            acquise.label("is_ue_acquise"),
+            case((acquise, UniteEnseignement.credit_ue), else_=0).label("credit_obtenu"),
+        )
+        .select_from(inscrits)
+        .join(UniteEnseignement, UniteEnseignement.code_semestre == inscrits.c.code_semestre)
+        .join(ElementConstitutif, ElementConstitutif.id_ue == UniteEnseignement.id_ue)
+        .outerjoin(
+            meilleures,
+            and_(
+                meilleures.c.etudiant_id == inscrits.c.etudiant_id,
+                meilleures.c.ec_id == ElementConstitutif.ec_id,
+            ),
+        )
+        .group_by(inscrits.c.etudiant_id, UniteEnseignement.ue_id, UniteEnseignement.credit_ue)
+    )
+    if ues is not None:
+        stmt = stmt.where(UniteEnseignement.ue_id.in_(ues))
+    return stmt
+
+
+def upsert_resultats_ue(db, annee_universitaire, code_session, code_semestre=None, etudiants=None, ues=None):
+    """ Calcule et écrit les `resultats_ue` ciblés en un seul INSERT ... SELECT ... ON CONFLICT. """
+    source = select_resultats_ue(annee_universitaire, code_session, code_semestre, etudiants, ues)
+    return upsert(
+        db, ResultatUE, "uq_resultat_ue_unique",
+        colonnes_maj=["moyenne_ue", "is_ue_acquise", "credit_obtenu"],
+        source=source, colonnes=COLONNES_RESULTAT_UE,
+    )
+
+
+def calculer_resultats_ue(db, annee_universitaire, code_semestre, code_session):
+    """
+    Calcule `moyenne_ue`, `is_ue_acquise` et `credit_obtenu` pour tous les étudiants
+    inscrits au semestre. La transaction est laissée à l'appelant.
+    Retourne le nombre de lignes écrites.
+    """
+    return upsert_resultats_ue(db, annee_universitaire, code_session, code_semestre=code_semestre)
+
+
+# -------------------------------------------------------------------
+# --- NIVEAU SEMESTRE ---
+# -------------------------------------------------------------------
+
+COLONNES_RESULTAT_SEMESTRE = [
+    "etudiant_id", "semestre_id", "annee_universitaire", "code_session",
+    "statut_validation", "credits_acquis", "moyenne_obtenue",
+]
+
+
+def statut_non_valide(code_session):
+    """ NV tant qu'une session suivante existe (rattrapage possible), AJ à la dernière session. """
+    return "AJ" if code_session == SESSIONS_ORDRE[-1] else "NV"
+
+
+def select_resultats_semestre(annee_universitaire, code_session, code_semestre=None, etudiants=None, semestres=None):
+    """
+    Une ligne `resultats_semestre` par (étudiant, semestre) à partir des `resultats_ue` :
+    moyenne pondérée par les crédits des UE, crédits acquis, statut V / NV / AJ.
+    Le semestre est validé (V) si toutes les UE sont acquises, ou par compensation
+    si la moyenne atteint MOYENNE_COMPENSATION : les crédits du semestre sont alors tous acquis.
+    La moyenne est rapportée aux crédits de toutes les UE du semestre : une UE sans
+    résultat (pas encore calculée, aucune note) compte pour 0, comme une note absente.
+    """
+    total = (
+        select(
+            UniteEnseignement.code_semestre,
+            func.sum(UniteEnseignement.credit_ue).label("credits_semestre"),
+        )
+        .group_by(UniteEnseignement.code_semestre)
+        .subquery("total")
+    )
+    moyenne = func.round(
+        func.sum(ResultatUE.moyenne_ue * UniteEnseignement.credit_ue) / total.c.credits_semestre,
+        2,
+    )
+    credits = func.sum(ResultatUE.credit_obtenu)
+    valide = or_(credits >= total.c.credits_semestre, moyenne >= MOYENNE_COMPENSATION)
+
+    stmt = (
+        select(
+            ResultatUE.etudiant_id,
+            Semestre.semestre_id,
+            literal(annee_universitaire, String).label("annee_universitaire"),
+            literal(code_session, String).label("code_session"),
+            case((valide, "V"), else_=statut_non_valide(code_session)).label("statut_validation"),
+            case((valide, total.c.credits_semestre), else_=credits).label("credits_acquis"),
+            moyenne.label("moyenne_obtenue"),
+        )
+        .join(UniteEnseignement, UniteEnseignement.ue_id == ResultatUE.ue_id)
+        .join(Semestre, Semestre.code_semestre == UniteEnseignement.code_semestre)
+        .join(total, total.c.code_semestre == UniteEnseignement.code_semestre)
+        .where(
+            ResultatUE.annee_universitaire == annee_universitaire,
+            ResultatUE.code_session == code_session,
+        )
+        .group_by(ResultatUE.etudiant_id, Semestre.semestre_id, total.c.credits_semestre)
+    )
+    if code_semestre is not None:
+        stmt = stmt.where(UniteEnseignement.code_semestre == code_semestre)
+    if semestres is not None:
+        stmt = stmt.where(UniteEnseignement.code_semestre.in_(semestres))
+    if etudiants is not None:
+        stmt = stmt.where(ResultatUE.etudiant_id.in_(etudiants))
+    return stmt
+
+
+def upsert_resultats_semestre(db, annee_universitaire, code_session, code_semestre=None, etudiants=None, semestres=None):
+    """ Écrit les `resultats_semestre` ciblés en un seul INSERT ... SELECT ... ON CONFLICT. """
+    source = select_resultats_semestre(annee_universitaire, code_session, code_semestre, etudiants, semestres)
+    return upsert(
+        db, ResultatSemestre, "uq_resultat_semestre_session",
+        colonnes_maj=["statut_validation", "credits_acquis", "moyenne_obtenue"],
+        source=source, colonnes=COLONNES_RESULTAT_SEMESTRE,
+    )
+
+
+def maj_credits_inscriptions(db, annee_universitaire, cles=None, code_semestre=None):
+    """
+    Reporte sur `inscriptions` le meilleur total de crédits obtenu toutes sessions
+    confondues (`credit_acquis_semestre`) et la validation du semestre dans l'une
+    des sessions (`is_semestre_valide`), pour les paires (etudiant_id, semestre_id)
+    de `cles`, ou pour tous les inscrits de `code_semestre`.
+    """
+    if cles is not None and not cles:
+        return 0
+    du_semestre = and_(
+        ResultatSemestre.etudiant_id == Inscription.etudiant_id,
+        ResultatSemestre.semestre_id == Inscription.semestre_id,
+        ResultatSemestre.annee_universitaire == Inscription.annee_universitaire,
+    )
+    meilleur = select(func.max(ResultatSemestre.credits_acquis)).where(du_semestre).scalar_subquery()
+    valide = exists().where(du_semestre, ResultatSemestre.statut_validation == "V")
+    stmt = (
+        update(Inscription)
+        .where(Inscription.annee_universitaire == annee_universitaire)
+        .values(credit_acquis_semestre=func.coalesce(cast(meilleur, Integer), 0), is_semestre_valide=valide)
+        .execution_options(synchronize_session=False)
+    )
+    if cles is not None:
+        stmt = stmt.where(tuple_(Inscription.etudiant_id, Inscription.semestre_id).in_(list(cles)))
+    if code_semestre is not None:
+        stmt = stmt.where(Inscription.semestre_id == id_semestre(code_semestre))
+    return db.execute(stmt).rowcount
+
+
+# -------------------------------------------------------------------
+# --- NIVEAU CYCLE ---
+# -------------------------------------------------------------------
+
+def upsert_suivi_credits_cycles(db, etudiants, cycles=None):
+    """
+    Recalcule `suivi_credits_cycles` : somme, par cycle, des meilleurs crédits acquis
+    de chaque semestre (toutes années confondues). Le cycle est validé quand le total
+    atteint les crédits de toutes les UE de ses semestres. `etudiants` : clés techniques.
+    """
+    if not etudiants:
+        return 0
+    par_semestre = (
+        select(
+            Inscription.etudiant_id,
+            Niveau.cycle_code,
+            func.max(Inscription.credit_acquis_semestre).label("credits"),
+        )
+        .join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+        .join(Niveau, Niveau.code == Semestre.niveau_code)
+        .where(Inscription.etudiant_id.in_(etudiants))
+        .group_by(Inscription.etudiant_id, Niveau.cycle_code, Inscription.semestre_id)
+    )
+    if cycles is not None:
+        par_semestre = par_semestre.where(Niveau.cycle_code.in_(cycles))
+    par_semestre = par_semestre.subquery("par_semestre")
+
+    requis = (
+        select(Niveau.cycle_code, func.sum(UniteEnseignement.credit_ue).label("credits_requis"))
+        .join(Semestre, Semestre.niveau_code == Niveau.code)
+        .join(UniteEnseignement, UniteEnseignement.code_semestre == Semestre.code_semestre)
+        .group_by(Niveau.cycle_code)
+        .subquery("requis")
+    )
+    total = func.coalesce(func.sum(par_semestre.c.credits), 0)
+    source = (
+        select(
+            Etudiant.code_etudiant,
+            par_semestre.c.cycle_code,
+            total.label("credit_total_acquis"),
+            (total >= func.max(requis.c.credits_requis)).label("is_cycle_valide"),
+        )
+        .join(Etudiant, Etudiant.etudiant_id == par_semestre.c.etudiant_id)
+        .join(requis, requis.c.cycle_code == par_semestre.c.cycle_code)
+        .group_by(Etudiant.code_etudiant, par_semestre.c.cycle_code)
+    )
+    return upsert(
+        db, SuiviCreditCycle, "uq_etudiant_cycle_credit",
+        colonnes_maj=["credit_total_acquis", "is_cycle_valide"],
+        source=source,
+        colonnes=["code_etudiant", "cycle_code", "credit_total_acquis", "is_cycle_valide"],
+    )
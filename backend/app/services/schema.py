@@ -0,0 +1,85 @@
+# app/services/schema.py
+"""
+Vérification du schéma au démarrage.
+
+Remplace le `create_all` exécuté à l'import : au démarrage, une seule requête
+lit la révision Alembic de la base (`alembic_version`, écrite par les
+migrations elles-mêmes) et la compare à la dernière révision des scripts de
+migrations/versions, lue sur disque sans connexion. Seule une base migrée
+jusqu'au bout est « conforme ».
+
+Usage (depuis backend/) :
+    alembic upgrade head
+    python -m app.services.schema verifier
+"""
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from app.models import Base
+
+DOSSIER_MIGRATIONS = Path(__file__).resolve().parents[2] / "migrations"
+
+
+@lru_cache(maxsize=1)
+def _scripts():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", str(DOSSIER_MIGRATIONS))
+    return ScriptDirectory.from_config(config)
+
+
+def revision_attendue():
+    """ Dernière révision des scripts de migration. """
+    return _scripts().get_current_head()
+
+
+def revision_en_base(connexion):
+    """ Révision Alembic de la base, ou None si elle n'a jamais été migrée. """
+    from alembic.migration import MigrationContext
+
+    return MigrationContext.configure(connexion).get_current_revision()
+
+
+def marquer_a_jour(connexion):
+    """
+    Base créée par `create_all` (développement, tests, bancs d'essai) : la marque
+    à la dernière révision, comme `alembic stamp head`.
+    """
+    from alembic.migration import MigrationContext
+
+    MigrationContext.configure(connexion).stamp(_scripts(), "head")
+
+
+def verifier_schema(engine):
+    """ Retourne "conforme", "different" (migration en retard ou inconnue) ou "absente" (base jamais migrée). """
+    with engine.connect() as connexion:
+        revision = revision_en_base(connexion)
+    if revision is None:
+        return "absente"
+    return "conforme" if revision == revision_attendue() else "different"
+
+
+def creer_schema(engine):
+    """ Mode développement : `create_all` puis marquage à la dernière révision. """
+    with engine.begin() as connexion:
+        Base.metadata.create_all(bind=connexion)
+        marquer_a_jour(connexion)
+
+
+def main():
+    from app.database import engine
+
+    commande = sys.argv[1] if len(sys.argv) > 1 else "verifier"
+    if commande != "verifier":
+        sys.exit(f"Commande inconnue : {commande} (verifier)")
+    etat = verifier_schema(engine)
+    with engine.connect() as connexion:
+        print(f"Schéma {etat} (base : {revision_en_base(connexion)}, migrations : {revision_attendue()})")
+    sys.exit(0 if etat == "conforme" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# app/services/statistiques.py
+"""
+Statistiques pré-agrégées du tableau de bord (tables `stats_semestre`,
+`stats_ue`, `stats_credits`).
+
+Les agrégats sont calculés par groupe (parcours, semestre, année, session)
+à partir de `resultats_semestre` / `resultats_ue` et des inscriptions
+(un étudiant inscrit dans deux parcours compte dans les deux).
+Un rafraîchissement ne touche que les groupes demandés : INSERT ... SELECT
+ON CONFLICT sur la contrainte d'unicité de chaque table (sûr face à un
+rafraîchissement concurrent du même groupe), puis suppression des lignes qui
+n'ont plus de source, dans la transaction de l'appelant. La propagation des
+notes marque les groupes des étudiants concernés (`marquer_groupes`) ; ils
+sont rafraîchis après le commit de la saisie, dans une transaction séparée
+(`rafraichir_groupes_marques`), hors du chemin d'écriture des notes. Les
+endpoints du tableau de bord ne lisent que ces tables. Les groupes sont identifiés par
+les codes publics (semestre, UE) : les clés techniques des tables de faits
+sont résolues par jointure.
+
+Reconstruction complète (après migration ou import hors application) :
+    python -m app.services.statistiques reconstruire [annee_universitaire]
+"""
+import logging
+import sys
+from collections import defaultdict
+
+from sqlalchemy import select, delete, func, case, and_, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models import (
+    Inscription, UniteEnseignement, Semestre, ResultatUE, ResultatSemestre,
+    StatistiqueSemestre, StatistiqueUE, RepartitionCredits,
+)
+from app.services.archives import verifier_non_archivee
+from app.services.upsert import colonnes_contrainte, upsert
+
+logger = logging.getLogger(__name__)
+
+CLE_GROUPE = ["id_parcours", "code_semestre", "annee_universitaire", "code_session"]
+CLE_STATS_SALES = "stats_sales"
+
+
+def _inscription(etudiant_id, semestre_id, annee_universitaire):
+    return and_(
+        Inscription.etudiant_id == etudiant_id,
+        Inscription.semestre_id == semestre_id,
+        Inscription.annee_universitaire == annee_universitaire,
+    )
+
+
+def _filtrer(stmt, colonnes, annee_universitaire, code_session, semestres, parcours):
+    """ Restreint une requête (source ou DELETE) aux groupes à rafraîchir. """
+    parcours_col, semestre_col, annee_col, session_col = colonnes
+    stmt = stmt.where(annee_col == annee_universitaire)
+    if code_session is not None:
+        stmt = stmt.where(session_col == code_session)
+    if semestres is not None:
+        stmt = stmt.where(semestre_col.in_(semestres))
+    if parcours is not None:
+        stmt = stmt.where(parcours_col.in_(parcours))
+    return stmt
+
+
+def select_stats_semestre():
+    stmt = (
+        select(
+            Inscription.id_parcours, Semestre.code_semestre,
+            ResultatSemestre.annee_universitaire, ResultatSemestre.code_session,
+            func.count().label("nb_etudiants"),
+            func.sum(case((ResultatSemestre.statut_validation == "V", 1), else_=0)).label("nb_valides"),
+            func.round(func.avg(ResultatSemestre.moyenne_obtenue), 2).label("moyenne"),
+            func.min(ResultatSemestre.moyenne_obtenue).label("moyenne_min"),
+            func.max(ResultatSemestre.moyenne_obtenue).label("moyenne_max"),
+            func.round(func.avg(ResultatSemestre.credits_acquis), 1).label("credits_moyens"),
+        )
+        .join(Semestre, Semestre.semestre_id == ResultatSemestre.semestre_id)
+        .join(Inscription, _inscription(ResultatSemestre.etudiant_id, ResultatSemestre.semestre_id,
+                                        ResultatSemestre.annee_universitaire))
+        .group_by(Inscription.id_parcours, Semestre.code_semestre,
+                  ResultatSemestre.annee_universitaire, ResultatSemestre.code_session)
+    )
+    colonnes = (Inscription.id_parcours, Semestre.code_semestre,
+                ResultatSemestre.annee_universitaire, ResultatSemestre.code_session)
+    return stmt, colonnes
+
+
+def select_repartition_credits():
+    stmt = (
+        select(
+            Inscription.id_parcours, Semestre.code_semestre,
+            ResultatSemestre.annee_universitaire, ResultatSemestre.code_session,
+            ResultatSemestre.credits_acquis,
+            func.count().label("nb_etudiants"),
+        )
+        .join(Semestre, Semestre.semestre_id == ResultatSemestre.semestre_id)
+        .join(Inscription, _inscription(ResultatSemestre.etudiant_id, ResultatSemestre.semestre_id,
+                                        ResultatSemestre.annee_universitaire))
+        .where(ResultatSemestre.credits_acquis.is_not(None))
+        .group_by(Inscription.id_parcours, Semestre.code_semestre, ResultatSemestre.annee_universitaire,
+                  ResultatSemestre.code_session, ResultatSemestre.credits_acquis)
+    )
+    colonnes = (Inscription.id_parcours, Semestre.code_semestre,
+                ResultatSemestre.annee_universitaire, ResultatSemestre.code_session)
+    return stmt, colonnes
+
+
+def select_stats_ue():
+    stmt = (
+        select(
+            Inscription.id_parcours, UniteEnseignement.code_semestre, UniteEnseignement.id_ue,
+            ResultatUE.annee_universitaire, ResultatUE.code_session,
+            func.count().label("nb_etudiants"),
+            func.sum(case((ResultatUE.is_ue_acquise, 1), else_=0)).label("nb_acquises"),
+            func.round(func.avg(ResultatUE.moyenne_ue), 2).label("moyenne"),
+        )
+        .join(UniteEnseignement, UniteEnseignement.ue_id == ResultatUE.ue_id)
+        .join(Semestre, Semestre.code_semestre == UniteEnseignement.code_semestre)
+        .join(Inscription, _inscription(ResultatUE.etudiant_id, Semestre.semestre_id,
+                                        ResultatUE.annee_universitaire))
+        .group_by(Inscription.id_parcours, UniteEnseignement.code_semestre, UniteEnseignement.id_ue,
+                  ResultatUE.annee_universitaire, ResultatUE.code_session)
+    )
+    colonnes = (Inscription.id_parcours, UniteEnseignement.code_semestre,
+                ResultatUE.annee_universitaire, ResultatUE.code_session)
+    return stmt, colonnes
+
+
+# Table dérivée -> (contrainte d'unicité, requête source, colonnes insérées)
+AGREGATS = [
+    (StatistiqueSemestre, "uq_stats_semestre", select_stats_semestre, CLE_GROUPE + [
+        "nb_etudiants", "nb_valides", "moyenne", "moyenne_min", "moyenne_max", "credits_moyens"]),
+    (RepartitionCredits, "uq_stats_credits", select_repartition_credits,
+     CLE_GROUPE + ["credits_acquis", "nb_etudiants"]),
+    (StatistiqueUE, "uq_stats_ue", select_stats_ue, [
+        "id_parcours", "code_semestre", "id_ue", "annee_universitaire", "code_session",
+        "nb_etudiants", "nb_acquises", "moyenne"]),
+]
+
+
+def rafraichir_statistiques(db, annee_universitaire, code_session=None, semestres=None, parcours=None):
+    """
+    Recalcule les groupes (parcours, semestre) de l'année (et de la session) donnés.
+    `semestres` / `parcours` à None : tous. Les groupes sans résultat disparaissent.
+    Retourne le nombre de lignes écrites. Lève AnneeArchivee pour une année archivée
+    (ses statistiques sont conservées telles quelles).
+    """
+    verifier_non_archivee(annee_universitaire)
+    ecrites = 0
+    for modele, contrainte, requete, colonnes in AGREGATS:
+        table = modele.__table__
+        cle = colonnes_contrainte(modele, contrainte)
+        colonnes_maj = [nom for nom in colonnes if nom not in cle]
+        if "date_maj" in table.c:
+            colonnes_maj.append("date_maj")
+        source, colonnes_source = requete()
+        source = _filtrer(source, colonnes_source, annee_universitaire, code_session, semestres, parcours)
+        ecrites += upsert(db, modele, contrainte, colonnes_maj, source=source, colonnes=colonnes)
+
+        # Groupes (ou tranches de crédits) qui n'ont plus de résultat
+        actuelles = source.subquery()
+        db.execute(_filtrer(
+            delete(table), [table.c[nom] for nom in CLE_GROUPE],
+            annee_universitaire, code_session, semestres, parcours,
+        ).where(tuple_(*[table.c[nom] for nom in cle]).not_in(
+            select(*[actuelles.c[nom] for nom in cle])
+        )))
+    return ecrites
+
+
+def rafraichir_pour_etudiants(db, annee_universitaire, code_session, etudiants, semestres):
+    """
+    Groupes touchés par un recalcul ciblé : parcours où ces étudiants (clés techniques)
+    sont inscrits à ces semestres (codes).
+    """
+    if not etudiants or not semestres:
+        return 0
+    parcours = set(db.scalars(
+        select(Inscription.id_parcours).distinct()
+        .join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+        .where(
+            Inscription.annee_universitaire == annee_universitaire,
+            Semestre.code_semestre.in_(semestres),
+            Inscription.etudiant_id.in_(etudiants),
+        )
+    ))
+    if not parcours:
+        return 0
+    return rafraichir_statistiques(db, annee_universitaire, code_session, semestres, parcours)
+
+
+def marquer_groupes(db, annee_universitaire, code_session, etudiants, semestres):
+    """ Note des groupes à rafraîchir après le commit de la session (voir `rafraichir_groupes_marques`). """
+    etudiants_groupe, semestres_groupe = db.info.setdefault(
+        CLE_STATS_SALES, defaultdict(lambda: (set(), set()))
+    )[(annee_universitaire, code_session)]
+    etudiants_groupe.update(etudiants)
+    semestres_groupe.update(semestres)
+
+
+def rafraichir_groupes_marques(session):
+    """
+    Rafraîchit les groupes marqués sur `session`, qui vient d'être validée, dans une
+    nouvelle transaction. Un échec n'annule pas la saisie déjà validée : il est
+    journalisé, et `reconstruire` remet les statistiques à jour.
+    """
+    groupes = session.info.pop(CLE_STATS_SALES, None)
+    if not groupes:
+        return
+    try:
+        with Session(bind=session.get_bind()) as db:
+            for (annee, code_session), (etudiants, semestres) in groupes.items():
+                rafraichir_pour_etudiants(db, annee, code_session, etudiants, semestres)
+            db.commit()
+    except SQLAlchemyError as exc:
+        logger.warning("Rafraîchissement des statistiques impossible (%s) : relancer `reconstruire`", exc)
+
+
+def oublier_groupes_marques(session):
+    session.info.pop(CLE_STATS_SALES, None)
+
+
+def reconstruire(db, annee_universitaire=None):
+    """ Reconstruction complète (toutes les années présentes dans les résultats, ou une seule). """
+    if annee_universitaire is not None:
+        annees = [annee_universitaire]
+    else:
+        annees = db.scalars(select(ResultatUE.annee_universitaire).distinct()
+                            .union(select(ResultatSemestre.annee_universitaire).distinct())).all()
+    return sum(rafraichir_statistiques(db, annee) for annee in annees)
+
+
+def main():
+    from app.database import SessionLocal
+
+    commande = sys.argv[1] if len(sys.argv) > 1 else ""
+    if commande != "reconstruire":
+        sys.exit(f"Commande inconnue : {commande} (reconstruire [annee_universitaire])")
+    with SessionLocal() as db:
+        lignes = reconstruire(db, sys.argv[2] if len(sys.argv) > 2 else None)
+        db.commit()
+    print(f"Statistiques reconstruites : {lignes} lignes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# app/services/upsert.py
+from sqlalchemy import UniqueConstraint, true
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def colonnes_contrainte(model, nom_contrainte):
+    """ Retourne les noms des colonnes d'une contrainte d'unicité nommée du modèle. """
+    for contrainte in model.__table__.constraints:
+        if isinstance(contrainte, UniqueConstraint) and contrainte.name == nom_contrainte:
+            return [col.name for col in contrainte.columns]
+    raise ValueError(f"Contrainte '{nom_contrainte}' introuvable sur {model.__tablename__}")
+
+
+def insert_upsert(db, model):
+    """ INSERT du dialecte de la session (PostgreSQL ou SQLite), qui supporte ON CONFLICT. """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def upsert(db, model, nom_contrainte, colonnes_maj, valeurs=None, source=None, colonnes=None):
+    """
+    INSERT ... ON CONFLICT (colonnes de la contrainte) DO UPDATE en une seule requête.
+
+    - `valeurs` : liste de dicts (insertion multi-lignes)
+    - `source` + `colonnes` : INSERT ... SELECT calculé côté serveur
+    Retourne le nombre de lignes insérées ou mises à jour.
+    """
+    stmt = insert_upsert(db, model)
+    if source is not None:
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite exige un WHERE pour distinguer ON CONFLICT d'une jointure
+            source = source.where(true())
+        stmt = stmt.from_select(colonnes, source)
+    elif valeurs:
+        stmt = stmt.values(valeurs)
+    else:
+        return 0
+
+    index = colonnes_contrainte(model, nom_contrainte)
+    if colonnes_maj:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index,
+            set_={col: stmt.excluded[col] for col in colonnes_maj},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=index)
+    return db.execute(stmt).rowcount
@@ -0,0 +1,112 @@
+# benchmarks/bench_async.py
+"""
+Compare le débit des routes d'administration en version synchrone
+(psycopg2 + threadpool) et asynchrone (asyncpg + AsyncSession).
+
+Les deux applications exécutent les mêmes requêtes directes, sans le cache de
+référence : chaque appel fait un aller-retour vers la base, et seuls le pilote
+et le mode d'exécution diffèrent. Les réponses (schémas complets) sont identiques.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_async --requetes 2000 --concurrence 200
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_async_db
+from app.models import Institution, Composante
+from app.schemas import InstitutionSchema, ComposanteSchema
+
+ROUTES = ["/api/institutions", "/api/composantes?institution_id={institution}"]
+
+
+def requete_institutions():
+    return select(Institution).order_by(Institution.id_institution)
+
+
+def requete_composantes(institution_id):
+    return select(Composante).where(Composante.id_institution == institution_id).order_by(Composante.code)
+
+
+def app_synchrone():
+    """ Handlers `def` sur sessions bloquantes (exécutés dans le threadpool). """
+    router = APIRouter()
+
+    @router.get("/institutions", response_model=List[InstitutionSchema])
+    def get_institutions(db: Session = Depends(get_db)):
+        return db.scalars(requete_institutions()).all()
+
+    @router.get("/composantes", response_model=List[ComposanteSchema])
+    def get_composantes(institution_id: str = Query(...), db: Session = Depends(get_db)):
+        return db.scalars(requete_composantes(institution_id)).all()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return app
+
+
+def app_asynchrone():
+    """ Mêmes requêtes, en handlers `async def` sur AsyncSession. """
+    router = APIRouter()
+
+    @router.get("/institutions", response_model=List[InstitutionSchema])
+    async def get_institutions(db: AsyncSession = Depends(get_async_db)):
+        return (await db.scalars(requete_institutions())).all()
+
+    @router.get("/composantes", response_model=List[ComposanteSchema])
+    async def get_composantes(institution_id: str = Query(...), db: AsyncSession = Depends(get_async_db)):
+        return (await db.scalars(requete_composantes(institution_id))).all()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    return app
+
+
+async def mesurer(app, nb_requetes, concurrence, institution):
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrence)
+    latences = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def une_requete(i):
+            url = ROUTES[i % len(ROUTES)].format(institution=institution)
+            async with semaphore:
+                debut = time.perf_counter()
+                reponse = await client.get(url)
+                latences.append(time.perf_counter() - debut)
+                reponse.raise_for_status()
+
+        debut = time.perf_counter()
+        await asyncio.gather(*(une_requete(i) for i in range(nb_requetes)))
+        duree = time.perf_counter() - debut
+
+    latences.sort()
+    return {
+        "req_par_s": nb_requetes / duree,
+        "p50_ms": latences[len(latences) // 2] * 1000,
+        "p95_ms": latences[int(len(latences) * 0.95)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requetes", type=int, default=2000)
+    parser.add_argument("--concurrence", type=int, default=200)
+    parser.add_argument("--institution", default="UF")
+    args = parser.parse_args()
+
+    for nom, app in (("sync", app_synchrone()), ("async", app_asynchrone())):
+        res = asyncio.run(mesurer(app, args.requetes, args.concurrence, args.institution))
+        print(f"{nom:>5} : {res['req_par_s']:8.1f} req/s  p50 {res['p50_ms']:7.1f} ms  p95 {res['p95_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
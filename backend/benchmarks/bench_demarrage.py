@@ -0,0 +1,57 @@
+# benchmarks/bench_demarrage.py
+"""
+Mesure le démarrage à froid d'un worker : interpréteur neuf, import de
+`app.main` puis phase de démarrage (lifespan), comme le fait uvicorn.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_demarrage --essais 10
+    SCHEMA_AU_DEMARRAGE=creer python -m benchmarks.bench_demarrage   # ancien comportement
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT = """
+import asyncio, json
+from app.main import app
+from app.core import demarrage
+
+async def main():
+    async with app.router.lifespan_context(app):
+        print(json.dumps(demarrage.etapes()))
+
+asyncio.run(main())
+"""
+
+
+def un_demarrage():
+    debut = time.perf_counter()
+    sortie = subprocess.run(
+        [sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True,
+    ).stdout
+    total = (time.perf_counter() - debut) * 1000
+    return total, json.loads(sortie.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--essais", type=int, default=10)
+    args = parser.parse_args()
+
+    totaux, pret = [], []
+    for _ in range(args.essais):
+        total, etapes = un_demarrage()
+        totaux.append(total)
+        pret.append(etapes["etapes_ms"]["pret"])
+    print(f"schéma : {etapes['schema']}")
+    print(f"processus complet (interpréteur compris) : médiane {statistics.median(totaux):.0f} ms, "
+          f"max {max(totaux):.0f} ms")
+    print(f"imports + démarrage de l'application    : médiane {statistics.median(pret):.0f} ms, "
+          f"max {max(pret):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
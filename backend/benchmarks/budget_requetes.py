@@ -0,0 +1,68 @@
+# benchmarks/budget_requetes.py
+"""
+Budget de requêtes SQL par endpoint : échoue si une route dépasse son
+maximum (régression N+1). Cache de référence vidé avant chaque appel, donc
+budgets « à froid ».
+
+Usage (depuis backend/, base peuplée) :
+    python -m benchmarks.budget_requetes
+"""
+import sys
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.core.cache import reference_cache
+from app.core.config import settings
+from app.core.instrumentation import max_requetes
+from app.database import SessionLocal
+from app.main import app
+from app.models import Institution, Parcours, Inscription
+
+# Route -> nombre maximal d'instructions SQL
+BUDGETS = {
+    "/api/institutions": 1,
+    "/api/institutions/{institution}": 1,
+    "/api/composantes?institution_id={institution}": 1,
+    "/api/hierarchie/institution/{institution}": 9,
+    "/api/etudiants?limit=200": 1,
+    "/api/etudiants?limit=200&id_parcours={parcours}&annee_universitaire={annee}": 1,
+    "/api/inscriptions?limit=200&annee_universitaire={annee}": 1,
+    "/api/recherche?q=ra": 2,
+    "/api/statistiques/semestres?annee_universitaire={annee}": 1,
+    "/api/statistiques/ue?annee_universitaire={annee}&id_parcours={parcours}": 1,
+    "/api/charges?annee_universitaire={annee}": 1,
+}
+
+
+def parametres():
+    with SessionLocal() as db:
+        inscription = db.scalars(select(Inscription).limit(1)).first()
+        return {
+            "institution": db.scalar(select(Institution.id_institution).limit(1)),
+            "parcours": inscription.id_parcours if inscription else db.scalar(select(Parcours.id_parcours).limit(1)),
+            "annee": inscription.annee_universitaire if inscription else "",
+        }
+
+
+def main():
+    settings.PRECHAUFFAGE = False  # pas de requêtes de fond pendant les mesures
+    valeurs = parametres()
+    depassements = 0
+    with TestClient(app) as client:
+        for route, budget in BUDGETS.items():
+            url = route.format(**valeurs)
+            reference_cache.clear()
+            try:
+                with max_requetes(budget) as mesures:
+                    reponse = client.get(url)
+                print(f"{url:<75} {reponse.status_code}  {mesures.nb:>3} / {budget}")
+            except AssertionError as exc:
+                depassements += 1
+                print(f"{url:<75} DÉPASSEMENT\n{exc}")
+    if depassements:
+        sys.exit(f"{depassements} route(s) au-delà de leur budget de requêtes")
+
+
+if __name__ == "__main__":
+    main()
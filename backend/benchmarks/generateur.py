@@ -0,0 +1,314 @@
+# benchmarks/generateur.py
+"""
+Générateur de données synthétiques reproductible (graine fixe) pour tout le schéma :
+hiérarchie LMD, étudiants, inscriptions, notes (sessions N et R), enseignants,
+volumes horaires, affectations et jurys. Insertions en masse (COPY sous
+PostgreSQL, INSERT multi-lignes ailleurs), par lots, sans passer par l'ORM.
+Les clés techniques (`etudiant_id`, `semestre_id`, `ue_id`, `ec_id`) sont
+attribuées ici (1, 2, ...) ; sous PostgreSQL, les séquences d'identité sont
+recalées ensuite.
+
+Usage (depuis backend/) :
+    python -m benchmarks.generateur --url sqlite:///bench.db --echelle moyenne
+    python -m benchmarks.generateur --echelle complete --resultats --reinitialiser   # base de Settings
+
+L'échelle « complete » produit 50 000 étudiants et environ 2 millions de notes.
+"""
+import argparse
+import csv
+import io
+import random
+import time
+
+from sqlalchemy import create_engine, inspect, select, func, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import UniqueConstraint
+
+from app.models import (
+    Base, Institution, Composante, Domaine, Mention, Parcours, ParcoursNiveau, Cycle, Niveau,
+    Semestre, UniteEnseignement, ElementConstitutif, SessionExamen, ModeInscription, TypeFormation,
+    AnneeUniversitaire, Etudiant, Inscription, Note, Enseignant, TypeEnseignement, VolumeHoraireEC,
+    AffectationEC, Jury, ResultatUE,
+)
+from app.services.lecture_tabulaire import par_lots
+from app.services.schema import marquer_a_jour
+
+ECHELLES = {
+    "mini": dict(institutions=1, composantes=2, mentions=2, parcours=2, annees=1,
+                 etudiants=500, enseignants=40, ues_par_semestre=4, ecs_par_ue=2),
+    "moyenne": dict(institutions=2, composantes=3, mentions=3, parcours=2, annees=2,
+                    etudiants=5000, enseignants=200, ues_par_semestre=5, ecs_par_ue=3),
+    "complete": dict(institutions=2, composantes=4, mentions=3, parcours=2, annees=1,
+                     etudiants=50000, enseignants=500, ues_par_semestre=6, ecs_par_ue=3),
+}
+
+TAILLE_LOT = 10000
+DERNIERE_ANNEE = 2024
+CREDITS_SEMESTRE = 30
+TAUX_RATTRAPAGE = 0.5  # part des notes < 10 repassées en session R
+
+NOMS = ["Rakoto", "Rabe", "Randria", "Razafy", "Rasoa", "Andria", "Ravelo", "Rajaona",
+        "Ramanana", "Rasolo", "Rahaja", "Ranaivo", "Rakotondrabe", "Razanamparany"]
+PRENOMS = ["Hery", "Fara", "Tiana", "Mamy", "Lova", "Nirina", "Soa", "Haja", "Fidy",
+           "Voahirana", "Tojo", "Mialy", "Zo", "Aina", "Njaka"]
+
+NIVEAUX_CYCLE = {"L": ["L1", "L2", "L3"], "M": ["M1", "M2"]}
+TYPES_ENSEIGNEMENT = {"C": ("Cours magistral", 20), "TD": ("Travaux dirigés", 15), "TP": ("Travaux pratiques", 10)}
+
+# Table -> colonne d'identité dont la séquence est recalée après insertion explicite
+IDENTITES = {
+    Semestre.__tablename__: "semestre_id",
+    UniteEnseignement.__tablename__: "ue_id",
+    ElementConstitutif.__tablename__: "ec_id",
+    Etudiant.__tablename__: "etudiant_id",
+}
+
+
+@compiles(UniqueConstraint, "sqlite")
+def _unique_sqlite(contrainte, compiler, **kw):
+    # SQLite n'accepte DEFERRABLE que sur les clés étrangères (uq_enseignant_cin)
+    return compiler.visit_unique_constraint(contrainte, **kw).replace(" DEFERRABLE", "")
+
+
+def annee_universitaire(debut):
+    return f"{debut}-{debut + 1}"
+
+
+def _inserer(connexion, modele, colonnes, lignes):
+    """ Insère un itérable de tuples par lots : COPY sous PostgreSQL, executemany sinon. """
+    table = modele.__table__
+    total = 0
+    for lot in par_lots(lignes, TAILLE_LOT):
+        total += len(lot)
+        if connexion.dialect.name == "postgresql":
+            tampon = io.StringIO()
+            csv.writer(tampon).writerows(("" if v is None else v for v in ligne) for ligne in lot)
+            tampon.seek(0)
+            with connexion.connection.cursor() as curseur:
+                curseur.copy_expert(
+                    f"COPY {table.name} ({', '.join(colonnes)}) FROM STDIN WITH (FORMAT csv, NULL '')", tampon
+                )
+        else:
+            connexion.execute(table.insert(), [dict(zip(colonnes, ligne)) for ligne in lot])
+    return total
+
+
+def _recaler_identites(connexion):
+    """ Séquences d'identité après des clés fournies explicitement (PostgreSQL). """
+    if connexion.dialect.name != "postgresql":
+        return
+    for table, colonne in IDENTITES.items():
+        connexion.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', '{colonne}'), "
+            f"coalesce(max({colonne}), 0) + 1, false) FROM {table}"
+        ))
+
+
+def _note(aleatoire):
+    return round(min(20.0, max(0.0, aleatoire.gauss(11.5, 3))) * 4) / 4
+
+
+def generer(connexion, echelle, graine=42):
+    """ Remplit une base vide ; retourne le nombre de lignes insérées par table. """
+    p = ECHELLES[echelle]
+    aleatoire = random.Random(graine)
+    comptes = {}
+
+    def inserer(modele, colonnes, lignes):
+        comptes[modele.__tablename__] = _inserer(connexion, modele, colonnes, lignes)
+
+    annees = [annee_universitaire(DERNIERE_ANNEE - i) for i in reversed(range(p["annees"]))]
+
+    # --- Listes de valeurs
+    inserer(AnneeUniversitaire, ["annee", "ordre_annee"], [(a, i + 1) for i, a in enumerate(annees)])
+    inserer(SessionExamen, ["code_session", "label"], [("N", "Normale"), ("R", "Rattrapage")])
+    inserer(ModeInscription, ["code", "label"], [("CLAS", "Classique"), ("HYB", "Hybride")])
+    inserer(TypeFormation, ["code", "label"], [("FI", "Formation initiale"), ("FC", "Formation continue")])
+    inserer(TypeEnseignement, ["code", "label"], [(code, label) for code, (label, _) in TYPES_ENSEIGNEMENT.items()])
+    inserer(Cycle, ["code", "label"], [("L", "Licence"), ("M", "Master")])
+    inserer(Niveau, ["code", "label", "cycle_code"],
+            [(n, n, cycle) for cycle, niveaux in NIVEAUX_CYCLE.items() for n in niveaux])
+
+    semestres_niveau = {}
+    semestre_ids = {}
+    numero = 0
+    for niveaux in NIVEAUX_CYCLE.values():
+        for niveau in niveaux:
+            semestres_niveau[niveau] = []
+            for _ in range(2):
+                numero += 1
+                code_semestre = f"{niveau}_S{numero:02d}"
+                semestre_ids[code_semestre] = numero
+                semestres_niveau[niveau].append((code_semestre, f"S{numero:02d}", niveau))
+    inserer(Semestre, ["semestre_id", "code_semestre", "numero_semestre", "niveau_code"],
+            [(semestre_ids[s[0]], *s) for semestres in semestres_niveau.values() for s in semestres])
+
+    # --- UE / EC (rattachées au semestre)
+    ues, ecs, ecs_semestre = [], [], {}  # ecs_semestre : code_semestre -> [ec_id]
+    credit_ue = CREDITS_SEMESTRE // p["ues_par_semestre"]
+    for semestres in semestres_niveau.values():
+        for code_semestre, _, _ in semestres:
+            ecs_semestre[code_semestre] = []
+            for u in range(1, p["ues_par_semestre"] + 1):
+                id_ue = f"UE_{code_semestre}_{u}"
+                ue_id = len(ues) + 1
+                ues.append((ue_id, id_ue, id_ue, f"Unité {u} {code_semestre}", credit_ue, code_semestre))
+                for e in range(1, p["ecs_par_ue"] + 1):
+                    id_ec = f"EC_{code_semestre}_{u}_{e}"
+                    ec_id = len(ecs) + 1
+                    ecs.append((ec_id, id_ec, id_ec, f"Élément {e} de l'unité {u}", aleatoire.randint(1, 3), id_ue))
+                    ecs_semestre[code_semestre].append(ec_id)
+    inserer(UniteEnseignement, ["ue_id", "id_ue", "code_ue", "intitule", "credit_ue", "code_semestre"], ues)
+    inserer(ElementConstitutif, ["ec_id", "id_ec", "code_ec", "intitule", "coefficient", "id_ue"], ecs)
+
+    # --- Hiérarchie administrative
+    institutions, composantes, mentions, parcours, parcours_niveaux = [], [], [], [], []
+    domaines = [("ST", "Sciences et Technologies"), ("DEG", "Droit, Économie, Gestion"),
+                ("ALSH", "Arts, Lettres, Sciences Humaines"), ("SA", "Sciences Agronomiques")]
+    niveaux_parcours = {}
+    for i in range(1, p["institutions"] + 1):
+        id_institution = f"INST{i}"
+        institutions.append((id_institution, f"Université {i}", "PUB", f"U{i}"))
+        for c in range(1, p["composantes"] + 1):
+            code_composante = f"{id_institution}_C{c}"
+            composantes.append((code_composante, f"Composante {c} - Université {i}", id_institution))
+            for m in range(1, p["mentions"] + 1):
+                id_mention = f"{code_composante}_M{m}"
+                mentions.append((id_mention, f"M{m}", f"Mention {m}", code_composante,
+                                 domaines[(c + m) % len(domaines)][0]))
+                for k in range(1, p["parcours"] + 1):
+                    id_parcours = f"{id_mention}_P{k}"
+                    cycle = "L" if k % 2 else "M"
+                    parcours.append((id_parcours, f"P{k}", f"Parcours {k}", id_mention, "FI", 2010))
+                    niveaux_parcours[id_parcours] = NIVEAUX_CYCLE[cycle]
+                    parcours_niveaux.extend(
+                        (id_parcours, niveau, ordre) for ordre, niveau in enumerate(NIVEAUX_CYCLE[cycle], 1)
+                    )
+    inserer(Institution, ["id_institution", "nom", "type_institution", "abbreviation"], institutions)
+    inserer(Domaine, ["code", "label"], domaines)
+    inserer(Composante, ["code", "label", "id_institution"], composantes)
+    inserer(Mention, ["id_mention", "code_mention", "label", "composante_code", "domaine_code"], mentions)
+    inserer(Parcours, ["id_parcours", "code_parcours", "label", "mention_id",
+                       "code_type_formation_defaut", "date_creation"], parcours)
+    inserer(ParcoursNiveau, ["id_parcours", "code_niveau", "ordre_niveau_parcours"], parcours_niveaux)
+
+    # --- Étudiants, inscriptions (2 semestres par an), notes
+    codes_parcours = list(niveaux_parcours)
+    cursus = {}  # etudiant_id -> (code_etudiant, id_parcours, rang du niveau la première année)
+    etudiants = []
+    for n in range(1, p["etudiants"] + 1):
+        code = f"ET{n:07d}"
+        id_parcours = aleatoire.choice(codes_parcours)
+        cursus[n] = (code, id_parcours, aleatoire.randrange(len(niveaux_parcours[id_parcours])))
+        etudiants.append((
+            n, code, f"{DERNIERE_ANNEE}/{n:06d}", aleatoire.choice(NOMS), aleatoire.choice(PRENOMS),
+            aleatoire.choice(["M", "F"]), aleatoire.choice(["A", "C", "D", "S"]),
+            f"03{aleatoire.randint(2, 4)}{aleatoire.randint(1000000, 9999999)}",
+        ))
+    inserer(Etudiant, ["etudiant_id", "code_etudiant", "numero_inscription", "nom", "prenoms", "sexe",
+                       "bacc_serie", "telephone"], etudiants)
+
+    def semestres_suivis():
+        for etudiant_id, (code, id_parcours, rang) in cursus.items():
+            niveaux = niveaux_parcours[id_parcours]
+            for decalage, annee in enumerate(annees):
+                niveau = niveaux[min(rang + decalage, len(niveaux) - 1)]
+                for code_semestre, _, _ in semestres_niveau[niveau]:
+                    yield etudiant_id, code, annee, id_parcours, code_semestre
+
+    inserer(Inscription, ["code_inscription", "etudiant_id", "annee_universitaire", "id_parcours",
+                          "semestre_id", "code_mode_inscription"], (
+        (f"{code}_{annee}_{code_semestre}", etudiant_id, annee, id_parcours, semestre_ids[code_semestre], "CLAS")
+        for etudiant_id, code, annee, id_parcours, code_semestre in semestres_suivis()
+    ))
+
+    def notes():
+        for etudiant_id, _, annee, _, code_semestre in semestres_suivis():
+            for ec_id in ecs_semestre[code_semestre]:
+                valeur = _note(aleatoire)
+                yield (etudiant_id, ec_id, annee, "N", valeur)
+                if valeur < 10 and aleatoire.random() < TAUX_RATTRAPAGE:
+                    yield (etudiant_id, ec_id, annee, "R", _note(aleatoire))
+
+    inserer(Note, ["etudiant_id", "ec_id", "annee_universitaire", "code_session", "valeur_note"], notes())
+
+    # --- Enseignants, volumes horaires, affectations, jurys
+    enseignants = [
+        (f"ENS{n:05d}", f"M{n:05d}", aleatoire.choice(NOMS), aleatoire.choice(PRENOMS),
+         "PERM" if aleatoire.random() < 0.6 else "VAC", aleatoire.choice(composantes)[0], f"CIN{n:09d}")
+        for n in range(1, p["enseignants"] + 1)
+    ]
+    inserer(Enseignant, ["id_enseignant", "matricule", "nom", "prenoms", "statut",
+                         "code_composante_affectation", "cin"], enseignants)
+    permanents = [e[0] for e in enseignants if e[4] == "PERM"] or [enseignants[0][0]]
+
+    inserer(VolumeHoraireEC, ["id_ec", "code_type_enseignement", "annee_universitaire", "volume_heure"], (
+        (ec[1], type_ens, annee, heures + aleatoire.choice([-5, 0, 0, 5]))
+        for annee in annees for ec in ecs for type_ens, (_, heures) in TYPES_ENSEIGNEMENT.items()
+    ))
+    inserer(AffectationEC, ["id_enseignant", "id_ec", "code_type_enseignement", "annee_universitaire",
+                            "volume_heure_effectif"], (
+        (aleatoire.choice(enseignants)[0], ec[1], type_ens, annee,
+         heures + aleatoire.choice([-2, 0, 3]) if aleatoire.random() < 0.3 else None)
+        for annee in annees for ec in ecs for type_ens, (_, heures) in TYPES_ENSEIGNEMENT.items()
+    ))
+    inserer(Jury, ["id_enseignant", "code_semestre", "annee_universitaire"], (
+        (aleatoire.choice(permanents), code_semestre, annee)
+        for annee in annees for code_semestre in ecs_semestre
+    ))
+    _recaler_identites(connexion)
+    return comptes
+
+
+def calculer_resultats(session_factory):
+    """ Résultats UE et semestre de chaque année et session, par le moteur ensembliste, puis statistiques. """
+    from app.services.resultats import SESSIONS_ORDRE, upsert_resultats_ue, upsert_resultats_semestre
+    from app.services.statistiques import rafraichir_statistiques
+
+    with session_factory() as db:
+        annees = db.scalars(select(AnneeUniversitaire.annee).order_by(AnneeUniversitaire.ordre_annee)).all()
+        for annee in annees:
+            for code_session in SESSIONS_ORDRE:
+                upsert_resultats_ue(db, annee, code_session)
+                upsert_resultats_semestre(db, annee, code_session)
+            rafraichir_statistiques(db, annee)
+        db.commit()
+
+
+def main():
+    from sqlalchemy.orm import sessionmaker
+    from app.database import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DATABASE_URL, help="URL SQLAlchemy (défaut : base de Settings)")
+    parser.add_argument("--echelle", choices=list(ECHELLES), default="moyenne")
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--resultats", action="store_true", help="calculer aussi resultats_ue / resultats_semestre")
+    parser.add_argument("--reinitialiser", action="store_true", help="supprimer les tables existantes")
+    args = parser.parse_args()
+
+    moteur = create_engine(args.url)
+    if inspect(moteur).has_table(Etudiant.__tablename__):
+        if not args.reinitialiser:
+            parser.error("la base contient déjà le schéma : relancer avec --reinitialiser pour l'écraser")
+        Base.metadata.drop_all(moteur)
+
+    debut = time.perf_counter()
+    with moteur.begin() as connexion:
+        Base.metadata.create_all(connexion)
+        marquer_a_jour(connexion)
+        comptes = generer(connexion, args.echelle, args.graine)
+    for table, nombre in comptes.items():
+        print(f"{table:<25} {nombre:>10}")
+    print(f"Génération : {time.perf_counter() - debut:.1f} s")
+
+    if args.resultats:
+        debut = time.perf_counter()
+        calculer_resultats(sessionmaker(bind=moteur, autoflush=False))
+        with moteur.connect() as connexion:
+            print(f"resultats_ue             {connexion.scalar(select(func.count()).select_from(ResultatUE)):>10}")
+        print(f"Calcul des résultats : {time.perf_counter() - debut:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
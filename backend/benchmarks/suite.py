@@ -0,0 +1,269 @@
+# benchmarks/suite.py
+"""
+Suite de benchmarks : API d'administration et de consultation (débit, p50, p95),
+calcul des résultats et export des relevés (durée), sur une base remplie par
+`benchmarks.generateur` (PostgreSQL local, ou SQLite en remplacement).
+
+Chaque mesure est rapportée à un étalon (travail fixe chronométré dans le même
+processus, voir `etalonner`) : les références de
+benchmarks/baselines/<dialecte>-<echelle>.json sont des multiples de l'étalon,
+comparables d'une machine à l'autre. La suite échoue (code 1) si une mesure
+ainsi normalisée se dégrade de plus de --tolerance.
+
+Usage (depuis backend/) :
+    python -m benchmarks.generateur --url sqlite:///bench.db --echelle mini
+    python -m benchmarks.suite --url sqlite:///bench.db --echelle mini --enregistrer   # nouvelle référence
+    python -m benchmarks.suite --url sqlite:///bench.db --echelle mini                 # comparaison
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import reference_cache
+from app.core.workers import arreter_pool
+from app.database import DATABASE_URL, get_db, get_primary_db, get_async_db
+from app.main import app
+from app.models import Institution, Inscription, Note, Semestre
+from app.services.propagation import propager, marquer_notes
+from app.services.releves import precharger_releves, zip_releves
+from app.services.resultats import calculer_resultats_ue, upsert_resultats_semestre
+
+DOSSIER_BASELINES = Path(__file__).parent / "baselines"
+MARGE_MS = 10  # écart absolu ignoré sur les mesures en millisecondes (bruit)
+TAILLE_ETALON = 20000
+
+# Routes GET mesurées ; {x} remplacés par des valeurs lues dans la base
+ROUTES = {
+    "institutions": "/api/institutions",
+    "composantes": "/api/composantes?institution_id={institution}",
+    "hierarchie": "/api/hierarchie/institution/{institution}",
+    "etudiants_page": "/api/etudiants?limit=100&sort=nom",
+    "etudiants_filtre": "/api/etudiants?limit=100&id_parcours={parcours}&annee_universitaire={annee}",
+    "inscriptions_page": "/api/inscriptions?limit=100&annee_universitaire={annee}",
+    "recherche": "/api/recherche?q=rakto&cible=etudiants",  # pg_trgm : PostgreSQL uniquement
+}
+
+
+def url_async(url):
+    url = make_url(url)
+    pilote = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}[url.get_backend_name()]
+    return url.set(drivername=pilote)
+
+
+def brancher(url):
+    """ Fait pointer les dépendances de session de l'application vers la base de benchmark. """
+    moteur = create_engine(url)
+    moteur_async = create_async_engine(url_async(url))
+    Session = sessionmaker(bind=moteur, autoflush=False)
+    AsyncSession = async_sessionmaker(moteur_async, autoflush=False, expire_on_commit=False)
+
+    def session():
+        with Session() as db:
+            yield db
+
+    async def session_async():
+        async with AsyncSession() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_primary_db] = session
+    app.dependency_overrides[get_async_db] = session_async
+    return moteur, Session
+
+
+def parametres(Session):
+    """ Valeurs réelles : première institution, et le plus gros (parcours, semestre) de la dernière année. """
+    with Session() as db:
+        parcours, annee, semestre = db.execute(
+            select(Inscription.id_parcours, Inscription.annee_universitaire, Semestre.code_semestre)
+            .join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+            .group_by(Inscription.id_parcours, Inscription.annee_universitaire, Semestre.code_semestre)
+            .order_by(Inscription.annee_universitaire.desc(), func.count().desc())
+            .limit(1)
+        ).one()
+        return {
+            "institution": db.scalar(select(Institution.id_institution).order_by(Institution.id_institution)),
+            "parcours": parcours, "annee": annee, "semestre": semestre,
+        }
+
+
+async def _mesurer_route(client, url, nb_requetes, concurrence):
+    semaphore = asyncio.Semaphore(concurrence)
+    latences = []
+
+    async def une_requete():
+        async with semaphore:
+            debut = time.perf_counter()
+            reponse = await client.get(url)
+            latences.append(time.perf_counter() - debut)
+            reponse.raise_for_status()
+
+    debut = time.perf_counter()
+    await asyncio.gather(*(une_requete() for _ in range(nb_requetes)))
+    duree = time.perf_counter() - debut
+    latences.sort()
+    return {
+        "req_par_s": round(nb_requetes / duree, 1),
+        "p50_ms": round(latences[len(latences) // 2] * 1000, 2),
+        "p95_ms": round(latences[int(len(latences) * 0.95)] * 1000, 2),
+    }
+
+
+async def scenarios_api(valeurs, dialecte, nb_requetes, concurrence):
+    resultats = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for nom, route in ROUTES.items():
+            if nom == "recherche" and dialecte != "postgresql":
+                continue
+            url = route.format(**valeurs)
+            reference_cache.clear()
+            await client.get(url)  # échauffement
+            resultats[f"api.{nom}"] = await _mesurer_route(client, url, nb_requetes, concurrence)
+    return resultats
+
+
+def _chronometrer(fonction, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append(time.perf_counter() - debut)
+    # Meilleure des répétitions : la moins perturbée par le reste de la machine
+    return {"duree_ms": round(min(durees) * 1000, 1)}
+
+
+def scenarios_traitements(Session, valeurs, repetitions):
+    """ Calculs et exports, chacun dans une transaction annulée : la base reste intacte. """
+    annee, semestre, parcours = valeurs["annee"], valeurs["semestre"], valeurs["parcours"]
+
+    def dans_transaction(traitement):
+        def executer():
+            with Session() as db:
+                traitement(db)
+                db.rollback()
+        return executer
+
+    def propagation(db):
+        notes = db.execute(
+            select(Note.etudiant_id, Note.ec_id, Note.annee_universitaire, Note.code_session)
+            .where(Note.annee_universitaire == annee).limit(500)
+        ).all()
+        marquer_notes(db, {tuple(note) for note in notes})
+        propager(db)
+
+    def releves(db):
+        lot = precharger_releves(db, parcours, annee, semestre, "N")
+        taille = sum(len(morceau) for morceau in zip_releves(lot))
+        assert taille > 0
+
+    return {
+        "calcul.resultats_ue_semestre": _chronometrer(dans_transaction(
+            lambda db: calculer_resultats_ue(db, annee, semestre, "N")), repetitions),
+        "calcul.resultats_semestre": _chronometrer(dans_transaction(
+            lambda db: upsert_resultats_semestre(db, annee, "N", code_semestre=semestre)), repetitions),
+        "calcul.propagation_500_notes": _chronometrer(dans_transaction(propagation), repetitions),
+        "export.releves_zip": _chronometrer(dans_transaction(releves), repetitions),
+    }
+
+
+def etalonner(Session, repetitions):
+    """
+    Durée (ms) d'un travail fixe : allers-retours élémentaires vers la base, tri et
+    sérialisation JSON en Python pur. Mesurée dans le même processus que les scénarios,
+    elle absorbe la vitesse de la machine et de la base.
+    """
+    donnees = [{"code": f"ET{i:07d}", "note": (i * 7) % 21} for i in range(TAILLE_ETALON)]
+
+    def travail():
+        with Session() as db:
+            for _ in range(200):
+                db.execute(select(1)).scalar()
+        json.dumps(sorted(donnees, key=lambda d: (d["note"], d["code"])))
+
+    return _chronometrer(travail, repetitions)["duree_ms"]
+
+
+def normaliser(mesures, etalon_ms):
+    """ Mesures en multiples de l'étalon : durées divisées, débits multipliés. """
+    return {
+        scenario: {
+            metrique: round(valeur * etalon_ms if metrique == "req_par_s" else valeur / etalon_ms, 4)
+            for metrique, valeur in valeurs.items()
+        }
+        for scenario, valeurs in mesures.items()
+    }
+
+
+def comparer(mesures, reference, tolerance, marge):
+    """
+    Liste des dégradations au-delà de la tolérance (débit en baisse, durées en hausse).
+    `mesures` et `reference` sont normalisées ; `marge` est l'écart de durée ignoré, dans la même unité.
+    """
+    regressions = []
+    for scenario, valeurs in mesures.items():
+        for metrique, valeur in valeurs.items():
+            attendu = reference.get(scenario, {}).get(metrique)
+            if not attendu:
+                continue
+            if metrique == "req_par_s":
+                degrade = valeur < attendu * (1 - tolerance)
+            else:
+                degrade = valeur > attendu * (1 + tolerance) and valeur - attendu > marge
+            if degrade:
+                regressions.append(f"{scenario}.{metrique} : {valeur} (référence {attendu})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DATABASE_URL)
+    parser.add_argument("--echelle", default="moyenne", help="échelle de la base (nom du fichier de référence)")
+    parser.add_argument("--requetes", type=int, default=300, help="requêtes par route")
+    parser.add_argument("--concurrence", type=int, default=20)
+    parser.add_argument("--repetitions", type=int, default=5, help="répétitions des traitements (meilleure durée)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dégradation admise (0.25 = 25 %%)")
+    parser.add_argument("--enregistrer", action="store_true", help="enregistrer les mesures comme référence")
+    args = parser.parse_args()
+
+    moteur, Session = brancher(args.url)
+    dialecte = moteur.dialect.name
+    valeurs = parametres(Session)
+
+    etalon_ms = etalonner(Session, args.repetitions)
+    mesures = asyncio.run(scenarios_api(valeurs, dialecte, args.requetes, args.concurrence))
+    mesures.update(scenarios_traitements(Session, valeurs, args.repetitions))
+    arreter_pool()
+    print(f"{'étalon':<32} duree_ms {etalon_ms}")
+    for scenario, valeurs_scenario in mesures.items():
+        print(f"{scenario:<32} " + "  ".join(f"{k} {v}" for k, v in valeurs_scenario.items()))
+    mesures = normaliser(mesures, etalon_ms)
+
+    fichier = DOSSIER_BASELINES / f"{dialecte}-{args.echelle}.json"
+    if args.enregistrer:
+        DOSSIER_BASELINES.mkdir(exist_ok=True)
+        fichier.write_text(json.dumps(mesures, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Référence enregistrée : {fichier}")
+        return
+    if not fichier.exists():
+        print(f"Aucune référence ({fichier}) : relancer avec --enregistrer")
+        return
+    regressions = comparer(mesures, json.loads(fichier.read_text(encoding="utf-8")), args.tolerance,
+                           MARGE_MS / etalon_ms)
+    if regressions:
+        print("\nRégressions (en multiples de l'étalon) :\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+    print(f"\nAucune régression par rapport à {fichier.name}")
+
+
+if __name__ == "__main__":
+    main()
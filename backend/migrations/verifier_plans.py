@@ -0,0 +1,168 @@
+# migrations/verifier_plans.py
+"""
+Vérification des plans d'exécution des requêtes chaudes (PostgreSQL).
+
+Dans une transaction annulée à la fin, le script peuple un jeu de données
+synthétique (codes préfixés par X), lance ANALYZE, puis un EXPLAIN de chaque
+requête chaude. Il échoue (code retour 1) si l'une d'elles lit une table
+volumineuse en Seq Scan, c'est-à-dire si un index du plan a disparu ou
+n'est plus utilisable.
+
+Usage (depuis backend/, schéma à jour via `alembic upgrade head`) :
+    python -m migrations.verifier_plans
+"""
+import json
+import sys
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import DATABASE_URL
+from app.models import (
+    Note, Inscription, ResultatUE, ResultatSemestre, AffectationEC, Etudiant, ElementConstitutif,
+    UniteEnseignement,
+)
+from app.core.pagination import paginer, encoder_curseur
+from app.services.resultats import select_resultats_ue, id_semestre
+
+TABLES_CHAUDES = {
+    "notes", "inscriptions", "resultats_ue", "resultats_semestre", "affectations_ec",
+    "etudiants", "elements_constitutifs", "unites_enseignement",
+}
+
+NB_ETUDIANTS = 10000
+
+JEU_DE_DONNEES = [
+    "INSERT INTO annees_universitaires (annee, ordre_annee) "
+    "SELECT 'XPLAN-00' || i, -i FROM generate_series(1, 5) i",
+    "INSERT INTO sessions_examen (code_session, label) VALUES ('XN', 'XPlan N'), ('XR', 'XPlan R')",
+    "INSERT INTO cycles (code, label) VALUES ('XPLAN', 'XPlan cycle')",
+    "INSERT INTO niveaux (code, label, cycle_code) SELECT 'XPL' || i, 'XPL' || i, 'XPLAN' FROM generate_series(1, 5) i",
+    "INSERT INTO semestres (code_semestre, numero_semestre, niveau_code) "
+    "SELECT 'XPL' || n || '_S0' || k, 'S0' || k, 'XPL' || n FROM generate_series(1, 5) n, generate_series(1, 2) k",
+    "INSERT INTO institutions (id_institution, nom, type_institution) VALUES ('XPLAN', 'XPlan institution', 'PUB')",
+    "INSERT INTO composantes (code, label, id_institution) VALUES ('XPLAN', 'XPlan', 'XPLAN')",
+    "INSERT INTO domaines (code, label) VALUES ('XPLAN', 'XPlan')",
+    "INSERT INTO mentions (id_mention, code_mention, composante_code, domaine_code) "
+    "VALUES ('XPLAN', 'XPLAN', 'XPLAN', 'XPLAN')",
+    "INSERT INTO types_formation (code, label) VALUES ('XPLAN', 'XPlan formation')",
+    "INSERT INTO parcours (id_parcours, code_parcours, mention_id, code_type_formation_defaut) "
+    "SELECT 'XPLAN-P' || i, 'XP' || i, 'XPLAN', 'XPLAN' FROM generate_series(1, 20) i",
+    "INSERT INTO modes_inscription (code, label) VALUES ('XPLAN', 'XPlan mode')",
+    "INSERT INTO types_enseignement (code, label) VALUES ('XC', 'XPlan C'), ('XTD', 'XPlan TD'), ('XTP', 'XPlan TP')",
+    # 10 semestres x 10 UE x 4 EC
+    "INSERT INTO unites_enseignement (id_ue, code_ue, intitule, credit_ue, code_semestre) "
+    "SELECT 'XUE' || i, 'XUE' || i, 'UE ' || i, 3, "
+    "'XPL' || ((i - 1) / 20 + 1) || '_S0' || ((i - 1) / 10 % 2 + 1) FROM generate_series(1, 100) i",
+    "INSERT INTO elements_constitutifs (id_ec, code_ec, intitule, coefficient, id_ue) "
+    "SELECT 'XEC' || i, 'XEC' || i, 'EC ' || i, 1, 'XUE' || ((i - 1) / 4 + 1) FROM generate_series(1, 400) i",
+    f"INSERT INTO etudiants (code_etudiant, nom, prenoms) "
+    f"SELECT 'XE' || i, md5(i::text), md5((i * 7)::text) FROM generate_series(1, {NB_ETUDIANTS}) i",
+    "INSERT INTO inscriptions (code_inscription, etudiant_id, annee_universitaire, id_parcours, "
+    "semestre_id, code_mode_inscription) "
+    "SELECT 'XI' || e.code_etudiant, e.etudiant_id, 'XPLAN-00' || (substr(e.code_etudiant, 3)::int % 5 + 1), "
+    "'XPLAN-P' || (substr(e.code_etudiant, 3)::int % 20 + 1), "
+    "(SELECT semestre_id FROM semestres WHERE code_semestre LIKE 'XPL%' "
+    " ORDER BY code_semestre OFFSET substr(e.code_etudiant, 3)::int % 10 LIMIT 1), 'XPLAN' "
+    "FROM etudiants e WHERE e.code_etudiant LIKE 'XE%'",
+    "INSERT INTO notes (etudiant_id, ec_id, annee_universitaire, code_session, valeur_note) "
+    "SELECT i.etudiant_id, ec.ec_id, i.annee_universitaire, 'XN', (random() * 20)::numeric(5, 2) "
+    "FROM inscriptions i JOIN semestres s ON s.semestre_id = i.semestre_id "
+    "JOIN unites_enseignement ue ON ue.code_semestre = s.code_semestre "
+    "JOIN elements_constitutifs ec ON ec.id_ue = ue.id_ue WHERE i.code_inscription LIKE 'XI%'",
+    "INSERT INTO resultats_ue (etudiant_id, ue_id, annee_universitaire, code_session, "
+    "moyenne_ue, is_ue_acquise, credit_obtenu) "
+    "SELECT i.etudiant_id, ue.ue_id, i.annee_universitaire, 'XN', 10, true, 3 "
+    "FROM inscriptions i JOIN semestres s ON s.semestre_id = i.semestre_id "
+    "JOIN unites_enseignement ue ON ue.code_semestre = s.code_semestre "
+    "WHERE i.code_inscription LIKE 'XI%'",
+    "INSERT INTO resultats_semestre (etudiant_id, semestre_id, annee_universitaire, code_session, "
+    "statut_validation, credits_acquis, moyenne_obtenue) "
+    "SELECT etudiant_id, semestre_id, annee_universitaire, 'XN', 'V', 30, 10 "
+    "FROM inscriptions WHERE code_inscription LIKE 'XI%'",
+    "INSERT INTO enseignants (id_enseignant, nom, statut) "
+    "SELECT 'XENS' || i, 'Enseignant ' || i, 'PERM' FROM generate_series(1, 300) i",
+    "INSERT INTO affectations_ec (id_enseignant, id_ec, code_type_enseignement, annee_universitaire) "
+    "SELECT 'XENS' || ((e * 3 + t + a) % 300 + 1), 'XEC' || e, (ARRAY['XC', 'XTD', 'XTP'])[t], 'XPLAN-00' || a "
+    "FROM generate_series(1, 400) e, generate_series(1, 3) t, generate_series(1, 5) a",
+]
+
+
+def requetes_chaudes():
+    annee, session = "XPLAN-001", "XN"
+    ec = select(ElementConstitutif.ec_id).where(ElementConstitutif.id_ec == "XEC1").scalar_subquery()
+    ue = select(UniteEnseignement.ue_id).where(UniteEnseignement.id_ue == "XUE1").scalar_subquery()
+    etudiant = select(Etudiant.etudiant_id).where(Etudiant.code_etudiant == "XE1").scalar_subquery()
+    return {
+        "notes d'un EC": select(Note).where(
+            Note.ec_id == ec, Note.annee_universitaire == annee, Note.code_session == session
+        ),
+        "inscrits d'un parcours / semestre": select(Inscription).where(
+            Inscription.id_parcours == "XPLAN-P1",
+            Inscription.annee_universitaire == annee,
+            Inscription.semestre_id == id_semestre("XPL1_S01"),
+        ),
+        "résultats d'une UE": select(ResultatUE).where(
+            ResultatUE.ue_id == ue, ResultatUE.annee_universitaire == annee, ResultatUE.code_session == session
+        ),
+        "résultats d'un semestre": select(ResultatSemestre).where(
+            ResultatSemestre.semestre_id == id_semestre("XPL1_S01"),
+            ResultatSemestre.annee_universitaire == annee,
+            ResultatSemestre.code_session == session,
+        ),
+        "charge d'un enseignant": select(AffectationEC).where(
+            AffectationEC.id_enseignant == "XENS1", AffectationEC.annee_universitaire == annee
+        ),
+        "EC d'une UE": select(ElementConstitutif).where(ElementConstitutif.id_ue == "XUE1"),
+        "page d'étudiants par nom": paginer(
+            select(Etudiant.code_etudiant, Etudiant.nom),
+            [Etudiant.nom, Etudiant.code_etudiant], encoder_curseur(["8", "XE1"]), 50,
+        ),
+        "recalcul ciblé d'un résultat UE": select_resultats_ue(
+            annee, session, etudiants=select(etudiant), ues=select(ue)
+        ),
+    }
+
+
+def _parcours_seq_scans(noeud):
+    if noeud.get("Node Type") == "Seq Scan":
+        yield noeud.get("Relation Name")
+    for enfant in noeud.get("Plans", []):
+        yield from _parcours_seq_scans(enfant)
+
+
+def verifier(connexion):
+    """ Retourne la liste des (requête, table) lues en Seq Scan sur une table chaude. """
+    echecs = []
+    for nom, requete in requetes_chaudes().items():
+        sql = requete.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        plan = connexion.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        tables = set(_parcours_seq_scans(plan[0]["Plan"])) & TABLES_CHAUDES
+        statut = "OK" if not tables else "SEQ SCAN sur " + ", ".join(sorted(tables))
+        print(f"{nom:<35} {statut}")
+        echecs.extend((nom, table) for table in tables)
+    return echecs
+
+
+def main():
+    engine = create_engine(DATABASE_URL)
+    with engine.connect() as connexion:
+        transaction = connexion.begin()
+        try:
+            for instruction in JEU_DE_DONNEES:
+                connexion.execute(text(instruction))
+            for table in sorted(TABLES_CHAUDES | {"enseignants"}):
+                connexion.exec_driver_sql(f"ANALYZE {table}")
+            echecs = verifier(connexion)
+        finally:
+            transaction.rollback()
+    if echecs:
+        print(f"\n{len(echecs)} requête(s) chaude(s) sans index utilisable.")
+        sys.exit(1)
+    print("\nTous les plans utilisent un index.")
+
+
+if __name__ == "__main__":
+    main()
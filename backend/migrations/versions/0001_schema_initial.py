@@ -0,0 +1,389 @@
+"""Schéma initial (tables créées jusqu'ici par Base.metadata.create_all)
+
+Pour une base existante créée par create_all :  alembic stamp 0001_schema_initial
+
+Revision ID: 0001_schema_initial
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_schema_initial"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_RECHERCHE = {
+    "ix_etudiants_recherche_nom_trgm": (
+        "etudiants", "immutable_unaccent(lower(coalesce(nom, '') || ' ' || coalesce(prenoms, '')))"
+    ),
+    "ix_etudiants_recherche_identifiants_trgm": (
+        "etudiants",
+        "immutable_unaccent(lower(coalesce(numero_inscription, '') || ' ' || coalesce(cin, '') "
+        "|| ' ' || coalesce(telephone, '')))",
+    ),
+    "ix_enseignants_recherche_trgm": (
+        "enseignants",
+        "immutable_unaccent(lower(coalesce(nom, '') || ' ' || coalesce(prenoms, '') "
+        "|| ' ' || coalesce(matricule, '')))",
+    ),
+}
+
+
+def _postgresql():
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def upgrade():
+    if _postgresql():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+        op.execute(
+            "CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS "
+            "$$ SELECT public.unaccent('public.unaccent', $1) $$ "
+            "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT"
+        )
+
+    op.create_table('annees_universitaires',
+    sa.Column('annee', sa.String(length=9), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('ordre_annee', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('annee'),
+    sa.UniqueConstraint('ordre_annee')
+    )
+    op.create_table('cycles',
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('code'),
+    sa.UniqueConstraint('label')
+    )
+    op.create_table('domaines',
+    sa.Column('code', sa.String(length=20), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('code')
+    )
+    op.create_table('etudiants',
+    sa.Column('code_etudiant', sa.String(length=50), nullable=False),
+    sa.Column('numero_inscription', sa.String(length=100), nullable=True),
+    sa.Column('nom', sa.String(length=100), nullable=False),
+    sa.Column('prenoms', sa.String(length=150), nullable=True),
+    sa.Column('sexe', sa.String(length=20), nullable=True),
+    sa.Column('naissance_date', sa.Date(), nullable=True),
+    sa.Column('naissance_lieu', sa.String(length=100), nullable=True),
+    sa.Column('nationalite', sa.String(length=50), nullable=True),
+    sa.Column('bacc_annee', sa.Integer(), nullable=True),
+    sa.Column('bacc_serie', sa.String(length=50), nullable=True),
+    sa.Column('bacc_centre', sa.String(length=100), nullable=True),
+    sa.Column('adresse', sa.String(length=255), nullable=True),
+    sa.Column('telephone', sa.String(length=50), nullable=True),
+    sa.Column('mail', sa.String(length=100), nullable=True),
+    sa.Column('cin', sa.String(length=100), nullable=True),
+    sa.Column('cin_date', sa.Date(), nullable=True),
+    sa.Column('cin_lieu', sa.String(length=100), nullable=True),
+    sa.Column('photo_profil_path', sa.String(length=255), nullable=True),
+    sa.Column('scan_cin_path', sa.String(length=255), nullable=True),
+    sa.Column('scan_releves_notes_bacc_path', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('code_etudiant')
+    )
+    op.create_table('institutions',
+    sa.Column('id_institution', sa.String(length=32), nullable=False),
+    sa.Column('nom', sa.String(length=255), nullable=False),
+    sa.Column('type_institution', sa.String(length=10), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('abbreviation', sa.String(length=20), nullable=True),
+    sa.Column('logo_path', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id_institution'),
+    sa.UniqueConstraint('abbreviation'),
+    sa.UniqueConstraint('nom')
+    )
+    op.create_table('modes_inscription',
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('code'),
+    sa.UniqueConstraint('label')
+    )
+    op.create_table('sessions_examen',
+    sa.Column('code_session', sa.String(length=5), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('code_session'),
+    sa.UniqueConstraint('label')
+    )
+    op.create_table('types_enseignement',
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('code'),
+    sa.UniqueConstraint('label')
+    )
+    op.create_table('types_formation',
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('code'),
+    sa.UniqueConstraint('label')
+    )
+    op.create_table('composantes',
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('abbreviation', sa.String(length=20), nullable=True),
+    sa.Column('logo_path', sa.String(length=255), nullable=True),
+    sa.Column('id_institution', sa.String(length=32), nullable=False),
+    sa.ForeignKeyConstraint(['id_institution'], ['institutions.id_institution'], ),
+    sa.PrimaryKeyConstraint('code')
+    )
+    op.create_table('niveaux',
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('label', sa.String(length=50), nullable=True),
+    sa.Column('cycle_code', sa.String(length=10), nullable=False),
+    sa.ForeignKeyConstraint(['cycle_code'], ['cycles.code'], ),
+    sa.PrimaryKeyConstraint('code')
+    )
+    op.create_table('suivi_credits_cycles',
+    sa.Column('id_suivi', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('code_etudiant', sa.String(length=50), nullable=False),
+    sa.Column('cycle_code', sa.String(length=10), nullable=False),
+    sa.Column('credit_total_acquis', sa.Integer(), nullable=False),
+    sa.Column('is_cycle_valide', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['code_etudiant'], ['etudiants.code_etudiant'], ),
+    sa.ForeignKeyConstraint(['cycle_code'], ['cycles.code'], ),
+    sa.PrimaryKeyConstraint('id_suivi'),
+    sa.UniqueConstraint('code_etudiant', 'cycle_code', name='uq_etudiant_cycle_credit')
+    )
+    op.create_table('enseignants',
+    sa.Column('id_enseignant', sa.String(length=50), nullable=False),
+    sa.Column('matricule', sa.String(length=50), nullable=True),
+    sa.Column('nom', sa.String(length=100), nullable=False),
+    sa.Column('prenoms', sa.String(length=150), nullable=True),
+    sa.Column('sexe', sa.String(length=20), nullable=True),
+    sa.Column('date_naissance', sa.Date(), nullable=True),
+    sa.Column('grade', sa.String(length=50), nullable=True),
+    sa.Column('statut', sa.String(length=10), nullable=False),
+    sa.CheckConstraint("statut IN ('PERM', 'VAC')", name='check_statut_enseignant'),
+    sa.Column('code_composante_affectation', sa.String(length=50), nullable=True),
+    sa.Column('cin', sa.String(length=100), nullable=True),
+    sa.Column('cin_date', sa.Date(), nullable=True),
+    sa.Column('cin_lieu', sa.String(length=100), nullable=True),
+    sa.Column('telephone', sa.String(length=50), nullable=True),
+    sa.Column('mail', sa.String(length=100), nullable=True),
+    sa.Column('rib', sa.String(length=100), nullable=True),
+    sa.Column('photo_profil_path', sa.String(length=255), nullable=True),
+    sa.Column('scan_cin_path', sa.String(length=255), nullable=True),
+    sa.ForeignKeyConstraint(['code_composante_affectation'], ['composantes.code'], ),
+    sa.PrimaryKeyConstraint('id_enseignant'),
+    sa.UniqueConstraint('cin', deferrable=True, name='uq_enseignant_cin'),
+    sa.UniqueConstraint('matricule')
+    )
+    op.create_table('mentions',
+    sa.Column('id_mention', sa.String(length=50), nullable=False),
+    sa.Column('code_mention', sa.String(length=30), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('abbreviation', sa.String(length=20), nullable=True),
+    sa.Column('logo_path', sa.String(length=255), nullable=True),
+    sa.Column('composante_code', sa.String(length=50), nullable=False),
+    sa.Column('domaine_code', sa.String(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['composante_code'], ['composantes.code'], ),
+    sa.ForeignKeyConstraint(['domaine_code'], ['domaines.code'], ),
+    sa.PrimaryKeyConstraint('id_mention'),
+    sa.UniqueConstraint('code_mention', 'composante_code', name='unique_mention_code_composante')
+    )
+    op.create_table('semestres',
+    sa.Column('code_semestre', sa.String(length=10), nullable=False),
+    sa.Column('numero_semestre', sa.String(length=10), nullable=False),
+    sa.Column('niveau_code', sa.String(length=10), nullable=False),
+    sa.ForeignKeyConstraint(['niveau_code'], ['niveaux.code'], ),
+    sa.PrimaryKeyConstraint('code_semestre'),
+    sa.UniqueConstraint('niveau_code', 'numero_semestre', name='uq_niveau_numero_semestre')
+    )
+    op.create_table('jurys',
+    sa.Column('id_jury', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_enseignant', sa.String(length=50), nullable=False),
+    sa.Column('code_semestre', sa.String(length=10), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=9), nullable=False),
+    sa.Column('date_nomination', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_semestre'], ['semestres.code_semestre'], ),
+    sa.ForeignKeyConstraint(['id_enseignant'], ['enseignants.id_enseignant'], ),
+    sa.PrimaryKeyConstraint('id_jury'),
+    sa.UniqueConstraint('code_semestre', 'annee_universitaire', name='uq_jury_unique')
+    )
+    op.create_table('parcours',
+    sa.Column('id_parcours', sa.String(length=50), nullable=False),
+    sa.Column('code_parcours', sa.String(length=20), nullable=False),
+    sa.Column('label', sa.String(length=100), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('abbreviation', sa.String(length=20), nullable=True),
+    sa.Column('logo_path', sa.String(length=255), nullable=True),
+    sa.Column('date_creation', sa.Integer(), nullable=True),
+    sa.Column('date_fin', sa.Integer(), nullable=True),
+    sa.Column('mention_id', sa.String(length=50), nullable=False),
+    sa.Column('code_type_formation_defaut', sa.String(length=10), nullable=False),
+    sa.ForeignKeyConstraint(['code_type_formation_defaut'], ['types_formation.code'], ),
+    sa.ForeignKeyConstraint(['mention_id'], ['mentions.id_mention'], ),
+    sa.PrimaryKeyConstraint('id_parcours'),
+    sa.UniqueConstraint('code_parcours', 'mention_id', name='unique_parcours_code_mention')
+    )
+    op.create_table('resultats_semestre',
+    sa.Column('id_resultat', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('code_etudiant', sa.String(length=50), nullable=False),
+    sa.Column('code_semestre', sa.String(length=50), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=10), nullable=False),
+    sa.Column('code_session', sa.String(length=5), nullable=False),
+    sa.Column('statut_validation', sa.String(length=5), nullable=False),
+    sa.CheckConstraint("statut_validation IN ('V', 'NV', 'AJ')", name='check_statut_validation'),
+    sa.Column('credits_acquis', sa.Numeric(precision=4, scale=1), nullable=True),
+    sa.Column('moyenne_obtenue', sa.Numeric(precision=4, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_etudiant'], ['etudiants.code_etudiant'], ),
+    sa.ForeignKeyConstraint(['code_semestre'], ['semestres.code_semestre'], ),
+    sa.ForeignKeyConstraint(['code_session'], ['sessions_examen.code_session'], ),
+    sa.PrimaryKeyConstraint('id_resultat'),
+    sa.UniqueConstraint('code_etudiant', 'code_semestre', 'annee_universitaire', 'code_session', name='uq_resultat_semestre_session')
+    )
+    op.create_table('unites_enseignement',
+    sa.Column('id_ue', sa.String(length=50), nullable=False),
+    sa.Column('code_ue', sa.String(length=20), nullable=False),
+    sa.Column('intitule', sa.String(length=255), nullable=False),
+    sa.Column('credit_ue', sa.Integer(), nullable=False),
+    sa.Column('code_semestre', sa.String(length=10), nullable=False),
+    sa.ForeignKeyConstraint(['code_semestre'], ['semestres.code_semestre'], ),
+    sa.PrimaryKeyConstraint('id_ue'),
+    sa.UniqueConstraint('code_ue')
+    )
+    op.create_table('elements_constitutifs',
+    sa.Column('id_ec', sa.String(length=50), nullable=False),
+    sa.Column('code_ec', sa.String(length=20), nullable=False),
+    sa.Column('intitule', sa.String(length=255), nullable=False),
+    sa.Column('coefficient', sa.Integer(), nullable=False),
+    sa.Column('id_ue', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['id_ue'], ['unites_enseignement.id_ue'], ),
+    sa.PrimaryKeyConstraint('id_ec'),
+    sa.UniqueConstraint('code_ec')
+    )
+    op.create_table('inscriptions',
+    sa.Column('code_inscription', sa.String(length=100), nullable=False),
+    sa.Column('code_etudiant', sa.String(length=50), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=9), nullable=False),
+    sa.Column('id_parcours', sa.String(length=50), nullable=False),
+    sa.Column('code_semestre', sa.String(length=10), nullable=False),
+    sa.Column('code_mode_inscription', sa.String(length=10), nullable=False),
+    sa.Column('credit_acquis_semestre', sa.Integer(), nullable=True),
+    sa.Column('is_semestre_valide', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_etudiant'], ['etudiants.code_etudiant'], ),
+    sa.ForeignKeyConstraint(['code_mode_inscription'], ['modes_inscription.code'], ),
+    sa.ForeignKeyConstraint(['code_semestre'], ['semestres.code_semestre'], ),
+    sa.ForeignKeyConstraint(['id_parcours'], ['parcours.id_parcours'], ),
+    sa.PrimaryKeyConstraint('code_inscription'),
+    sa.UniqueConstraint('code_etudiant', 'annee_universitaire', 'id_parcours', 'code_semestre', name='uq_etudiant_annee_parcours_semestre')
+    )
+    op.create_table('parcours_niveaux',
+    sa.Column('id_parcours_niveau', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_parcours', sa.String(length=50), nullable=False),
+    sa.Column('code_niveau', sa.String(length=10), nullable=False),
+    sa.Column('ordre_niveau_parcours', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['code_niveau'], ['niveaux.code'], ),
+    sa.ForeignKeyConstraint(['id_parcours'], ['parcours.id_parcours'], ),
+    sa.PrimaryKeyConstraint('id_parcours_niveau'),
+    sa.UniqueConstraint('id_parcours', 'code_niveau', name='uq_parcours_niveau_unique')
+    )
+    op.create_table('resultats_ue',
+    sa.Column('id_resultat_ue', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('code_etudiant', sa.String(length=50), nullable=False),
+    sa.Column('id_ue', sa.String(length=50), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=9), nullable=False),
+    sa.Column('code_session', sa.String(length=5), nullable=False),
+    sa.Column('moyenne_ue', sa.Numeric(precision=4, scale=2), nullable=False),
+    sa.Column('is_ue_acquise', sa.Boolean(), nullable=False),
+    sa.Column('credit_obtenu', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_etudiant'], ['etudiants.code_etudiant'], ),
+    sa.ForeignKeyConstraint(['code_session'], ['sessions_examen.code_session'], ),
+    sa.ForeignKeyConstraint(['id_ue'], ['unites_enseignement.id_ue'], ),
+    sa.PrimaryKeyConstraint('id_resultat_ue'),
+    sa.UniqueConstraint('code_etudiant', 'id_ue', 'annee_universitaire', 'code_session', name='uq_resultat_ue_unique')
+    )
+    op.create_table('affectations_ec',
+    sa.Column('id_affectation', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_enseignant', sa.String(length=50), nullable=False),
+    sa.Column('id_ec', sa.String(length=50), nullable=False),
+    sa.Column('code_type_enseignement', sa.String(length=10), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=9), nullable=False),
+    sa.Column('volume_heure_effectif', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_type_enseignement'], ['types_enseignement.code'], ),
+    sa.ForeignKeyConstraint(['id_ec'], ['elements_constitutifs.id_ec'], ),
+    sa.ForeignKeyConstraint(['id_enseignant'], ['enseignants.id_enseignant'], ),
+    sa.PrimaryKeyConstraint('id_affectation'),
+    sa.UniqueConstraint('id_ec', 'code_type_enseignement', 'annee_universitaire', name='uq_affectation_unique')
+    )
+    op.create_table('notes',
+    sa.Column('id_note', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('code_etudiant', sa.String(length=50), nullable=False),
+    sa.Column('id_ec', sa.String(length=50), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=9), nullable=False),
+    sa.Column('code_session', sa.String(length=5), nullable=False),
+    sa.Column('valeur_note', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_etudiant'], ['etudiants.code_etudiant'], ),
+    sa.ForeignKeyConstraint(['code_session'], ['sessions_examen.code_session'], ),
+    sa.ForeignKeyConstraint(['id_ec'], ['elements_constitutifs.id_ec'], ),
+    sa.PrimaryKeyConstraint('id_note'),
+    sa.UniqueConstraint('code_etudiant', 'id_ec', 'annee_universitaire', 'code_session', name='uq_etudiant_ec_annee_session')
+    )
+    op.create_table('volume_horaire_ec',
+    sa.Column('id_volume_horaire', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_ec', sa.String(length=50), nullable=False),
+    sa.Column('code_type_enseignement', sa.String(length=10), nullable=False),
+    sa.Column('annee_universitaire', sa.String(length=9), nullable=False),
+    sa.Column('volume_heure', sa.Numeric(precision=5, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['annee_universitaire'], ['annees_universitaires.annee'], ),
+    sa.ForeignKeyConstraint(['code_type_enseignement'], ['types_enseignement.code'], ),
+    sa.ForeignKeyConstraint(['id_ec'], ['elements_constitutifs.id_ec'], ),
+    sa.PrimaryKeyConstraint('id_volume_horaire'),
+    sa.UniqueConstraint('id_ec', 'code_type_enseignement', 'annee_universitaire', name='uq_ec_vh_type_annee')
+    )
+
+    # Index GIN trigrammes de la recherche floue (cf. app.models)
+    if _postgresql():
+        for nom, (table, expression) in INDEX_RECHERCHE.items():
+            op.execute(f"CREATE INDEX {nom} ON {table} USING gin (({expression}) gin_trgm_ops)")
+
+
+def downgrade():
+    if _postgresql():
+        for nom in INDEX_RECHERCHE:
+            op.execute(f"DROP INDEX IF EXISTS {nom}")
+
+    op.drop_table('volume_horaire_ec')
+    op.drop_table('notes')
+    op.drop_table('affectations_ec')
+    op.drop_table('resultats_ue')
+    op.drop_table('parcours_niveaux')
+    op.drop_table('inscriptions')
+    op.drop_table('elements_constitutifs')
+    op.drop_table('unites_enseignement')
+    op.drop_table('resultats_semestre')
+    op.drop_table('parcours')
+    op.drop_table('jurys')
+    op.drop_table('semestres')
+    op.drop_table('mentions')
+    op.drop_table('enseignants')
+    op.drop_table('suivi_credits_cycles')
+    op.drop_table('niveaux')
+    op.drop_table('composantes')
+    op.drop_table('types_formation')
+    op.drop_table('types_enseignement')
+    op.drop_table('sessions_examen')
+    op.drop_table('modes_inscription')
+    op.drop_table('institutions')
+    op.drop_table('etudiants')
+    op.drop_table('domaines')
+    op.drop_table('cycles')
+    op.drop_table('annees_universitaires')
+
+    if _postgresql():
+        op.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
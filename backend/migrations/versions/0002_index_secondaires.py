@@ -0,0 +1,42 @@
+"""Index secondaires sur les clés étrangères filtrées par les requêtes chaudes
+
+Créés avec CREATE INDEX CONCURRENTLY sous PostgreSQL pour ne pas bloquer
+les écritures sur notes / inscriptions / resultats_* pendant la migration.
+
+Revision ID: 0002_index_secondaires
+Revises: 0001_schema_initial
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002_index_secondaires"
+down_revision = "0001_schema_initial"
+branch_labels = None
+depends_on = None
+
+INDEX = [
+    ("ix_composantes_institution", "composantes", ["id_institution"]),
+    ("ix_mentions_composante", "mentions", ["composante_code"]),
+    ("ix_parcours_mention", "parcours", ["mention_id"]),
+    ("ix_unites_enseignement_semestre", "unites_enseignement", ["code_semestre"]),
+    ("ix_elements_constitutifs_ue", "elements_constitutifs", ["id_ue"]),
+    ("ix_etudiants_nom", "etudiants", ["nom", "code_etudiant"]),
+    ("ix_inscriptions_parcours_annee_semestre", "inscriptions", ["id_parcours", "annee_universitaire", "code_semestre"]),
+    ("ix_inscriptions_annee_semestre", "inscriptions", ["annee_universitaire", "code_semestre"]),
+    ("ix_resultats_semestre_semestre_annee_session", "resultats_semestre", ["code_semestre", "annee_universitaire", "code_session"]),
+    ("ix_resultats_ue_ue_annee_session", "resultats_ue", ["id_ue", "annee_universitaire", "code_session"]),
+    ("ix_notes_ec_annee_session", "notes", ["id_ec", "annee_universitaire", "code_session"]),
+    ("ix_affectations_ec_enseignant_annee", "affectations_ec", ["id_enseignant", "annee_universitaire"]),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for nom, table, colonnes in INDEX:
+            op.create_index(nom, table, colonnes, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for nom, table, _ in reversed(INDEX):
+            op.drop_index(nom, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,31 @@
+"""Table schema_empreinte (empreinte des modèles vérifiée au démarrage)
+
+Table supprimée par 0006_suppression_empreinte : le démarrage compare
+désormais la révision Alembic de la base.
+
+Revision ID: 0003_schema_empreinte
+Revises: 0002_index_secondaires
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_schema_empreinte"
+down_revision = "0002_index_secondaires"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "schema_empreinte",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empreinte", sa.String(length=64), nullable=False),
+        sa.Column("date_enregistrement", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("schema_empreinte")
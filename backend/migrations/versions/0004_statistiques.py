@@ -0,0 +1,78 @@
+"""Tables pré-agrégées du tableau de bord (stats_semestre, stats_ue, stats_credits)
+
+Après `alembic upgrade head`, remplir les tables à partir des résultats existants :
+    python -m app.services.statistiques reconstruire
+
+Revision ID: 0004_statistiques
+Revises: 0003_schema_empreinte
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_statistiques"
+down_revision = "0003_schema_empreinte"
+branch_labels = None
+depends_on = None
+
+
+def _colonnes_groupe():
+    return [
+        sa.Column("id_stat", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("id_parcours", sa.String(length=50), nullable=False),
+        sa.Column("code_semestre", sa.String(length=10), nullable=False),
+        sa.Column("annee_universitaire", sa.String(length=9), nullable=False),
+        sa.Column("code_session", sa.String(length=5), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "stats_semestre",
+        *_colonnes_groupe(),
+        sa.Column("nb_etudiants", sa.Integer(), nullable=False),
+        sa.Column("nb_valides", sa.Integer(), nullable=False),
+        sa.Column("moyenne", sa.Numeric(4, 2), nullable=True),
+        sa.Column("moyenne_min", sa.Numeric(4, 2), nullable=True),
+        sa.Column("moyenne_max", sa.Numeric(4, 2), nullable=True),
+        sa.Column("credits_moyens", sa.Numeric(4, 1), nullable=True),
+        sa.Column("date_maj", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id_stat"),
+        sa.UniqueConstraint("id_parcours", "code_semestre", "annee_universitaire", "code_session",
+                            name="uq_stats_semestre"),
+    )
+    op.create_index("ix_stats_semestre_annee_semestre", "stats_semestre", ["annee_universitaire", "code_semestre"])
+
+    op.create_table(
+        "stats_ue",
+        *_colonnes_groupe(),
+        sa.Column("id_ue", sa.String(length=50), nullable=False),
+        sa.Column("nb_etudiants", sa.Integer(), nullable=False),
+        sa.Column("nb_acquises", sa.Integer(), nullable=False),
+        sa.Column("moyenne", sa.Numeric(4, 2), nullable=True),
+        sa.Column("date_maj", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id_stat"),
+        sa.UniqueConstraint("id_parcours", "id_ue", "annee_universitaire", "code_session", name="uq_stats_ue"),
+    )
+    op.create_index("ix_stats_ue_annee_semestre", "stats_ue", ["annee_universitaire", "code_semestre"])
+
+    op.create_table(
+        "stats_credits",
+        *_colonnes_groupe(),
+        sa.Column("credits_acquis", sa.Numeric(4, 1), nullable=False),
+        sa.Column("nb_etudiants", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id_stat"),
+        sa.UniqueConstraint("id_parcours", "code_semestre", "annee_universitaire", "code_session", "credits_acquis",
+                            name="uq_stats_credits"),
+    )
+    op.create_index("ix_stats_credits_annee_semestre", "stats_credits", ["annee_universitaire", "code_semestre"])
+
+
+def downgrade():
+    op.drop_index("ix_stats_credits_annee_semestre", table_name="stats_credits")
+    op.drop_table("stats_credits")
+    op.drop_index("ix_stats_ue_annee_semestre", table_name="stats_ue")
+    op.drop_table("stats_ue")
+    op.drop_index("ix_stats_semestre_annee_semestre", table_name="stats_semestre")
+    op.drop_table("stats_semestre")
@@ -0,0 +1,142 @@
+"""Clés techniques entières (étudiants, semestres, UE, EC) référencées par les tables de faits
+
+Les dimensions gardent leur code comme clé primaire et identifiant public, et
+reçoivent une colonne d'identité unique (`etudiant_id`, `semestre_id`, `ue_id`,
+`ec_id`). Dans `inscriptions`, `notes`, `resultats_ue` et `resultats_semestre`,
+les colonnes de codes sont remplacées par ces entiers : lignes, contraintes
+d'unicité et index plus compacts, jointures sur des entiers.
+
+Les tables de faits sont réécrites (UPDATE ... FROM puis suppression des
+anciennes colonnes) : à lancer dans une fenêtre de maintenance. Les archives
+Parquet existantes contiennent les anciennes colonnes : les restaurer avant
+(`python -m app.services.archives restaurer <annee>`), puis les refaire après.
+
+Après `alembic upgrade head` :
+    VACUUM ANALYZE inscriptions, notes, resultats_ue, resultats_semestre;
+
+Revision ID: 0005_cles_techniques
+Revises: 0004_statistiques
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_cles_techniques"
+down_revision = "0004_statistiques"
+branch_labels = None
+depends_on = None
+
+# Dimension -> (clé technique, contrainte d'unicité)
+DIMENSIONS = {
+    "etudiants": ("etudiant_id", "uq_etudiant_id"),
+    "semestres": ("semestre_id", "uq_semestre_id"),
+    "unites_enseignement": ("ue_id", "uq_ue_id"),
+    "elements_constitutifs": ("ec_id", "uq_ec_id"),
+}
+
+# Table de faits -> [(colonne de code remplacée, son type, dimension)]
+REMPLACEMENTS = {
+    "inscriptions": [
+        ("code_etudiant", sa.String(length=50), "etudiants"),
+        ("code_semestre", sa.String(length=10), "semestres"),
+    ],
+    "notes": [
+        ("code_etudiant", sa.String(length=50), "etudiants"),
+        ("id_ec", sa.String(length=50), "elements_constitutifs"),
+    ],
+    "resultats_ue": [
+        ("code_etudiant", sa.String(length=50), "etudiants"),
+        ("id_ue", sa.String(length=50), "unites_enseignement"),
+    ],
+    "resultats_semestre": [
+        ("code_etudiant", sa.String(length=50), "etudiants"),
+        ("code_semestre", sa.String(length=50), "semestres"),
+    ],
+}
+
+# Contraintes d'unicité : (nom, table, colonnes avant, colonnes après)
+CONTRAINTES = [
+    ("uq_etudiant_annee_parcours_semestre", "inscriptions",
+     ["code_etudiant", "annee_universitaire", "id_parcours", "code_semestre"],
+     ["etudiant_id", "annee_universitaire", "id_parcours", "semestre_id"]),
+    ("uq_etudiant_ec_annee_session", "notes",
+     ["code_etudiant", "id_ec", "annee_universitaire", "code_session"],
+     ["etudiant_id", "ec_id", "annee_universitaire", "code_session"]),
+    ("uq_resultat_ue_unique", "resultats_ue",
+     ["code_etudiant", "id_ue", "annee_universitaire", "code_session"],
+     ["etudiant_id", "ue_id", "annee_universitaire", "code_session"]),
+    ("uq_resultat_semestre_session", "resultats_semestre",
+     ["code_etudiant", "code_semestre", "annee_universitaire", "code_session"],
+     ["etudiant_id", "semestre_id", "annee_universitaire", "code_session"]),
+]
+
+# Index : (nom, table, colonnes avant, colonnes après)
+INDEX = [
+    ("ix_inscriptions_parcours_annee_semestre", "inscriptions",
+     ["id_parcours", "annee_universitaire", "code_semestre"], ["id_parcours", "annee_universitaire", "semestre_id"]),
+    ("ix_inscriptions_annee_semestre", "inscriptions",
+     ["annee_universitaire", "code_semestre"], ["annee_universitaire", "semestre_id"]),
+    ("ix_notes_ec_annee_session", "notes",
+     ["id_ec", "annee_universitaire", "code_session"], ["ec_id", "annee_universitaire", "code_session"]),
+    ("ix_resultats_ue_ue_annee_session", "resultats_ue",
+     ["id_ue", "annee_universitaire", "code_session"], ["ue_id", "annee_universitaire", "code_session"]),
+    ("ix_resultats_semestre_semestre_annee_session", "resultats_semestre",
+     ["code_semestre", "annee_universitaire", "code_session"], ["semestre_id", "annee_universitaire", "code_session"]),
+]
+
+
+def _remplacer_colonne(table, ancienne, nouvelle, type_nouvelle, dimension):
+    """
+    Remplace la colonne `ancienne` de `table` par `nouvelle`, remplie depuis la dimension
+    (les colonnes portent le même nom dans les deux tables), clé étrangère comprise.
+    """
+    op.add_column(table, sa.Column(nouvelle, type_nouvelle, nullable=True))
+    op.execute(
+        f"UPDATE {table} AS f SET {nouvelle} = d.{nouvelle} "
+        f"FROM {dimension} AS d WHERE d.{ancienne} = f.{ancienne}"
+    )
+    op.alter_column(table, nouvelle, existing_type=type_nouvelle, nullable=False)
+    op.drop_constraint(f"{table}_{ancienne}_fkey", table, type_="foreignkey")
+    op.drop_column(table, ancienne)
+    op.create_foreign_key(f"{table}_{nouvelle}_fkey", table, dimension, [nouvelle], [nouvelle])
+
+
+def upgrade():
+    for dimension, (cle, contrainte) in DIMENSIONS.items():
+        op.add_column(dimension, sa.Column(cle, sa.Integer(), sa.Identity(), nullable=False))
+        op.create_unique_constraint(contrainte, dimension, [cle])
+
+    for nom, table, _, _ in CONTRAINTES:
+        op.drop_constraint(nom, table, type_="unique")
+    for nom, table, _, _ in INDEX:
+        op.drop_index(nom, table_name=table)
+
+    for table, colonnes in REMPLACEMENTS.items():
+        for ancienne, _, dimension in colonnes:
+            _remplacer_colonne(table, ancienne, DIMENSIONS[dimension][0], sa.Integer(), dimension)
+
+    for nom, table, _, apres in CONTRAINTES:
+        op.create_unique_constraint(nom, table, apres)
+    for nom, table, _, apres in INDEX:
+        op.create_index(nom, table, apres)
+
+
+def downgrade():
+    for nom, table, _, _ in CONTRAINTES:
+        op.drop_constraint(nom, table, type_="unique")
+    for nom, table, _, _ in INDEX:
+        op.drop_index(nom, table_name=table)
+
+    for table, colonnes in REMPLACEMENTS.items():
+        for ancienne, type_ancienne, dimension in colonnes:
+            _remplacer_colonne(table, DIMENSIONS[dimension][0], ancienne, type_ancienne, dimension)
+
+    for nom, table, avant, _ in CONTRAINTES:
+        op.create_unique_constraint(nom, table, avant)
+    for nom, table, avant, _ in INDEX:
+        op.create_index(nom, table, avant)
+
+    for dimension, (cle, contrainte) in DIMENSIONS.items():
+        op.drop_constraint(contrainte, dimension, type_="unique")
+        op.drop_column(dimension, cle)
@@ -0,0 +1,32 @@
+"""Suppression de la table schema_empreinte
+
+La vérification du schéma au démarrage compare désormais la révision Alembic
+de la base (`alembic_version`) à la dernière révision des scripts : l'empreinte
+des modèles, enregistrée à la main, n'est plus utilisée.
+
+Revision ID: 0006_suppression_empreinte
+Revises: 0005_cles_techniques
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_suppression_empreinte"
+down_revision = "0005_cles_techniques"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_table("schema_empreinte")
+
+
+def downgrade():
+    op.create_table(
+        "schema_empreinte",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empreinte", sa.String(length=64), nullable=False),
+        sa.Column("date_enregistrement", sa.DateTime(), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
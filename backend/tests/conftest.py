@@ -0,0 +1,28 @@
+"""
+Base SQLite de test : petit jeu généré par `benchmarks.generateur`, résultats et
+statistiques calculés. Une base par test, dans le répertoire temporaire de pytest.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base
+from app.services import propagation  # noqa: F401  (écouteurs de recalcul des résultats)
+from app.services.schema import marquer_a_jour
+from benchmarks.generateur import ECHELLES, calculer_resultats, generer
+
+ECHELLES.setdefault("test", dict(institutions=1, composantes=1, mentions=1, parcours=2, annees=1,
+                                 etudiants=20, enseignants=5, ues_par_semestre=4, ecs_par_ue=2))
+
+
+@pytest.fixture
+def Session(tmp_path):
+    moteur = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    with moteur.begin() as connexion:
+        Base.metadata.create_all(connexion)
+        marquer_a_jour(connexion)
+        generer(connexion, "test")
+    Session = sessionmaker(bind=moteur, autoflush=False)
+    calculer_resultats(Session)
+    yield Session
+    moteur.dispose()
@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import delete, func, insert, select
+
+from app.core.config import settings
+from app.models import Inscription, Note, ResultatSemestre, ResultatUE, Semestre
+from app.services.archives import AnneeArchivee, archiver, restaurer, supprimer_archive
+from app.services.releves import precharger_releves
+
+ANNEE = "2024-2025"
+MODELES = {"notes": Note, "resultats_ue": ResultatUE, "resultats_semestre": ResultatSemestre}
+
+
+@pytest.fixture
+def archives(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archives"))
+    monkeypatch.setattr(settings, "ARCHIVE_ANNEES_OUVERTES", 0)
+
+
+def _comptes(db):
+    return {
+        nom: db.scalar(select(func.count()).select_from(modele).where(modele.annee_universitaire == ANNEE))
+        for nom, modele in MODELES.items()
+    }
+
+
+def _releves(db):
+    id_parcours, code_semestre = db.execute(
+        select(Inscription.id_parcours, Semestre.code_semestre)
+        .join(Semestre, Semestre.semestre_id == Inscription.semestre_id)
+        .where(Inscription.annee_universitaire == ANNEE)
+    ).first()
+    return precharger_releves(db, id_parcours, ANNEE, code_semestre, "N")
+
+
+def test_archiver_lire_restaurer(Session, archives):
+    """ Cycle complet : archivage et purge, relevés lus dans l'archive, restauration. """
+    with Session() as db:
+        comptes, releves = _comptes(db), _releves(db)
+
+        rapport = archiver(db, ANNEE)
+        db.commit()
+        assert rapport["lignes_purgees"] == comptes
+        assert {nom: table["lignes"] for nom, table in rapport["tables"].items()} == comptes
+        assert set(_comptes(db).values()) == {0}
+        assert _releves(db) == releves
+
+        # Nouvel archivage d'une année déjà archivée : seules les clés de l'archive sont purgées
+        note = {"etudiant_id": 1, "ec_id": 1, "annee_universitaire": ANNEE, "code_session": "R", "valeur_note": 12}
+        db.execute(insert(Note).values(note))
+        db.commit()
+        assert archiver(db, ANNEE)["lignes_purgees"]["notes"] == 0
+        db.commit()
+        assert _comptes(db)["notes"] == 1
+        db.execute(delete(Note))
+        db.commit()
+
+        assert restaurer(db, ANNEE)["lignes_restaurees"] == comptes
+        db.commit()
+        supprimer_archive(ANNEE)
+        assert _comptes(db) == comptes
+        assert _releves(db) == releves
+
+
+def test_note_annee_archivee_refusee_au_flush(Session, archives):
+    """ Écriture ORM sur une note d'une année archivée : refusée avant d'atteindre la base. """
+    with Session() as db:
+        note = db.scalars(select(Note).where(Note.annee_universitaire == ANNEE)).first()
+        id_note, valeur = note.id_note, note.valeur_note
+        archiver(db, ANNEE, purger=False)
+        db.commit()
+
+        note.valeur_note = 20
+        with pytest.raises(AnneeArchivee, match=ANNEE):
+            db.commit()
+        db.rollback()
+        assert db.scalar(select(Note.valeur_note).where(Note.id_note == id_note)) == valeur
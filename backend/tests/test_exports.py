@@ -0,0 +1,43 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.models import Note
+from benchmarks.suite import brancher
+
+ANNEE = "2024-2025"
+
+
+@pytest.fixture
+def client(Session):
+    from app.main import app
+
+    moteur, _ = brancher(str(Session.kw["bind"].url))
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
+        moteur.dispose()
+
+
+def test_export_csv_lit_la_session_de_la_requete(client, Session):
+    """ L'export passe par la dépendance de session (surchargée ici vers la base de test). """
+    reponse = client.get("/api/exports/notes", params={"annee_universitaire": ANNEE})
+    assert reponse.status_code == 200
+    lignes = reponse.content.decode("utf-8-sig").splitlines()
+    with Session() as db:
+        nb_notes = db.scalar(select(func.count()).select_from(Note).where(Note.annee_universitaire == ANNEE))
+    assert lignes[0].split(";")[0] == "code_etudiant"
+    assert len(lignes) == nb_notes + 1
+
+
+def test_export_xlsx(client):
+    pytest.importorskip("openpyxl")
+    reponse = client.get("/api/exports/resultats_semestre", params={"annee_universitaire": ANNEE, "format": "xlsx"})
+    assert reponse.status_code == 200
+    assert reponse.content[:2] == b"PK"
+
+
+def test_export_annee_inconnue(client):
+    assert client.get("/api/exports/notes", params={"annee_universitaire": "1990-1991"}).status_code == 404
@@ -0,0 +1,33 @@
+import asyncio
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import reference_cache
+from app.models import Institution
+from app.services.hierarchie import aarbre
+
+
+def test_racine_inconnue_non_mise_en_cache(Session):
+    """ Un 404 ne crée pas d'entrée de cache ; le nœud créé ailleurs est trouvé ensuite. """
+    url = Session.kw["bind"].url.set(drivername="sqlite+aiosqlite")
+    moteur = create_async_engine(url)
+
+    async def scenario():
+        async with async_sessionmaker(moteur)() as db:
+            assert await aarbre(db, "institution", "INST9") is None
+            entrees = reference_cache.stats()["entrees"]
+            assert await aarbre(db, "institution", "INST9") is None
+            assert reference_cache.stats()["entrees"] == entrees
+
+            # Écriture hors session : aucune invalidation dans ce processus
+            with Session.kw["bind"].begin() as connexion:
+                connexion.execute(insert(Institution).values(
+                    id_institution="INST9", nom="Université 9", type_institution="PUB"))
+            contenu, _ = await aarbre(db, "institution", "INST9")
+            assert b'"INST9"' in contenu
+            assert await aarbre(db, "ue", "UE_INCONNUE") is None
+        await moteur.dispose()
+
+    reference_cache.clear()
+    asyncio.run(scenario())
@@ -0,0 +1,40 @@
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.core.http_cache import middleware_compression
+
+CONTENU = b"0123456789" * 1000
+
+
+def _client():
+    app = FastAPI()
+
+    @app.get("/json")
+    def json():
+        return Response(CONTENU, media_type="application/json")
+
+    @app.get("/zip")
+    def archive():
+        return Response(CONTENU, media_type="application/zip")
+
+    @app.get("/xlsx")
+    def classeur():
+        return Response(CONTENU, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+    app.add_middleware(middleware_compression(), minimum_size=500)
+    return TestClient(app)
+
+
+def test_compression_des_reponses_compressibles():
+    reponse = _client().get("/json", headers={"Accept-Encoding": "gzip"})
+    assert reponse.headers["content-encoding"] in ("gzip", "br")
+    assert reponse.content == CONTENU
+
+
+def test_types_deja_compresses_sans_content_encoding():
+    client = _client()
+    for route in ("/zip", "/xlsx"):
+        reponse = client.get(route, headers={"Accept-Encoding": "gzip, br"})
+        assert "content-encoding" not in reponse.headers
+        assert reponse.content == CONTENU
@@ -0,0 +1,20 @@
+from sqlalchemy import insert
+
+from app.core.cache import reference_cache
+from app.models import AnneeUniversitaire
+from app.services.references import index, obtenir
+
+
+def test_obtenir_verifie_la_base_sur_absence(Session):
+    """ Ligne créée par un autre worker : absente du cache, mais trouvée en base. """
+    reference_cache.clear()
+    with Session() as db:
+        assert obtenir(db, AnneeUniversitaire, "2030-2031") is None
+        index(db, AnneeUniversitaire)
+
+        # Écriture hors session : aucune invalidation dans ce processus
+        with db.get_bind().begin() as connexion:
+            connexion.execute(insert(AnneeUniversitaire).values(annee="2030-2031", ordre_annee=99))
+
+        assert obtenir(db, AnneeUniversitaire, "2030-2031")["ordre_annee"] == 99
+        assert "2030-2031" in index(db, AnneeUniversitaire)
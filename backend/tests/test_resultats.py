@@ -0,0 +1,52 @@
+from sqlalchemy import delete, select
+
+from app.models import (
+    ElementConstitutif, Inscription, Note, ResultatSemestre, ResultatUE, Semestre, UniteEnseignement,
+)
+
+ANNEE = "2024-2025"
+
+
+def _semestre_suivi(db):
+    """ (etudiant_id, semestre_id, code_semestre) de la première inscription. """
+    inscription = db.scalars(select(Inscription).where(Inscription.annee_universitaire == ANNEE)).first()
+    code = db.scalar(select(Semestre.code_semestre).where(Semestre.semestre_id == inscription.semestre_id))
+    return inscription.etudiant_id, inscription.semestre_id, code
+
+
+def test_semestre_partiellement_note_non_valide(Session):
+    """ Une seule UE notée (16/20) sur quatre : les UE sans résultat comptent pour 0. """
+    with Session() as db:
+        etudiant_id, semestre_id, code_semestre = _semestre_suivi(db)
+        ecs = select(ElementConstitutif.ec_id).join(
+            UniteEnseignement, UniteEnseignement.id_ue == ElementConstitutif.id_ue
+        ).where(UniteEnseignement.code_semestre == code_semestre)
+        ues = select(UniteEnseignement.ue_id).where(UniteEnseignement.code_semestre == code_semestre)
+        db.execute(delete(Note).where(Note.etudiant_id == etudiant_id, Note.ec_id.in_(ecs)))
+        db.execute(delete(ResultatUE).where(ResultatUE.etudiant_id == etudiant_id, ResultatUE.ue_id.in_(ues)))
+        db.execute(delete(ResultatSemestre).where(
+            ResultatSemestre.etudiant_id == etudiant_id, ResultatSemestre.semestre_id == semestre_id
+        ))
+        db.commit()
+
+        premiere_ue = db.scalars(ues.order_by(UniteEnseignement.ue_id)).first()
+        for ec_id in db.scalars(select(ElementConstitutif.ec_id).join(
+            UniteEnseignement, UniteEnseignement.id_ue == ElementConstitutif.id_ue
+        ).where(UniteEnseignement.ue_id == premiere_ue)):
+            db.add(Note(etudiant_id=etudiant_id, ec_id=ec_id, annee_universitaire=ANNEE,
+                        code_session="N", valeur_note=16))
+        db.commit()
+
+        resultat = db.scalars(select(ResultatSemestre).where(
+            ResultatSemestre.etudiant_id == etudiant_id, ResultatSemestre.semestre_id == semestre_id,
+            ResultatSemestre.annee_universitaire == ANNEE, ResultatSemestre.code_session == "N",
+        )).one()
+        assert resultat.statut_validation != "V"
+        assert float(resultat.moyenne_obtenue) == 4.0  # 16 x 7 / 28
+        assert float(resultat.credits_acquis) == 7
+
+        inscription = db.scalars(select(Inscription).where(
+            Inscription.etudiant_id == etudiant_id, Inscription.semestre_id == semestre_id,
+            Inscription.annee_universitaire == ANNEE,
+        )).one()
+        assert not inscription.is_semestre_valide
@@ -0,0 +1,23 @@
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine
+
+from app.models import Base
+from app.services.schema import _scripts, marquer_a_jour, revision_attendue, verifier_schema
+
+
+def test_conforme_seulement_a_la_derniere_revision(tmp_path):
+    """ Tables présentes mais base non migrée, puis en retard d'une révision, puis à jour. """
+    moteur = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    with moteur.begin() as connexion:
+        Base.metadata.create_all(connexion)
+    assert verifier_schema(moteur) == "absente"
+
+    precedente = _scripts().get_revision(revision_attendue()).down_revision
+    with moteur.begin() as connexion:
+        MigrationContext.configure(connexion).stamp(_scripts(), precedente)
+    assert verifier_schema(moteur) == "different"
+
+    with moteur.begin() as connexion:
+        marquer_a_jour(connexion)
+    assert verifier_schema(moteur) == "conforme"
+    moteur.dispose()
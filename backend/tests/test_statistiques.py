@@ -0,0 +1,32 @@
+from sqlalchemy import select
+
+from app.models import Note, RepartitionCredits, StatistiqueSemestre, StatistiqueUE
+from app.services.statistiques import reconstruire
+
+ANNEE = "2024-2025"
+
+
+def _contenu(db):
+    """ Lignes des tables de statistiques, sans identifiant ni date de mise à jour. """
+    contenu = {}
+    for modele in (StatistiqueSemestre, StatistiqueUE, RepartitionCredits):
+        colonnes = [c for c in modele.__table__.c if c.name not in ("id_stat", "date_maj")]
+        contenu[modele.__tablename__] = sorted(tuple(ligne) for ligne in db.execute(select(*colonnes)))
+    return contenu
+
+
+def test_statistiques_rafraichies_apres_commit(Session):
+    """ Après une saisie, les groupes touchés sont identiques à une reconstruction complète. """
+    with Session() as db:
+        etudiants = db.scalars(select(Note.etudiant_id).distinct()
+                               .where(Note.annee_universitaire == ANNEE).limit(5)).all()
+        avant = _contenu(db)
+        for note in db.scalars(select(Note).where(Note.etudiant_id.in_(etudiants))):
+            note.valeur_note = 20
+        db.commit()
+
+        apres = _contenu(db)
+        assert apres != avant
+        reconstruire(db, ANNEE)
+        db.commit()
+        assert _contenu(db) == apres